@@ -0,0 +1,3 @@
+"""
+Herramientas de rendimiento: API simulada de Freshservice y banco de pruebas.
+"""
@@ -0,0 +1,529 @@
+"""
+Servidor local que imita la API v2 de Freshservice para medir el rendimiento
+de las herramientas sin tocar el entorno de producción.
+
+Genera un inventario sintético y determinista (activos con sus type_fields y
+componentes, departamentos, tipos de activos, ubicaciones y usuarios) y
+responde a los endpoints que usan fsmanage.py, fssearch.py y fssync.py, con
+paginación, filtros (filter=/query=), latencia configurable, cabeceras de
+límite de peticiones e inyección de respuestas 429.
+
+Uso:
+    python -m bench.fakeserver --port 8765 --assets 5000 --latency 20
+    FRESHSERVICE_BASE_URL=http://127.0.0.1:8765/api/v2/ python fsmanage.py -i 1-500 -a
+
+El endpoint /api/v2/__stats devuelve el número de peticiones recibidas por
+endpoint y /api/v2/__reset pone los contadores a cero.
+"""
+import argparse
+import datetime
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+# Máximo de elementos por página que admite la API
+MAX_PER_PAGE = 100
+DEFAULT_PER_PAGE = 30
+
+# Campos de tipo que consultan las herramientas (ver TYPE_FIELDS en fsmanage.py)
+OS_FIELD = 'os_23001176139'
+IP_FIELD = 'computer_ip_address_23001176139'
+
+# Nombres con los que se generan los usuarios (con acentos, como en un directorio real)
+FIRST_NAMES = [
+    'Rafael', 'María', 'José', 'Lucía', 'Javier', 'Ángela', 'Andrés', 'Sofía', 'Iñaki', 'Carmen',
+    'Tomás', 'Elena', 'Raúl', 'Beatriz', 'Óscar', 'Marta', 'Jesús', 'Nuria', 'Adrián', 'Inés',
+]
+LAST_NAMES = [
+    'Aceituno', 'García', 'Martínez', 'López', 'Sánchez', 'Pérez', 'Gómez', 'Fernández', 'Díaz', 'Muñoz',
+    'Álvarez', 'Romero', 'Navarro', 'Torres', 'Domínguez', 'Vázquez', 'Ramos', 'Gil', 'Ibáñez', 'Peña',
+]
+OPERATING_SYSTEMS = ['Windows 10', 'Windows 11', 'Ubuntu 22.04', 'macOS 14']
+
+# Fecha a partir de la que se reparten los updated_at del inventario
+BASE_DATE = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+# Expresión de cada condición de un filtro: campo:valor, campo:>'valor' o campo:<'valor'
+_CONDITION = re.compile(r"^\s*(\w+)\s*:\s*([<>]?)\s*(.+?)\s*$")
+
+
+class Dataset:
+    """
+    Inventario sintético. Todos los valores se derivan del número de activo o
+    de usuario, de modo que dos servidores con los mismos parámetros devuelven
+    exactamente los mismos datos.
+
+    :param assets: Número de activos (display_id de 1 a assets).
+    :param requesters: Número de usuarios.
+    :param departments: Número de departamentos.
+    :param asset_types: Número de tipos de activos.
+    :param locations: Número de ubicaciones.
+    """
+
+    def __init__(self, assets=1000, requesters=200, departments=20, asset_types=8, locations=15):
+        self.asset_count = assets
+        self.catalogs = {
+            'departments': [{'id': 1000 + i, 'name': f'Departamento {i}'} for i in range(1, departments + 1)],
+            'asset_types': [{'id': 2000 + i, 'name': f'Tipo {i}'} for i in range(1, asset_types + 1)],
+            'locations': [{'id': 3000 + i, 'name': f'Ubicación {i}'} for i in range(1, locations + 1)],
+        }
+        self.requesters = [self._requester(i) for i in range(1, requesters + 1)]
+        self._requesters_by_id = {user['id']: user for user in self.requesters}
+        self._catalogs_by_id = {
+            name: {item['id']: item for item in items} for name, items in self.catalogs.items()
+        }
+
+    def _requester(self, i):
+        first_name = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last_name = LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        return {
+            'id': 5000 + i,
+            'first_name': first_name,
+            'last_name': last_name,
+            'primary_email': f'usuario{i}@example.com',
+            'department_ids': [self.catalogs['departments'][i % len(self.catalogs['departments'])]['id']],
+            'updated_at': _timestamp(i * 13),
+        }
+
+    def asset(self, display_id, include_type_fields=False):
+        """
+        Devuelve el activo con ese display_id o None si no existe.
+        """
+        if not 1 <= display_id <= self.asset_count:
+            return None
+        catalogs = self.catalogs
+        asset = {
+            'id': 23000000000 + display_id,
+            'display_id': display_id,
+            'name': f'ASSET-{display_id}',
+            'asset_type_id': catalogs['asset_types'][display_id % len(catalogs['asset_types'])]['id'],
+            'department_id': catalogs['departments'][display_id % len(catalogs['departments'])]['id'],
+            'location_id': catalogs['locations'][display_id % len(catalogs['locations'])]['id'],
+            'user_id': self.requesters[display_id % len(self.requesters)]['id'] if self.requesters else None,
+            'asset_tag': f'TAG-{display_id:06d}',
+            'impact': 'low',
+            'usage_type': 'permanent',
+            'created_at': _timestamp(0),
+            'updated_at': _timestamp(display_id * 7),
+        }
+        if include_type_fields:
+            asset['type_fields'] = {
+                OS_FIELD: OPERATING_SYSTEMS[display_id % len(OPERATING_SYSTEMS)],
+                IP_FIELD: f'10.{display_id // 65536 % 256}.{display_id // 256 % 256}.{display_id % 256}',
+                'serial_number_23001176139': f'SN{display_id:08d}',
+            }
+        return asset
+
+    def assets(self, include_type_fields=False):
+        """
+        Recorre todos los activos en orden de display_id.
+        """
+        for display_id in range(1, self.asset_count + 1):
+            yield self.asset(display_id, include_type_fields)
+
+    def find_assets(self, expressions, include_type_fields=False):
+        """
+        Devuelve los activos candidatos para un filtro. Si el filtro fija el nombre,
+        el display_id o el usuario, solo se generan esos activos en lugar de recorrer
+        todo el inventario (el filtro completo se aplica después).
+        """
+        for field, operator, value in (c for e in expressions for c in _parse_conditions(e)):
+            if operator:
+                continue
+            match = re.fullmatch(r'asset-(\d+)', value.lower()) if field == 'name' else None
+            if match or (field == 'display_id' and value.isdigit()):
+                asset = self.asset(int(match.group(1) if match else value), include_type_fields)
+                return [asset] if asset else []
+            if field == 'user_id' and value.isdigit() and self.requesters:
+                index = next((i for i, user in enumerate(self.requesters) if user['id'] == int(value)), None)
+                if index is None:
+                    return []
+                step = len(self.requesters)
+                return (self.asset(display_id, include_type_fields) for display_id in range(index or step, self.asset_count + 1, step))
+        return self.assets(include_type_fields)
+
+    def components(self, display_id):
+        """
+        Devuelve los componentes de un activo.
+        """
+        return [
+            {'component_type': 'Processor', 'name': 'CPU', 'status': 'ok',
+             'component_data': [{'cores': 2 + display_id % 4 * 2, 'speed': '2.4 GHz'}]},
+            {'component_type': 'Memory', 'name': 'RAM', 'status': 'ok',
+             'component_data': [{'capacity': 8, 'slot': 0}, {'capacity': 8, 'slot': 1}]},
+            {'component_type': 'Logical Drive', 'name': 'C:', 'status': 'ok',
+             'component_data': [{'capacity': 256 * (1 + display_id % 3), 'free_space': 100}]},
+            {'component_type': 'Network Adapter', 'name': 'Ethernet', 'status': 'ok',
+             'component_data': [{'mac_address': f'00:16:3e:{display_id // 65536 % 256:02x}:{display_id // 256 % 256:02x}:{display_id % 256:02x}'}]},
+        ]
+
+    def requester(self, user_id):
+        return self._requesters_by_id.get(user_id)
+
+    def catalog_item(self, catalog, item_id):
+        return self._catalogs_by_id[catalog].get(item_id)
+
+
+class FakeFreshservice:
+    """
+    Servidor HTTP con la API simulada. Se arranca en un hilo con start() o en
+    primer plano con serve_forever().
+
+    :param dataset: Instancia de Dataset.
+    :param host: Dirección en la que escuchar.
+    :param port: Puerto (0 para elegir uno libre).
+    :param latency: Segundos de latencia añadidos a cada respuesta.
+    :param jitter: Variación máxima (en segundos) que se suma a la latencia.
+    :param rate_limit: Peticiones por minuto permitidas; al superarlas se responde 429.
+    :param throttle_every: Si es mayor que 0, se responde 429 a una de cada N peticiones.
+    :param gzip_responses: Comprimir las respuestas si el cliente lo admite.
+    """
+
+    def __init__(self, dataset, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 rate_limit=100000, throttle_every=0, gzip_responses=True):
+        self.dataset = dataset
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.throttle_every = throttle_every
+        self.gzip_responses = gzip_responses
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._requests = 0
+        self._window = deque()  # Instantes de las peticiones del último minuto
+        self._thread = None
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/api/v2/'
+
+    def start(self):
+        """
+        Arranca el servidor en un hilo en segundo plano.
+
+        :return: La propia instancia.
+        """
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        """
+        Detiene el servidor.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        """
+        Devuelve una copia de los contadores: peticiones por endpoint, total y respuestas 429.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {}
+            self._requests = 0
+
+    def _count(self, endpoint):
+        """
+        Registra una petición y decide si se responde con 429.
+
+        :return: (remaining, throttled) con las peticiones restantes en el minuto en curso
+            y si la petición debe rechazarse.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._requests += 1
+            self._stats[endpoint] = self._stats.get(endpoint, 0) + 1
+            self._stats['total'] = self._stats.get('total', 0) + 1
+            cutoff = now - 60
+            while self._window and self._window[0] < cutoff:
+                self._window.popleft()
+            throttled = len(self._window) >= self.rate_limit
+            if self.throttle_every and self._requests % self.throttle_every == 0:
+                throttled = True
+            if throttled:
+                self._stats['throttled'] = self._stats.get('throttled', 0) + 1
+            else:
+                self._window.append(now)
+            remaining = max(0, self.rate_limit - len(self._window))
+        return remaining, throttled
+
+    def handle(self, path, query):
+        """
+        Resuelve una petición de la API.
+
+        :param path: Ruta relativa a /api/v2/, sin barras al principio ni al final.
+        :param query: Parámetros de consulta (diccionario de listas).
+        :return: (código de estado, cuerpo, nombre del endpoint).
+        """
+        dataset = self.dataset
+        parts = path.split('/')
+        include_type_fields = 'type_fields' in query.get('include', [''])[0]
+
+        if parts[0] == 'assets':
+            if len(parts) == 1:
+                expressions = query.get('filter', []) + query.get('query', [])
+                if not expressions:  # Sin filtros solo se generan los activos de la página pedida
+                    start, per_page = _page_bounds(query)
+                    last = min(dataset.asset_count, start + per_page)
+                    items = [dataset.asset(display_id, include_type_fields) for display_id in range(start + 1, last + 1)]
+                    return 200, {'assets': items}, 'assets'
+                items = _apply_filters(dataset.find_assets(expressions, include_type_fields), expressions)
+                page, total = _page(items, query)
+                return 200, {'assets': page, 'meta': {'total_count': total}}, 'assets'
+            if not parts[1].isdigit():
+                return 404, {}, 'unknown'
+            display_id = int(parts[1])
+            if len(parts) == 3 and parts[2] == 'components':
+                if dataset.asset(display_id) is None:
+                    return 404, {}, 'components'
+                return 200, {'components': dataset.components(display_id)}, 'components'
+            if len(parts) == 2:
+                asset = dataset.asset(display_id, include_type_fields)
+                return (200, {'asset': asset}, 'asset') if asset else (404, {}, 'asset')
+            return 404, {}, 'unknown'
+
+        if parts[0] == 'requesters':
+            if len(parts) == 1:
+                if not query.get('query'):
+                    return 200, {'requesters': _page(dataset.requesters, query)[0]}, 'requesters'
+                page, total = _page(_apply_filters(dataset.requesters, query['query']), query)
+                return 200, {'requesters': page, 'meta': {'total_count': total}}, 'requesters'
+            user = dataset.requester(int(parts[1])) if parts[1].isdigit() else None
+            return (200, {'requester': user}, 'requester') if user else (404, {}, 'requester')
+
+        if parts[0] in dataset.catalogs:
+            catalog = parts[0]
+            singular = catalog[:-1]
+            if len(parts) == 1:
+                return 200, {catalog: _page(dataset.catalogs[catalog], query)[0]}, catalog
+            item = dataset.catalog_item(catalog, int(parts[1])) if parts[1].isdigit() else None
+            return (200, {singular: item}, singular) if item else (404, {}, singular)
+
+        return 404, {}, 'unknown'
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Conexiones keep-alive, como la API real
+        disable_nagle_algorithm = True  # Sin esperas de Nagle entre cabeceras y cuerpo
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            path = url.path
+            if path.startswith('/api/v2'):
+                path = path[len('/api/v2'):]
+            path = path.strip('/')
+            query = parse_qs(url.query)
+
+            if path == '__stats':
+                return self._send(200, server.stats())
+            if path == '__reset':
+                server.reset_stats()
+                return self._send(200, {})
+
+            status, body, endpoint = server.handle(path, query)
+            remaining, throttled = server._count(endpoint)
+            headers = {'X-Ratelimit-Total': server.rate_limit, 'X-Ratelimit-Remaining': remaining}
+            if throttled:
+                headers['Retry-After'] = 1
+                headers['X-Ratelimit-Remaining'] = 0
+                return self._send(429, {'message': 'Rate limit exceeded'}, headers)
+            if status == 200 and '/' not in path:
+                link = _next_link(f"http://{self.headers.get('Host')}/api/v2/", path, query, body)
+                if link:
+                    headers['Link'] = link
+            delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+            if delay > 0:
+                time.sleep(delay)
+            self._send(status, body, headers)
+
+        def _send(self, status, body, headers=None):
+            payload = json.dumps(body).encode('utf-8')
+            compress = server.gzip_responses and 'gzip' in self.headers.get('Accept-Encoding', '')
+            if compress:
+                payload = gzip.compress(payload, compresslevel=1)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            if compress:
+                self.send_header('Content-Encoding', 'gzip')
+            for name, value in (headers or {}).items():
+                self.send_header(name, str(value))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def _timestamp(offset_hours):
+    """
+    Devuelve una fecha ISO 8601 desplazada un número de horas desde BASE_DATE.
+    """
+    moment = BASE_DATE + datetime.timedelta(hours=offset_hours)
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _page_bounds(query):
+    """
+    Devuelve (posición del primer elemento, elementos por página) de la página pedida.
+    """
+    try:
+        page = max(1, int(query.get('page', ['1'])[0]))
+        per_page = min(MAX_PER_PAGE, max(1, int(query.get('per_page', [str(DEFAULT_PER_PAGE)])[0])))
+    except ValueError:
+        page, per_page = 1, DEFAULT_PER_PAGE
+    return (page - 1) * per_page, per_page
+
+
+def _page(items, query):
+    """
+    Devuelve la página pedida (page/per_page) de una lista o generador de elementos
+    y el número total de elementos.
+    """
+    start, per_page = _page_bounds(query)
+    result = []
+    total = 0
+    for index, item in enumerate(items):
+        if start <= index < start + per_page:
+            result.append(item)
+        total = index + 1
+    return result, total
+
+
+def _next_link(base_url, path, query, body):
+    """
+    Devuelve la cabecera Link con la página siguiente de un listado, o None si es la última.
+    Sin total conocido se enlaza la siguiente mientras la página venga completa.
+    """
+    items = next((value for value in body.values() if isinstance(value, list)), None)
+    if items is None:
+        return None
+    start, per_page = _page_bounds(query)
+    total = body.get('meta', {}).get('total_count')
+    if (start + len(items) >= total) if total is not None else (len(items) < per_page):
+        return None
+    next_query = dict(query)
+    next_query.update({'page': [start // per_page + 2], 'per_page': [per_page]})
+    return f'<{base_url}{path}?{urlencode(next_query, doseq=True)}>; rel="next"'
+
+
+def _parse_conditions(expression):
+    """
+    Convierte un filtro de la API ("campo:valor AND campo:>'valor'") en una lista
+    de condiciones (campo, operador, valor).
+    """
+    expression = expression.strip().strip('"')
+    conditions = []
+    for term in re.split(r'\s+AND\s+', expression, flags=re.IGNORECASE):
+        match = _CONDITION.match(term)
+        if match:
+            field, operator, value = match.groups()
+            conditions.append((field, operator, value.strip("'")))
+    return conditions
+
+
+def _matches(item, conditions):
+    for field, operator, value in conditions:
+        current = item.get(field)
+        if current is None:
+            return False
+        if isinstance(current, str) and operator:
+            current = current[:len(value)]  # Comparar fechas con la precisión indicada en el filtro
+        elif isinstance(current, int) and value.lstrip('-').isdigit():
+            value = int(value)
+        else:
+            current = str(current).lower()
+            value = value.lower()
+        if operator == '>' and not current > value:
+            return False
+        if operator == '<' and not current < value:
+            return False
+        if not operator and current != value:
+            return False
+    return True
+
+
+def _apply_filters(items, expressions):
+    """
+    Filtra los elementos con todas las expresiones de filter= y query=.
+    """
+    conditions = [condition for expression in expressions for condition in _parse_conditions(expression)]
+    if not conditions:
+        return items
+    return (item for item in items if _matches(item, conditions))
+
+
+def build_server(args):
+    """
+    Crea el servidor a partir de los argumentos de línea de comandos.
+    """
+    dataset = Dataset(
+        assets=args.assets,
+        requesters=args.requesters,
+        departments=args.departments,
+        asset_types=args.asset_types,
+        locations=args.locations,
+    )
+    return FakeFreshservice(
+        dataset,
+        host=args.host,
+        port=args.port,
+        latency=args.latency / 1000.0,
+        jitter=args.jitter / 1000.0,
+        rate_limit=args.rate_limit,
+        throttle_every=args.throttle_every,
+        gzip_responses=not args.no_gzip,
+    )
+
+
+def add_server_arguments(parser):
+    """
+    Añade a un parser las opciones del servidor simulado (compartidas con bench/run.py).
+    """
+    parser.add_argument('--assets', type=int, default=1000, help="Número de activos del inventario (por defecto: 1000).")
+    parser.add_argument('--requesters', type=int, default=200, help="Número de usuarios (por defecto: 200).")
+    parser.add_argument('--departments', type=int, default=20, help="Número de departamentos (por defecto: 20).")
+    parser.add_argument('--asset-types', type=int, default=8, help="Número de tipos de activos (por defecto: 8).")
+    parser.add_argument('--locations', type=int, default=15, help="Número de ubicaciones (por defecto: 15).")
+    parser.add_argument('--latency', type=float, default=20.0, help="Latencia de cada respuesta en milisegundos (por defecto: 20).")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Variación aleatoria de la latencia en milisegundos (por defecto: 0).")
+    parser.add_argument('--rate-limit', type=int, default=100000, help="Peticiones por minuto antes de responder 429 (por defecto: 100000).")
+    parser.add_argument('--throttle-every', type=int, default=0, help="Responder 429 a una de cada N peticiones (por defecto: nunca).")
+    parser.add_argument('--no-gzip', action='store_true', help="No comprimir las respuestas.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita la API de Freshservice para pruebas de rendimiento.")
+    parser.add_argument('--host', default='127.0.0.1', help="Dirección en la que escuchar (por defecto: 127.0.0.1).")
+    parser.add_argument('--port', type=int, default=8765, help="Puerto en el que escuchar (por defecto: 8765).")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    fake = build_server(args)
+    print(f"API simulada de Freshservice en {fake.base_url} ({args.assets} activos)")
+    print(f"Usa: FRESHSERVICE_BASE_URL={fake.base_url}")
+    try:
+        fake.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
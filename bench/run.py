@@ -0,0 +1,208 @@
+"""
+Banco de pruebas de rendimiento de extremo a extremo.
+
+Arranca el servidor simulado de bench/fakeserver.py, ejecuta invocaciones
+representativas de fsmanage.py, fssearch.py y fssync.py contra él (cada una en
+su propio proceso) y muestra para cada escenario el tiempo total, las
+peticiones hechas a la API (total y por activo), las respuestas 429 y el pico
+de memoria (RSS) del proceso.
+
+Uso:
+    python -m bench.run                          # Todos los escenarios
+    python -m bench.run -k fsmanage --ids 500    # Solo los escenarios que contienen 'fsmanage'
+    python -m bench.run --json resultados.json   # Guardar los resultados
+    python -m bench.run --baseline resultados.json --tolerance 0.2
+
+Con --baseline se comparan los resultados con una ejecución anterior y el
+proceso termina con código 1 si algún escenario hace más peticiones o es más
+lento o consume más memoria de lo permitido por la tolerancia.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.fakeserver import Dataset, FakeFreshservice, add_server_arguments
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Opciones de fsmanage que piden todos los datos de cada activo
+FULL_REPORT = ['-a', '-d', '-t', '-l', '-u', '-s', '-n']
+
+
+def build_scenarios(args, dataset):
+    """
+    Devuelve la lista de escenarios: nombre, argumentos de la herramienta y número
+    de activos procesados (para calcular las peticiones por activo).
+    """
+    ids = f'1-{args.ids}'
+    user = dataset.requesters[0]
+    quiet = ['-v', 'false', '--no-cache']
+    return [
+        {'name': 'fsmanage-per-id', 'argv': ['fsmanage.py', '-i', ids, *FULL_REPORT, *quiet, '--fetch-mode', 'per-id', '-o', 'report.csv'], 'assets': args.ids},
+        {'name': 'fsmanage-per-id-w8', 'argv': ['fsmanage.py', '-i', ids, *FULL_REPORT, *quiet, '--fetch-mode', 'per-id', '-w', '8', '-o', 'report.csv'], 'assets': args.ids},
+        {'name': 'fsmanage-async-w32', 'argv': ['fsmanage.py', '-i', ids, *FULL_REPORT, *quiet, '--fetch-mode', 'per-id', '--engine', 'async', '-w', '32', '-o', 'report.csv'], 'assets': args.ids},
+        {'name': 'fsmanage-bulk-all', 'argv': ['fsmanage.py', '-i', f'1-{args.assets}', *FULL_REPORT, *quiet, '--fetch-mode', 'bulk', '-o', 'report.csv'], 'assets': args.assets},
+        {'name': 'fsmanage-components-w8', 'argv': ['fsmanage.py', '-i', ids, '-c', 'cpu', 'ram', *quiet, '-w', '8', '-o', 'report.xlsx'], 'assets': args.ids},
+        {'name': 'fssearch', 'argv': ['fssearch.py', '-sn', user['first_name'], user['last_name']], 'assets': None},
+        {'name': 'fssync-full', 'argv': ['fssync.py', '--db', 'mirror.sqlite3', '--full'], 'assets': args.assets},
+        {'name': 'fssync-incremental', 'argv': ['fssync.py', '--db', 'mirror.sqlite3'], 'assets': None},
+    ]
+
+
+def run_process(argv, env, cwd):
+    """
+    Ejecuta una herramienta y mide su tiempo y su pico de memoria.
+
+    :return: (código de salida, segundos, pico de RSS en MB o None si no se puede medir).
+    """
+    command = [sys.executable, os.path.join(REPO_DIR, argv[0]), *argv[1:]]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if hasattr(os, 'wait4'):
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        stderr = process.stderr.read()
+        process.stderr.close()
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    else:  # Windows: sin medición de memoria
+        _, stderr = process.communicate()
+        elapsed = time.perf_counter() - start
+        peak_rss = None
+    if process.returncode != 0:
+        print(stderr.decode('utf-8', 'replace'), file=sys.stderr)
+    return process.returncode, elapsed, peak_rss
+
+
+def run_scenario(scenario, fake, env, cwd, repeat):
+    """
+    Ejecuta un escenario `repeat` veces y resume sus métricas (mediana del tiempo,
+    peticiones de la última ejecución y pico de memoria máximo).
+    """
+    times = []
+    peaks = []
+    stats = {}
+    for _ in range(repeat):
+        fake.reset_stats()
+        returncode, elapsed, peak_rss = run_process(scenario['argv'], env, cwd)
+        if returncode != 0:
+            raise RuntimeError(f"El escenario {scenario['name']} terminó con código {returncode}")
+        times.append(elapsed)
+        if peak_rss is not None:
+            peaks.append(peak_rss)
+        stats = fake.stats()
+    requests = stats.get('total', 0)
+    assets = scenario['assets']
+    return {
+        'name': scenario['name'],
+        'wall_time': round(statistics.median(times), 3),
+        'requests': requests,
+        'requests_per_asset': round(requests / assets, 3) if assets else None,
+        'throttled': stats.get('throttled', 0),
+        'peak_rss_mb': round(max(peaks), 1) if peaks else None,
+        'endpoints': {name: count for name, count in sorted(stats.items()) if name not in ('total', 'throttled')},
+    }
+
+
+def print_results(results):
+    """
+    Muestra los resultados en forma de tabla.
+    """
+    header = f"{'Escenario':<24} {'Tiempo (s)':>10} {'Peticiones':>10} {'Pet./activo':>11} {'429':>5} {'RSS (MB)':>9}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        per_asset = '-' if result['requests_per_asset'] is None else f"{result['requests_per_asset']:.2f}"
+        rss = '-' if result['peak_rss_mb'] is None else f"{result['peak_rss_mb']:.1f}"
+        print(f"{result['name']:<24} {result['wall_time']:>10.2f} {result['requests']:>10} {per_asset:>11} {result['throttled']:>5} {rss:>9}")
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Compara los resultados con una ejecución anterior.
+
+    :return: Lista de mensajes con las regresiones encontradas.
+    """
+    previous = {result['name']: result for result in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        old = previous.get(result['name'])
+        if old is None:
+            continue
+        name = result['name']
+        if result['requests'] > old['requests']:  # Las peticiones son deterministas: cualquier aumento es una regresión
+            regressions.append(f"{name}: peticiones {old['requests']} -> {result['requests']}")
+        if result['wall_time'] > old['wall_time'] * (1 + tolerance):
+            regressions.append(f"{name}: tiempo {old['wall_time']:.2f}s -> {result['wall_time']:.2f}s")
+        if result['peak_rss_mb'] and old.get('peak_rss_mb') and result['peak_rss_mb'] > old['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{name}: memoria {old['peak_rss_mb']:.1f} MB -> {result['peak_rss_mb']:.1f} MB")
+    return regressions
+
+
+def main(args):
+    dataset = Dataset(
+        assets=args.assets,
+        requesters=args.requesters,
+        departments=args.departments,
+        asset_types=args.asset_types,
+        locations=args.locations,
+    )
+    fake = FakeFreshservice(
+        dataset,
+        latency=args.latency / 1000.0,
+        jitter=args.jitter / 1000.0,
+        rate_limit=args.rate_limit,
+        throttle_every=args.throttle_every,
+        gzip_responses=not args.no_gzip,
+    ).start()
+
+    scenarios = [s for s in build_scenarios(args, dataset) if not args.keyword or args.keyword in s['name']]
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix='fsbench-') as workdir:
+            env = dict(os.environ)
+            env['FRESHSERVICE_BASE_URL'] = fake.base_url
+            env['HOME'] = workdir  # Cachés y réplicas aisladas en el directorio temporal
+            env['USERPROFILE'] = workdir
+            for scenario in scenarios:
+                print(f"Ejecutando {scenario['name']}...", file=sys.stderr)
+                results.append(run_scenario(scenario, fake, env, workdir, args.repeat))
+    finally:
+        fake.stop()
+
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'config': vars(args), 'results': results}, file, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegresiones respecto a la referencia:")
+            for message in regressions:
+                print(f"  - {message}")
+            return 1
+        print("\nSin regresiones respecto a la referencia.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento de las herramientas contra la API simulada.")
+    add_server_arguments(parser)
+    parser.add_argument('--ids', type=int, default=200, help="Activos que se piden en los escenarios por ID (por defecto: 200).")
+    parser.add_argument('--repeat', type=int, default=1, help="Repeticiones de cada escenario; se usa la mediana del tiempo (por defecto: 1).")
+    parser.add_argument('-k', '--keyword', help="Ejecutar solo los escenarios cuyo nombre contiene este texto.")
+    parser.add_argument('--json', help="Archivo donde guardar los resultados.")
+    parser.add_argument('--baseline', help="Resultados anteriores (--json) con los que comparar.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Margen permitido en tiempo y memoria frente a la referencia (por defecto: 0.2).")
+    args = parser.parse_args()
+    sys.exit(main(args))
@@ -0,0 +1,181 @@
+"""
+Prueba de rendimiento del índice local de usuarios (fscore/requester_index.py).
+
+Genera un directorio sintético de usuarios (por defecto, 50.000) con nombres
+de pila muy repetidos y dos apellidos, como en un directorio real, y mide:
+- La construcción del índice en memoria.
+- El guardado y la carga desde disco (lo que tarda fssearch.py --index en estar listo).
+- La primera búsqueda con erratas, que construye el índice de trigramas.
+- La latencia de search() para cada tipo de búsqueda: nombre exacto, prefijo
+  de 3 letras, palabra muy común, nombre parcial ("raf ace"), nombre con una
+  errata (búsqueda por trigramas) y principio del correo.
+
+Uso:
+    python -m bench.search                        # 50.000 usuarios, presupuesto de 1 ms
+    python -m bench.search --users 200000 --queries 500
+    python -m bench.search --budget-ms 0.5 --json busquedas.json
+
+El proceso termina con código 1 si el p95 de algún tipo de búsqueda supera el
+presupuesto (--budget-ms). Las búsquedas con erratas, que solo recurren a los
+trigramas cuando no hay coincidencias exactas ni por prefijo, tienen su propio
+presupuesto (--fuzzy-budget-ms).
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from bench.fakeserver import FIRST_NAMES, LAST_NAMES
+from fscore.requester_index import RequesterIndex
+
+# Tipos de búsqueda que se resuelven con el índice de trigramas
+FUZZY_KINDS = ('errata',)
+
+# Sílabas con las que se generan apellidos adicionales
+SYLLABLES = ['ba', 'ca', 'do', 'fer', 'ga', 'la', 'lo', 'ma', 'mon', 'na', 'ra', 'rre', 'san', 'te', 'to', 'val', 'ver', 'za']
+
+
+def generate_users(count, seed=1):
+    """
+    Genera usuarios sintéticos: nombre de pila de FIRST_NAMES (a veces compuesto)
+    y dos apellidos de un conjunto de unos miles.
+    """
+    rng = random.Random(seed)
+    surnames = list(LAST_NAMES)
+    while len(surnames) < 3000:
+        surname = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        if surname not in surnames:
+            surnames.append(surname)
+    users = []
+    for i in range(1, count + 1):
+        first_name = rng.choice(FIRST_NAMES)
+        if rng.random() < 0.1:
+            first_name += ' ' + rng.choice(FIRST_NAMES)
+        users.append({
+            'id': 5000 + i,
+            'first_name': first_name,
+            'last_name': f'{rng.choice(surnames)} {rng.choice(surnames)}',
+            'primary_email': f'usuario{i}@example.com',
+        })
+    return users
+
+
+def _typo(text, rng):
+    """
+    Sustituye una letra de un texto (sin tocar la primera) por otra.
+    """
+    position = rng.randrange(1, len(text))
+    while text[position] == ' ':
+        position = rng.randrange(1, len(text))
+    return text[:position] + rng.choice('aeioulnrst') + text[position + 1:]
+
+
+def generate_queries(users, count, seed=2):
+    """
+    Genera count búsquedas de cada tipo a partir de usuarios existentes.
+
+    :return: Diccionario tipo de búsqueda -> lista de textos.
+    """
+    rng = random.Random(seed)
+    sample = [rng.choice(users) for _ in range(count)]
+    return {
+        'exacta': [f"{user['first_name']} {user['last_name']}" for user in sample],
+        'prefijo': [rng.choice(user['last_name'].split())[:3] for user in sample],
+        'palabra común': [rng.choice(FIRST_NAMES) for _ in sample],
+        'parcial': [f"{user['first_name'][:3]} {user['last_name'][:3]}" for user in sample],
+        'errata': [_typo(f"{user['first_name']} {user['last_name']}", rng) for user in sample],
+        'correo': [user['primary_email'].split('@')[0][:9] for user in sample],
+    }
+
+
+def measure_queries(index, queries, limit):
+    """
+    Ejecuta cada búsqueda y devuelve sus duraciones en milisegundos.
+    """
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, limit=limit)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main(args):
+    users = generate_users(args.users)
+    queries = generate_queries(users, args.queries)
+
+    start = time.perf_counter()
+    index = RequesterIndex(users)
+    build_ms = (time.perf_counter() - start) * 1000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'requesters.json.gz')
+        start = time.perf_counter()
+        index.save(path)
+        save_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        index = RequesterIndex.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+    # La primera búsqueda aproximada construye el índice de trigramas
+    start = time.perf_counter()
+    index.search(queries['errata'][0], limit=args.limit)
+    trigrams_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Usuarios: {len(index)}")
+    print(f"Construcción: {build_ms:.0f} ms  Guardado: {save_ms:.0f} ms  Carga: {load_ms:.0f} ms  Primera búsqueda con erratas: {trigrams_ms:.0f} ms")
+    header = f"{'Búsqueda':<15} {'Media (ms)':>10} {'p50':>8} {'p95':>8} {'Máx.':>8}"
+    print(header)
+    print('-' * len(header))
+    results = []
+    for kind, texts in queries.items():
+        measure_queries(index, texts[:10], args.limit)  # Calentamiento
+        times = sorted(measure_queries(index, texts, args.limit))
+        result = {
+            'kind': kind,
+            'mean_ms': round(statistics.mean(times), 3),
+            'p50_ms': round(times[len(times) // 2], 3),
+            'p95_ms': round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+            'max_ms': round(times[-1], 3),
+        }
+        results.append(result)
+        print(f"{kind:<15} {result['mean_ms']:>10.3f} {result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f} {result['max_ms']:>8.3f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({
+                'config': vars(args),
+                'build_ms': round(build_ms, 1),
+                'save_ms': round(save_ms, 1),
+                'load_ms': round(load_ms, 1),
+                'first_fuzzy_ms': round(trigrams_ms, 1),
+                'results': results,
+            }, file, indent=2, ensure_ascii=False)
+
+    slow = []
+    for result in results:
+        budget = args.fuzzy_budget_ms if result['kind'] in FUZZY_KINDS else args.budget_ms
+        if budget and result['p95_ms'] > budget:
+            slow.append(f"{result['kind']}: p95 {result['p95_ms']:.3f} ms > {budget} ms")
+    if slow:
+        print("\nBúsquedas por encima del presupuesto:")
+        for message in slow:
+            print(f"  - {message}")
+        return 1
+    print("\nBúsquedas dentro del presupuesto.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide la latencia de las búsquedas en el índice local de usuarios.")
+    parser.add_argument('--users', type=int, default=50000, help="Usuarios del directorio sintético (por defecto: 50000).")
+    parser.add_argument('--queries', type=int, default=200, help="Búsquedas de cada tipo (por defecto: 200).")
+    parser.add_argument('--limit', type=int, default=10, help="Resultados por búsqueda, como fssearch.py --max-results (por defecto: 10).")
+    parser.add_argument('--budget-ms', type=float, default=1.0, help="p95 máximo de cada tipo de búsqueda, en ms (por defecto: 1; 0 para no comprobarlo).")
+    parser.add_argument('--fuzzy-budget-ms', type=float, default=10.0, help="p95 máximo de las búsquedas con erratas, en ms (por defecto: 10; 0 para no comprobarlo).")
+    parser.add_argument('--json', help="Archivo donde guardar los resultados.")
+    args = parser.parse_args()
+    sys.exit(main(args))
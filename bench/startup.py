@@ -0,0 +1,141 @@
+"""
+Prueba del tiempo de arranque de las herramientas.
+
+Mide cuánto tarda en arrancar cada herramienta (python herramienta.py --help)
+por encima del propio intérprete y, con python -X importtime, comprueba que al
+arrancar no se cargan los módulos pesados que solo necesitan algunas
+ejecuciones (el motor asíncrono, la caché, la réplica, el informe en Excel...).
+Para cada herramienta muestra también los módulos que más tardan en importarse.
+
+Uso:
+    python -m bench.startup                          # Todas las herramientas
+    python -m bench.startup --budget-ms 150          # Presupuesto de arranque (por defecto: 200 ms)
+    python -m bench.startup --json arranque.json     # Guardar los resultados
+
+El proceso termina con código 1 si alguna herramienta supera el presupuesto o
+carga al arrancar alguno de los módulos de LAZY_MODULES que no necesita.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Herramientas que se miden
+TOOLS = ('fsmanage.py', 'fssearch.py', 'fssync.py', 'fsserve.py', 'fsexport.py')
+
+# Módulos que solo deben cargarse cuando la ejecución los necesita
+LAZY_MODULES = ('asyncio', 'aiohttp', 'concurrent.futures', 'sqlite3', 'orjson', 'openpyxl', 'pyarrow', 'pandas', 'fscore.aio', 'fscore.mirror')
+
+# Excepciones por herramienta: fssync.py siempre trabaja con la réplica
+EAGER_ALLOWED = {'fssync.py': ('sqlite3', 'fscore.mirror')}
+
+
+def measure(command, repeat):
+    """
+    Ejecuta un comando varias veces y devuelve la mediana de su duración en milisegundos.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def import_times(arguments):
+    """
+    Ejecuta python -X importtime con los argumentos indicados.
+
+    :param arguments: Argumentos del intérprete (por ejemplo: ['fsmanage.py', '--help']).
+    :return: Diccionario módulo -> (tiempo acumulado en ms, es importación de primer nivel).
+    """
+    command = [sys.executable, '-X', 'importtime', *arguments]
+    process = subprocess.run(command, cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    modules = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        depth = (len(name) - len(name.lstrip())) // 2  # Cada nivel de anidamiento añade dos espacios
+        modules[name.strip()] = (int(cumulative) / 1000, depth == 0)
+    return modules
+
+
+def run_tool(tool, baseline, interpreter_modules, repeat, top):
+    """
+    Mide el arranque de una herramienta. Los módulos que el intérprete carga
+    por su cuenta (site, encodings...) no se atribuyen a la herramienta.
+    """
+    total = measure([sys.executable, os.path.join(REPO_DIR, tool), '--help'], repeat)
+    modules = {
+        name: value for name, value in import_times([os.path.join(REPO_DIR, tool), '--help']).items()
+        if name not in interpreter_modules
+    }
+    slowest = sorted(
+        ((name, ms) for name, (ms, direct) in modules.items() if direct),
+        key=lambda item: -item[1]
+    )[:top]
+    allowed = EAGER_ALLOWED.get(tool, ())
+    return {
+        'tool': tool,
+        'startup_ms': round(total, 1),
+        'overhead_ms': round(total - baseline, 1),
+        'modules': len(modules),
+        'slowest_imports': [{'module': name, 'cumulative_ms': round(ms, 1)} for name, ms in slowest],
+        'eager_heavy_modules': [name for name in LAZY_MODULES if name in modules and name not in allowed],
+    }
+
+
+def print_results(baseline, results):
+    """
+    Muestra los resultados en forma de tabla.
+    """
+    print(f"Intérprete sin herramientas: {baseline:.1f} ms")
+    header = f"{'Herramienta':<14} {'Arranque (ms)':>13} {'Sobre intérprete':>16} {'Módulos':>8}  Importaciones más lentas"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        slowest = ', '.join(f"{item['module']} ({item['cumulative_ms']:.0f} ms)" for item in result['slowest_imports'])
+        print(f"{result['tool']:<14} {result['startup_ms']:>13.1f} {result['overhead_ms']:>16.1f} {result['modules']:>8}  {slowest}")
+
+
+def main(args):
+    baseline = measure([sys.executable, '-c', 'pass'], args.repeat)
+    interpreter_modules = set(import_times(['-c', 'pass']))
+    tools = [tool for tool in TOOLS if not args.keyword or args.keyword in tool]
+    results = [run_tool(tool, baseline, interpreter_modules, args.repeat, args.top) for tool in tools]
+    print_results(baseline, results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'config': vars(args), 'baseline_ms': round(baseline, 1), 'results': results}, file, indent=2, ensure_ascii=False)
+
+    problems = []
+    for result in results:
+        if result['eager_heavy_modules']:
+            problems.append(f"{result['tool']}: carga al arrancar {', '.join(result['eager_heavy_modules'])}")
+        if args.budget_ms and result['overhead_ms'] > args.budget_ms:
+            problems.append(f"{result['tool']}: arranque {result['overhead_ms']:.0f} ms > presupuesto {args.budget_ms:.0f} ms")
+    if problems:
+        print("\nProblemas de arranque:")
+        for message in problems:
+            print(f"  - {message}")
+        return 1
+    print("\nArranque dentro del presupuesto.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque de las herramientas y las importaciones que lo causan.")
+    parser.add_argument('--budget-ms', type=float, default=200, help="Tiempo máximo de arranque por encima del intérprete, en ms (por defecto: 200; 0 para no comprobarlo).")
+    parser.add_argument('--repeat', type=int, default=10, help="Ejecuciones de cada herramienta; se usa la mediana (por defecto: 10).")
+    parser.add_argument('--top', type=int, default=3, help="Importaciones más lentas que se muestran por herramienta (por defecto: 3).")
+    parser.add_argument('-k', '--keyword', help="Medir solo las herramientas cuyo nombre contiene este texto.")
+    parser.add_argument('--json', help="Archivo donde guardar los resultados.")
+    args = parser.parse_args()
+    sys.exit(main(args))
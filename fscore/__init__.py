@@ -0,0 +1,3 @@
+"""
+Núcleo compartido por las herramientas de Freshservice (fsmanage.py y fssearch.py).
+"""
@@ -0,0 +1,133 @@
+"""
+Cliente HTTP asíncrono para la API de Freshservice.
+
+Usa un único pool de conexiones de aiohttp para multiplexar cientos de
+peticiones simultáneas sin crear un hilo del sistema operativo por petición.
+Comparte con fscore.client la configuración, el limitador de peticiones y la
+política de reintentos, y agrupa las peticiones idénticas simultáneas en una
+sola. Los errores se traducen a las excepciones de requests, así que se
+manejan igual que con el cliente síncrono.
+
+Requiere el paquete opcional aiohttp (pip install aiohttp).
+"""
+import asyncio
+import time
+
+import requests
+
+from fscore import client
+from fscore import cache as response_cache
+from fscore import fastjson
+from fscore import metrics
+from fscore.singleflight import AsyncSingleFlight
+
+
+class AsyncClient:
+    """
+    Sesión asíncrona con un pool de conexiones acotado a `limit` conexiones.
+    Se usa como gestor de contexto asíncrono o con open()/close().
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit or client.pool_size
+        self._session = None
+        self._flights = AsyncSingleFlight(on_shared=metrics.record_coalesced)  # Peticiones en curso de esta sesión
+
+    async def open(self):
+        """
+        Crea la sesión de aiohttp.
+
+        :raises ImportError: Si aiohttp no está instalado.
+        """
+        import aiohttp  # Dependencia opcional: solo se necesita con el motor asíncrono
+
+        if isinstance(client.timeout, tuple):
+            connect_timeout, read_timeout = client.timeout
+        else:
+            connect_timeout = read_timeout = client.timeout
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.limit),
+            auth=aiohttp.BasicAuth(client.api_key, ''),
+            headers={
+                'Accept': 'application/json',
+                'Accept-Encoding': 'gzip, deflate',  # Negociar respuestas comprimidas
+            },
+            timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+        )
+        return self
+
+    async def close(self):
+        """
+        Cierra la sesión y libera sus conexiones.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def get_json(self, path, params=None):
+        """
+        Realiza una petición GET y devuelve el cuerpo JSON de la respuesta.
+
+        Si otra corrutina ya está pidiendo la misma ruta con los mismos
+        parámetros, se espera a su respuesta en lugar de repetir la petición.
+        El resultado es el mismo objeto para todas, así que no debe modificarse.
+
+        :param path: Ruta relativa del endpoint o URL absoluta.
+        :param params: Parámetros de consulta opcionales.
+        :return: Diccionario con los datos de la respuesta.
+        :raises requests.exceptions.RequestException: Si la petición falla o el código de estado no es 2xx.
+        """
+        return await self._flights.do(response_cache.make_key(path, params), self._fetch_json, path, params)
+
+    async def _fetch_json(self, path, params):
+        """
+        Hace la consulta de get_json (caché persistente o API) sin agrupar peticiones.
+        """
+        import aiohttp
+
+        data = client.cache_lookup(path, params)  # Misma caché persistente que el cliente síncrono
+        if data is not None:
+            return data
+        url = client.build_url(path)
+        endpoint = metrics.endpoint_name(path)
+        attempt = 0
+        while True:
+            metrics.record_throttle(await client.limiter.acquire_async())  # Mismo presupuesto que el cliente síncrono
+            start = time.perf_counter()
+            try:
+                async with self._session.get(url, params=params) as response:
+                    metrics.record_request(endpoint, response.status, time.perf_counter() - start)
+                    retry_after = client.limiter.update(response.headers, response.status)
+                    if client.is_retryable_status(response.status) and attempt < client.max_retries:
+                        metrics.record_retry(response.status)
+                        delay = client.retry_delay(attempt, response.status, retry_after)
+                    elif response.status >= 400:
+                        # Respuesta de requests con el código de estado, como la de raise_for_status
+                        error_response = requests.Response()
+                        error_response.status_code = response.status
+                        error_response.reason = response.reason
+                        error_response.url = url
+                        raise requests.exceptions.HTTPError(
+                            f"{response.status} Error: {response.reason} for url: {url}", response=error_response
+                        )
+                    else:
+                        data = fastjson.loads(await response.read())
+                        break
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                metrics.record_request(endpoint, 'error', time.perf_counter() - start)
+                if attempt >= client.max_retries:
+                    raise requests.exceptions.ConnectionError(f"{type(e).__name__}: {e} for url: {url}") from e
+                metrics.record_retry('network')
+                delay = client.retry_delay(attempt, None, None)
+            except (aiohttp.ClientError, ValueError) as e:
+                raise requests.exceptions.RequestException(f"{type(e).__name__}: {e} for url: {url}") from e
+            await asyncio.sleep(delay)
+            attempt += 1
+        client.cache_store(path, params, data)
+        return data
@@ -0,0 +1,199 @@
+"""
+Caché persistente en disco de las respuestas de la API de Freshservice.
+
+Las respuestas se guardan en una base de datos SQLite (por defecto en
+~/.cache/fstools/responses.sqlite3) para que ejecuciones repetidas con IDs u
+opciones que se solapan lean de disco en lugar de volver a consultar la API.
+Cada tipo de endpoint tiene su propio tiempo de vida y, cuando el tamaño total
+supera el máximo configurado, se descartan primero las entradas más antiguas.
+Varios procesos pueden compartir el mismo archivo. La clave de cada respuesta
+incluye la URL base de la API, de modo que las cuentas (subdominios,
+FRESHSERVICE_BASE_URL o el servidor de pruebas) que comparten el archivo no
+reciben nunca las respuestas de otra.
+"""
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+from fscore import fastjson
+
+# Ubicación y tamaño máximo por defecto de la caché
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'fstools')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+# Segundos que se espera a que otro proceso libere la base de datos (por ejemplo,
+# los tramos de fsexport.py que comparten la caché de un tenant) antes de fallar
+BUSY_TIMEOUT = 30.0
+
+# Tiempo de vida (en segundos) de las respuestas de cada tipo de endpoint.
+# Los endpoints que no aparecen aquí no se guardan en la caché.
+ENDPOINT_TTLS = {
+    "asset": 6 * 3600,  # assets/{id}
+    "components": 24 * 3600,  # assets/{id}/components
+    "requester": 24 * 3600,  # requesters/{id}
+    "departments": 24 * 3600,  # Catálogos completos
+    "asset_types": 24 * 3600,
+    "locations": 24 * 3600,
+    "asset_type": 24 * 3600,  # asset_types/{id}
+    "location": 24 * 3600,  # locations/{id}
+}
+
+# Patrones que identifican el tipo de endpoint a partir de la ruta relativa
+_ENDPOINT_PATTERNS = [
+    ("components", re.compile(r'^assets/\d+/components/?$')),
+    ("asset", re.compile(r'^assets/\d+/?$')),
+    ("requester", re.compile(r'^requesters/\d+/?$')),
+    ("asset_type", re.compile(r'^asset_types/\d+/?$')),
+    ("location", re.compile(r'^locations/\d+/?$')),
+    ("departments", re.compile(r'^departments/?$')),
+    ("asset_types", re.compile(r'^asset_types/?$')),
+    ("locations", re.compile(r'^locations/?$')),
+]
+
+
+def classify(path):
+    """
+    Identifica el tipo de endpoint de una ruta relativa de la API.
+
+    :param path: Ruta relativa (por ejemplo: 'assets/143/components/').
+    :return: Nombre del tipo de endpoint o None si no se reconoce.
+    """
+    path = path.lstrip('/')
+    for endpoint, pattern in _ENDPOINT_PATTERNS:
+        if pattern.match(path):
+            return endpoint
+    return None
+
+
+def make_key(path, params=None, base_url=None):
+    """
+    Construye la clave de caché de una petición a partir de su ruta y sus parámetros.
+
+    :param path: Ruta relativa del endpoint.
+    :param params: Parámetros de consulta opcionales.
+    :param base_url: URL base de la API a la que se dirige la petición (ver client.get_base_url).
+    """
+    key = path.lstrip('/')
+    if base_url:
+        key = base_url.rstrip('/') + '/' + key
+    if params:
+        key += '|' + '&'.join(f'{name}={params[name]}' for name in sorted(params))
+    return key
+
+
+class ResponseCache:
+    """
+    Caché de respuestas JSON en SQLite, segura para usarse desde varios hilos.
+
+    :param path: Ruta del archivo SQLite.
+    :param max_bytes: Tamaño máximo (comprimido) del conjunto de respuestas guardadas.
+    :param ttls: Diccionario tipo de endpoint -> tiempo de vida en segundos.
+    :param refresh: Si es True no se leen las entradas existentes, pero sí se actualizan.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES, ttls=None, refresh=False):
+        if path is None:
+            path = os.path.join(DEFAULT_CACHE_DIR, 'responses.sqlite3')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        import sqlite3  # Solo se necesita si se activa la caché
+
+        self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')  # Lectores y un escritor a la vez, también entre procesos
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' endpoint TEXT NOT NULL,'
+            ' stored_at REAL NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' body BLOB NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)')
+        self._db.commit()
+        self._total_bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def is_cacheable(self, endpoint):
+        """
+        Indica si las respuestas de un tipo de endpoint se guardan en la caché.
+        """
+        return endpoint in self.ttls
+
+    def get(self, key, endpoint):
+        """
+        Devuelve la respuesta guardada para `key` si existe y no ha caducado.
+
+        :param key: Clave de la petición (ver make_key).
+        :param endpoint: Tipo de endpoint, que determina el tiempo de vida.
+        :return: Datos JSON de la respuesta o None.
+        """
+        if self.refresh or not self.is_cacheable(endpoint):
+            return None
+        with self._lock:
+            row = self._db.execute('SELECT stored_at, body FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        stored_at, body = row
+        if time.time() - stored_at > self.ttls[endpoint]:
+            return None  # Caducada: se sobrescribirá con la nueva respuesta
+        return fastjson.loads(zlib.decompress(body))
+
+    def put(self, key, endpoint, data):
+        """
+        Guarda la respuesta de una petición y aplica el límite de tamaño.
+
+        :param key: Clave de la petición (ver make_key).
+        :param endpoint: Tipo de endpoint.
+        :param data: Datos JSON de la respuesta.
+        """
+        if not self.is_cacheable(endpoint):
+            return
+        body = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        with self._lock:
+            previous = self._db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (key, endpoint, stored_at, size, body) VALUES (?, ?, ?, ?, ?)',
+                (key, endpoint, time.time(), len(body), body)
+            )
+            self._total_bytes += len(body) - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """
+        Elimina las entradas más antiguas hasta dejar la caché al 90 % del tamaño máximo.
+        Debe llamarse con el lock adquirido.
+        """
+        target = int(self.max_bytes * 0.9)
+        cursor = self._db.execute('SELECT key, size FROM responses ORDER BY stored_at')
+        to_delete = []
+        for key, size in cursor:
+            if self._total_bytes <= target:
+                break
+            to_delete.append((key,))
+            self._total_bytes -= size
+        self._db.executemany('DELETE FROM responses WHERE key = ?', to_delete)
+
+    def clear(self):
+        """
+        Elimina todas las entradas de la caché.
+        """
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+            self._total_bytes = 0
+
+    def close(self):
+        """
+        Cierra la base de datos.
+        """
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,116 @@
+"""
+Diario de progreso (checkpoint) para reanudar exportaciones largas.
+
+Cada activo completado se añade al final del archivo como una línea JSON con su
+ID y sus filas. Si la ejecución se interrumpe, al relanzarla con el mismo
+archivo se saltan los activos ya completados y sus filas se leen del diario.
+Solo se mantiene en memoria la posición de cada línea, no las filas.
+"""
+import json
+import os
+
+from fscore import fastjson
+
+
+class CheckpointMismatchError(ValueError):
+    """
+    El diario se creó con opciones distintas a las de la ejecución actual.
+    """
+
+
+class Checkpoint:
+    """
+    Diario append-only de activos completados.
+
+    :param path: Ruta del archivo del diario (se crea si no existe).
+    :param signature: Diccionario serializable con las opciones de la ejecución.
+        Un diario solo se reutiliza con las mismas opciones, para no mezclar
+        filas con columnas distintas.
+    :raises CheckpointMismatchError: Si el diario existente tiene otra firma.
+    """
+
+    def __init__(self, path, signature=None):
+        self.path = path
+        self.signature = signature
+        self._offsets = {}  # ID del activo -> posición de su línea en el archivo
+        self._reader = None
+        self._load()
+        self._file = open(path, 'ab')
+        if os.path.getsize(path) == 0:
+            self._append({"signature": signature})
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        valid_size = 0
+        with open(self.path, 'rb') as file:
+            offset = 0
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break  # Última línea incompleta: la ejecución se cortó mientras se escribía
+                try:
+                    entry = fastjson.loads(line)
+                except ValueError:
+                    break
+                if 'signature' in entry:
+                    if _canonical(entry['signature']) != _canonical(self.signature):
+                        raise CheckpointMismatchError(
+                            f"El checkpoint '{self.path}' se creó con otras opciones; usa otro archivo o bórralo."
+                        )
+                else:
+                    self._offsets[entry['asset_id']] = offset
+                offset += len(line)
+                valid_size = offset
+        if valid_size != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as file:
+                file.truncate(valid_size)  # Descartar el final corrupto para poder seguir añadiendo
+
+    def _append(self, entry):
+        self._file.write(json.dumps(entry, ensure_ascii=False, default=str).encode('utf-8') + b'\n')
+        self._file.flush()  # Que la línea sobreviva a una interrupción del proceso
+
+    def completed_ids(self):
+        """
+        Devuelve el conjunto de IDs de activos ya completados.
+        """
+        return set(self._offsets)
+
+    def rows(self, asset_id):
+        """
+        Lee del diario las filas de un activo completado.
+
+        :param asset_id: ID del activo.
+        :return: Lista de filas del activo.
+        """
+        if self._reader is None:
+            self._reader = open(self.path, 'rb')
+        self._reader.seek(self._offsets[asset_id])
+        return fastjson.loads(self._reader.readline())['rows']
+
+    def record(self, asset_id, rows):
+        """
+        Añade al diario un activo completado y sus filas.
+
+        :param asset_id: ID del activo.
+        :param rows: Lista de filas del activo.
+        """
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._append({"asset_id": asset_id, "rows": rows})
+        self._offsets[asset_id] = offset
+
+    def close(self):
+        """
+        Cierra el diario.
+        """
+        self._file.close()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def __len__(self):
+        return len(self._offsets)
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, default=str)
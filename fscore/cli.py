@@ -0,0 +1,79 @@
+"""
+Opciones de línea de comandos comunes a las herramientas (fsmanage.py, fssearch.py,
+fssync.py, fsserve.py y fsexport.py).
+
+Todas comparten el cliente HTTP y el registro de métricas, así que las
+opciones que los configuran (--tenant y --rate-limit) y las que muestran sus
+métricas (--stats y --stats-json) se definen y se aplican aquí una sola vez.
+"""
+from colorama import Fore
+
+from fscore import client
+from fscore import metrics
+from fscore import tenants
+
+
+def add_client_arguments(parser, tenant_options=True, rate_limit_help=None):
+    """
+    Añade a un parser de argparse las opciones comunes del cliente y de las métricas.
+
+    :param tenant_options: Si es False no se añaden --tenant ni --tenants-file (fsexport.py
+        define sus propias opciones para elegir varios tenants).
+    :param rate_limit_help: Texto de ayuda de --rate-limit, si la herramienta lo interpreta de otra forma.
+    """
+    if tenant_options:
+        parser.add_argument(
+            '--tenant',
+            help=f"{Fore.GREEN}Tenant del archivo de tenants con el que se trabaja (subdominio, clave de la API y límite de peticiones propios). Por defecto se usa la configuración de fscore/client.py."
+        )
+        parser.add_argument(
+            '--tenants-file',
+            metavar='ARCHIVO',
+            help=f"{Fore.GREEN}Archivo JSON con los tenants (por defecto: {tenants.DEFAULT_TENANTS_PATH})."
+        )
+    parser.add_argument(
+        '--rate-limit',
+        type=int,
+        help=rate_limit_help or f"{Fore.GREEN}Peticiones por minuto permitidas, compartidas por todos los hilos. Por defecto se ajusta automáticamente con las cabeceras de la API."
+    )
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help=f"{Fore.GREEN}Muestra al terminar un resumen de la ejecución: peticiones y latencias por endpoint, reintentos, esperas del limitador, aciertos de la caché y tiempo de cada etapa."
+    )
+    parser.add_argument(
+        '--stats-json',
+        metavar='ARCHIVO',
+        help=f"{Fore.GREEN}Guarda las métricas de la ejecución en un archivo JSON (por ejemplo: stats.json)."
+    )
+
+
+def apply_client_arguments(args):
+    """
+    Configura el cliente compartido con las opciones comunes ya interpretadas.
+
+    :param args: Resultado de parser.parse_args().
+    """
+    if args.tenant:
+        try:
+            tenant = tenants.get_tenant(args.tenant, args.tenants_file)
+        except tenants.TenantConfigError as e:
+            print(f"{Fore.RED}Error: {e}")
+            raise SystemExit(1)
+        tenants.use_tenant(tenant, args.rate_limit)
+    elif args.rate_limit:
+        client.configure(rate_per_minute=args.rate_limit)
+
+
+def report_metrics(args, data=None):
+    """
+    Muestra o guarda las métricas de la ejecución según --stats y --stats-json.
+
+    :param args: Resultado de parser.parse_args().
+    :param data: Métricas que se muestran (por defecto, las del registro global del proceso).
+    """
+    if args.stats:
+        metrics.print_report(data)
+    if args.stats_json:
+        metrics.write_json(args.stats_json, data)
+        print(f"{Fore.GREEN}Métricas guardadas en {args.stats_json}")
@@ -0,0 +1,390 @@
+"""
+Cliente HTTP compartido para la API de Freshservice.
+
+Centraliza la autenticación, la URL base y una única sesión con un pool de
+conexiones keep-alive, de modo que las peticiones consecutivas reutilizan la
+conexión TCP/TLS en lugar de negociar una nueva cada vez. Todas las peticiones
+pasan por un limitador común y se reintentan ante 429, 5xx y errores de red, y
+las peticiones idénticas simultáneas se agrupan en una sola.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+from colorama import Fore
+from requests.adapters import HTTPAdapter
+
+from fscore import cache as response_cache
+from fscore import fastjson
+from fscore import metrics
+from fscore.ratelimit import RateLimiter
+from fscore.singleflight import SingleFlight
+
+# Configuración de la API (único lugar donde se definen la clave y el subdominio)
+api_key = 'your_api_key'  # Reemplaza 'your_api_key' con tu clave real
+subdomain = 'subdomain'  # Subdominio de Freshservice
+
+# URL base alternativa de la API (por ejemplo, el servidor de pruebas de bench/fakeserver.py).
+# Si no se indica, se usa la del subdominio.
+base_url = os.environ.get('FRESHSERVICE_BASE_URL')
+
+# Configuración del pool de conexiones y de los tiempos de espera
+pool_size = 10  # Número máximo de conexiones keep-alive reutilizables
+timeout = (5, 30)  # Segundos de espera para conectar y para leer la respuesta
+max_retries = 5  # Reintentos ante respuestas 429/5xx o errores de red
+
+# Máximo de elementos por página que admite la API en los listados
+MAX_PER_PAGE = 100
+
+# Presupuesto de peticiones compartido por todos los hilos y corrutinas
+limiter = RateLimiter()
+
+_session = None
+_session_lock = threading.Lock()
+_cache = None  # Caché persistente de respuestas (desactivada por defecto)
+_flights = SingleFlight(on_shared=metrics.record_coalesced)  # Peticiones en curso, para que las idénticas simultáneas compartan respuesta
+
+
+def get_base_url():
+    """
+    Devuelve la URL base de la API v2 para el subdominio configurado, o la
+    URL alternativa indicada en FRESHSERVICE_BASE_URL.
+    """
+    if base_url:
+        return base_url.rstrip('/') + '/'
+    return f'https://{subdomain}.freshservice.com/api/v2/'
+
+
+def build_url(path):
+    """
+    Construye la URL completa de un endpoint a partir de su ruta relativa.
+
+    :param path: Ruta relativa (por ejemplo: 'assets/143') o URL absoluta.
+    :return: URL completa del endpoint.
+    """
+    if path.startswith('http://') or path.startswith('https://'):
+        return path
+    return get_base_url() + path.lstrip('/')
+
+
+def configure(key=None, domain=None, pool=None, request_timeout=None, rate_per_minute=None):
+    """
+    Modifica la configuración del cliente. La sesión actual se descarta para
+    que la siguiente petición se haga con los nuevos valores.
+
+    :param key: Clave de la API.
+    :param domain: Subdominio de Freshservice.
+    :param pool: Tamaño del pool de conexiones.
+    :param request_timeout: Tupla (conexión, lectura) en segundos o un único valor.
+    :param rate_per_minute: Peticiones por minuto permitidas. Si se indica, el limitador
+        deja de ajustarse con las cabeceras de la API.
+    """
+    global api_key, subdomain, pool_size, timeout, limiter
+    if key is not None:
+        api_key = key
+    if domain is not None:
+        subdomain = domain
+    if pool is not None:
+        pool_size = max(1, int(pool))
+    if request_timeout is not None:
+        timeout = request_timeout
+    if rate_per_minute is not None:
+        limiter = RateLimiter(rate_per_minute, adaptive=False)
+    close()
+
+
+def get_session():
+    """
+    Devuelve la sesión compartida, creándola la primera vez que se necesita.
+
+    :return: Objeto requests.Session con autenticación y pool configurados.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.auth = (api_key, '')
+                session.headers.update({
+                    'Accept': 'application/json',
+                    'Accept-Encoding': 'gzip, deflate',  # Negociar respuestas comprimidas
+                })
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def close():
+    """
+    Cierra la sesión compartida y libera sus conexiones.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def is_retryable_status(status_code):
+    """
+    Indica si un código de estado HTTP justifica reintentar la petición.
+    """
+    return status_code == 429 or status_code >= 500
+
+
+def retry_delay(attempt, status_code, retry_after):
+    """
+    Calcula la espera antes de reintentar una petición y avisa si se ha alcanzado el límite.
+
+    :param attempt: Número de reintento (empezando en 0).
+    :param status_code: Código de estado de la respuesta, o None si fue un error de red.
+    :param retry_after: Segundos indicados por la cabecera Retry-After, o None.
+    :return: Segundos de espera adicionales (el limitador ya aplica Retry-After).
+    """
+    if status_code == 429:
+        wait = retry_after if retry_after is not None else limiter.backoff_delay(attempt)
+        print(f"{Fore.YELLOW}Advertencia: Límite de solicitudes alcanzado. Esperando {wait:.0f} s antes de reintentar...")
+        if retry_after is not None:
+            return limiter.backoff_delay(0)  # Pequeño jitter para no reintentar todos a la vez
+    return limiter.backoff_delay(attempt)
+
+
+def get(path, params=None):
+    """
+    Realiza una petición GET a la API usando la sesión compartida.
+
+    Antes de cada intento se espera turno en el limitador compartido. Las
+    respuestas 429 y 5xx y los errores de conexión se reintentan (hasta
+    max_retries veces) con backoff exponencial y jitter.
+
+    :param path: Ruta relativa del endpoint o URL absoluta.
+    :param params: Parámetros de consulta opcionales.
+    :return: Objeto de respuesta de requests (la última, si se agotan los reintentos).
+    :raises requests.exceptions.RequestException: Si el error de red persiste tras los reintentos.
+    """
+    url = build_url(path)
+    endpoint = metrics.endpoint_name(path)
+    attempt = 0
+    while True:
+        metrics.record_throttle(limiter.acquire())
+        start = time.perf_counter()
+        try:
+            response = get_session().get(url, params=params, timeout=timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            metrics.record_request(endpoint, 'error', time.perf_counter() - start)
+            if attempt >= max_retries:
+                raise
+            metrics.record_retry('network')
+            time.sleep(retry_delay(attempt, None, None))
+            attempt += 1
+            continue
+        metrics.record_request(endpoint, response.status_code, time.perf_counter() - start)
+        retry_after = limiter.update(response.headers, response.status_code)
+        if not is_retryable_status(response.status_code) or attempt >= max_retries:
+            return response
+        metrics.record_retry(response.status_code)
+        time.sleep(retry_delay(attempt, response.status_code, retry_after))
+        attempt += 1
+
+
+def enable_cache(path=None, max_bytes=None, refresh=False):
+    """
+    Activa la caché persistente de respuestas en disco.
+
+    :param path: Ruta del archivo SQLite (por defecto en ~/.cache/fstools).
+    :param max_bytes: Tamaño máximo de la caché en bytes.
+    :param refresh: Si es True se ignoran las entradas guardadas y se vuelven a descargar.
+    :return: Instancia de ResponseCache activa.
+    """
+    global _cache
+    disable_cache()
+    _cache = response_cache.ResponseCache(
+        path, max_bytes or response_cache.DEFAULT_MAX_BYTES, refresh=refresh
+    )
+    return _cache
+
+
+def disable_cache():
+    """
+    Desactiva la caché persistente y cierra su base de datos.
+    """
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+def cache_lookup(path, params=None):
+    """
+    Busca en la caché persistente la respuesta de una petición.
+
+    :return: Datos JSON guardados o None si la caché está desactivada, no hay entrada o ha caducado.
+    """
+    if _cache is None:
+        return None
+    data = _cache.get(response_cache.make_key(path, params, get_base_url()), response_cache.classify(path))
+    metrics.record_cache(data is not None)
+    return data
+
+
+def is_cached(path, params=None):
+    """
+    Indica si la respuesta de una petición está en la caché persistente y sigue
+    vigente, sin registrarlo en las métricas (por ejemplo, para planificar una ejecución).
+    """
+    if _cache is None:
+        return False
+    return _cache.get(response_cache.make_key(path, params, get_base_url()), response_cache.classify(path)) is not None
+
+
+def cache_store(path, params, data):
+    """
+    Guarda en la caché persistente la respuesta de una petición, si está activada.
+    """
+    if _cache is not None:
+        _cache.put(response_cache.make_key(path, params, get_base_url()), response_cache.classify(path), data)
+
+
+def get_json(path, params=None):
+    """
+    Realiza una petición GET y devuelve el cuerpo JSON de la respuesta. Si la
+    caché persistente está activada, se usa la respuesta guardada cuando es válida.
+
+    :param path: Ruta relativa del endpoint o URL absoluta.
+    :param params: Parámetros de consulta opcionales.
+    :return: Diccionario con los datos de la respuesta.
+    :raises requests.exceptions.RequestException: Si la petición falla o el código de estado no es 2xx.
+    """
+    return get_page(path, params)[0]
+
+
+def get_page(path, params=None):
+    """
+    Igual que get_json, pero devuelve además la información de paginación de la respuesta.
+
+    Si otro hilo ya está pidiendo la misma ruta con los mismos parámetros, se
+    espera a su respuesta en lugar de repetir la petición. El resultado es el
+    mismo objeto para todos, así que no debe modificarse.
+
+    :param path: Ruta relativa del endpoint o URL absoluta.
+    :param params: Parámetros de consulta opcionales.
+    :return: Tupla (datos, URL de la página siguiente o None, total de elementos o None).
+        Las respuestas leídas de la caché no traen cabeceras, así que solo conservan el total del cuerpo.
+    :raises requests.exceptions.RequestException: Si la petición falla o el código de estado no es 2xx.
+    """
+    return _flights.do(response_cache.make_key(path, params), _fetch_page, path, params)
+
+
+def _fetch_page(path, params):
+    """
+    Hace la consulta de get_page (caché persistente o API) sin agrupar peticiones.
+    """
+    data = cache_lookup(path, params)
+    if data is not None:
+        return data, None, _body_total(data)
+    response = get(path, params)
+    response.raise_for_status()  # Lanza una excepción si el código de estado no es 2xx
+    try:
+        data = fastjson.loads(response.content)
+    except ValueError as e:
+        raise requests.exceptions.InvalidJSONError(f"{e} for url: {response.url}", response=response) from e
+    cache_store(path, params, data)
+    next_url = response.links.get('next', {}).get('url')
+    total = _body_total(data)
+    if total is None:
+        total = _int_or_none(response.headers.get('X-Total-Count'))
+    return data, next_url, total
+
+
+def _body_total(data):
+    """
+    Busca el total de elementos de un listado en el cuerpo de la respuesta
+    ('total' o 'meta.total_count', según el endpoint).
+    """
+    if not isinstance(data, dict):
+        return None
+    meta = data.get('meta')
+    if isinstance(meta, dict) and 'total_count' in meta:
+        return _int_or_none(meta['total_count'])
+    return _int_or_none(data.get('total'))
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_pages(path, key, params=None, per_page=MAX_PER_PAGE, read_ahead=1):
+    """
+    Recorre todas las páginas de un endpoint de listado o de búsqueda y devuelve
+    sus elementos en orden a medida que llegan.
+
+    Si la primera respuesta indica el total de elementos, el resto de páginas se
+    conoce de antemano y se piden en paralelo (hasta read_ahead a la vez, dentro
+    del presupuesto del limitador). Si no, se sigue la cabecera Link (rel="next")
+    o, en su defecto, se pide la página siguiente mientras lleguen completas.
+
+    :param path: Ruta relativa del endpoint (por ejemplo: 'requesters?query="..."').
+    :param key: Clave de la respuesta que contiene la lista (por ejemplo: 'requesters').
+    :param params: Parámetros de consulta adicionales.
+    :param per_page: Elementos por página (la API admite como máximo 100).
+    :param read_ahead: Número de páginas que se piden a la vez cuando se conoce el total.
+    :return: Generador con los elementos de todas las páginas.
+    :raises requests.exceptions.RequestException: Si alguna petición falla.
+    """
+    base_params = dict(params or {})
+    base_params['per_page'] = per_page
+    data, next_url, total = get_page(path, dict(base_params, page=1))
+    items = data.get(key) or []
+    yield from items
+
+    if total is not None:
+        last_page = -(-total // per_page)  # Redondeo hacia arriba
+        pages = range(2, last_page + 1)
+        if read_ahead <= 1 or len(pages) <= 1:
+            for page in pages:
+                yield from get_page(path, dict(base_params, page=page))[0].get(key) or []
+            return
+        from concurrent.futures import ThreadPoolExecutor  # Solo se necesita con lectura anticipada
+
+        with ThreadPoolExecutor(max_workers=read_ahead) as executor:
+            pending = deque()
+            for page in pages:
+                pending.append(executor.submit(get_page, path, dict(base_params, page=page)))
+                if len(pending) >= read_ahead:
+                    yield from pending.popleft().result()[0].get(key) or []
+            while pending:
+                yield from pending.popleft().result()[0].get(key) or []
+        return
+
+    page = 1
+    while next_url or len(items) >= per_page:  # Sin cabecera Link, la última página viene incompleta
+        page += 1
+        if next_url:
+            data, next_url, _ = get_page(next_url)
+        else:
+            data, next_url, _ = get_page(path, dict(base_params, page=page))
+        items = data.get(key) or []
+        if not items:
+            return
+        yield from items
+
+
+def get_paginated(path, key, params=None, per_page=MAX_PER_PAGE):
+    """
+    Recorre todas las páginas de un endpoint de listado de la API.
+
+    :param path: Ruta relativa del endpoint (por ejemplo: 'departments').
+    :param key: Clave de la respuesta que contiene la lista (por ejemplo: 'departments').
+    :param params: Parámetros de consulta adicionales.
+    :param per_page: Elementos por página (la API admite como máximo 100).
+    :return: Generador con los elementos de todas las páginas.
+    :raises requests.exceptions.RequestException: Si alguna petición falla.
+    """
+    return iter_pages(path, key, params, per_page)
@@ -0,0 +1,450 @@
+"""
+Escritura en streaming de los informes (xlsx, csv, json, jsonl, parquet y feather).
+
+Las filas se escriben a medida que se producen, sin acumular el informe
+completo en memoria. Los formatos JSON se escriben directamente en el archivo
+final. Para xlsx y csv, cuyas columnas solo se conocen cuando se han visto
+todas las filas, las filas se vuelcan a un archivo temporal mientras se
+calculan las columnas y sus anchos; al cerrar se genera el archivo final de
+una sola pasada (en xlsx con el modo write-only de openpyxl y el formato ya
+aplicado, sin volver a cargar el libro).
+
+Para exportaciones grandes (por ejemplo, los componentes de todo el inventario,
+que superan el límite de filas de Excel) están los formatos columnares Parquet
+y Arrow IPC (Feather), que requieren pyarrow: las columnas se escriben con su
+tipo, las de valores repetidos (departamento, tipo, ubicación, sistema
+operativo...) con codificación de diccionario, y el archivo se genera por
+bloques de filas y comprimido.
+"""
+import csv
+import importlib.util
+from abc import ABC, abstractmethod
+import json
+import os
+import tempfile
+
+# Extensiones admitidas y el formato que les corresponde
+FORMATS = {
+    '.xlsx': 'xlsx',
+    '.csv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+}
+
+# Dependencias opcionales de cada formato (paquete de pip -> módulo)
+DEPENDENCIES = {
+    'xlsx': ('openpyxl', 'openpyxl'),
+    'parquet': ('pyarrow', 'pyarrow'),
+    'feather': ('pyarrow', 'pyarrow'),
+}
+
+# Formatos columnares: filas por bloque (grupo de filas en Parquet) y compresión
+ARROW_CHUNK_ROWS = 65536
+ARROW_COMPRESSION = 'zstd'
+# Una columna de texto se codifica con diccionario si tiene como mucho este número de
+# valores distintos y cada valor aparece de media al menos dos veces
+DICTIONARY_MAX_VALUES = 10000
+# Tipo de Arrow (nombre en pyarrow) de cada tipo de columna deducido; las columnas sin valores se guardan como texto
+ARROW_TYPES = {'int': 'int64', 'float': 'float64', 'bool': 'bool_', 'string': 'string', None: 'string'}
+
+# Estilos del informe en Excel
+HEADER_COLOR = "003366"  # Azul oscuro
+HEADER_FONT_COLOR = "FFFFFF"  # Blanco
+ROW_COLOR = "D9E1F2"  # Azul claro
+
+
+def get_format(path):
+    """
+    Devuelve el formato de salida que corresponde a la extensión de un archivo.
+
+    :param path: Ruta del archivo de salida.
+    :return: 'xlsx', 'csv', 'json', 'jsonl', 'parquet' o 'feather', o None si la extensión no está admitida.
+    """
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def missing_dependency(path):
+    """
+    Comprueba, sin importarla, que está instalada la dependencia opcional que
+    necesita el formato de un archivo de salida, para avisar antes de consultar la API.
+
+    :param path: Ruta del archivo de salida.
+    :return: Nombre del paquete que falta (por ejemplo: 'pyarrow') o None.
+    """
+    package, module = DEPENDENCIES.get(get_format(path), (None, None))
+    if module and importlib.util.find_spec(module) is None:
+        return package
+    return None
+
+
+def open_writer(path):
+    """
+    Crea el escritor adecuado para la extensión del archivo de salida.
+
+    :param path: Ruta del archivo de salida.
+    :return: Instancia de escritor con write_row() y close().
+    :raises ValueError: Si la extensión no está admitida.
+    """
+    writers = {
+        'xlsx': XlsxWriter,
+        'csv': CsvWriter,
+        'json': JsonWriter,
+        'jsonl': JsonlWriter,
+        'parquet': ParquetWriter,
+        'feather': FeatherWriter,
+    }
+    output_format = get_format(path)
+    if output_format is None:
+        raise ValueError(f"Formato de salida no admitido: '{path}'. Usa una de estas extensiones: {', '.join(FORMATS)}")
+    return writers[output_format](path)
+
+
+def _json_default(value):
+    return str(value)
+
+
+class _Writer(ABC):
+    """
+    Base común de los escritores. Se puede usar como gestor de contexto.
+    Cada formato implementa _write (y close si tiene que terminar el archivo).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows_written = 0
+
+    def write_row(self, row):
+        """
+        Escribe una fila (diccionario columna -> valor).
+        """
+        self._write(row)
+        self.rows_written += 1
+
+    @abstractmethod
+    def _write(self, row):
+        """
+        Escribe una fila en el archivo de salida (o en el temporal).
+        """
+
+    def close(self):
+        """
+        Termina el archivo de salida. Si no se ha escrito ninguna fila no se crea el archivo.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonlWriter(_Writer):
+    """
+    Escribe una fila JSON por línea directamente en el archivo final.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = None
+
+    def _write(self, row):
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(json.dumps(row, ensure_ascii=False, default=_json_default))
+        self._file.write('\n')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JsonWriter(_Writer):
+    """
+    Escribe una lista JSON de filas, elemento a elemento.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._file = None
+
+    def _write(self, row):
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write('[\n')
+        else:
+            self._file.write(',\n')
+        self._file.write(json.dumps(row, ensure_ascii=False, default=_json_default))
+
+    def close(self):
+        if self._file is not None:
+            self._file.write('\n]\n')
+            self._file.close()
+            self._file = None
+
+
+class _SpooledWriter(_Writer):
+    """
+    Base de los formatos que necesitan conocer todas las columnas antes de
+    escribir: las filas se guardan en un archivo temporal (una por línea)
+    mientras se calculan las columnas, en orden de aparición, y el ancho
+    máximo de cada una.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._spool = None
+        self.columns = {}  # Columna -> ancho máximo del contenido (incluido el encabezado)
+
+    def _write(self, row):
+        if self._spool is None:
+            self._spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+        for column, value in row.items():
+            width = self.columns.get(column)
+            if width is None:
+                width = len(str(column))
+            if value:
+                width = max(width, len(str(value)))
+            self.columns[column] = width
+        self._spool.write(json.dumps(row, ensure_ascii=False, default=_json_default))
+        self._spool.write('\n')
+
+    def _spooled_rows(self):
+        self._spool.seek(0)
+        for line in self._spool:
+            yield json.loads(line)
+
+    def close(self):
+        if self._spool is None:
+            return
+        try:
+            self._finalize()
+        finally:
+            self._spool.close()
+            self._spool = None
+
+    @abstractmethod
+    def _finalize(self):
+        """
+        Genera el archivo final a partir de las filas guardadas (ver _spooled_rows)
+        y de las columnas calculadas. Solo se llama si se ha escrito alguna fila.
+        """
+
+
+class CsvWriter(_SpooledWriter):
+    """
+    Escribe un CSV con todas las columnas que aparecen en alguna fila.
+    """
+
+    def _finalize(self):
+        with open(self.path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(self.columns), restval='')
+            writer.writeheader()
+            for row in self._spooled_rows():
+                writer.writerow(row)
+
+
+class XlsxWriter(_SpooledWriter):
+    """
+    Escribe un libro de Excel con el formato del informe:
+    - Ancho de cada columna ajustado al contenido más largo.
+    - Encabezados con fondo azul oscuro y fuente blanca en negrita.
+    - Resto de filas con fondo azul claro.
+    """
+
+    def _finalize(self):
+        from openpyxl import Workbook  # Solo se necesita al generar un informe en Excel
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Font, PatternFill
+        from openpyxl.utils import get_column_letter
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+
+        # Los anchos deben fijarse antes de escribir la primera fila
+        columns = list(self.columns)
+        for index, column in enumerate(columns, start=1):
+            ws.column_dimensions[get_column_letter(index)].width = self.columns[column] + 2  # Añadir unos caracteres extra
+
+        header_fill = PatternFill(start_color=HEADER_COLOR, end_color=HEADER_COLOR, fill_type="solid")
+        header_font = Font(color=HEADER_FONT_COLOR, bold=True)
+        header_alignment = Alignment(horizontal="center", vertical="center")
+        row_fill = PatternFill(start_color=ROW_COLOR, end_color=ROW_COLOR, fill_type="solid")
+
+        header = []
+        for column in columns:
+            cell = WriteOnlyCell(ws, value=column)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = header_alignment
+            header.append(cell)
+        ws.append(header)
+
+        for row in self._spooled_rows():
+            cells = []
+            for column in columns:
+                value = row.get(column)
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value, ensure_ascii=False)
+                cell = WriteOnlyCell(ws, value=value)
+                cell.fill = row_fill
+                cells.append(cell)
+            ws.append(cells)
+
+        wb.save(self.path)
+
+
+class _ArrowWriter(_SpooledWriter):
+    """
+    Base de los formatos columnares. Mientras se vuelcan las filas se deduce el
+    tipo de cada columna (entero, decimal, booleano o texto) y se cuentan sus
+    valores distintos; al cerrar, las filas se convierten en bloques de
+    ARROW_CHUNK_ROWS con un esquema fijo y se escriben comprimidas.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._kinds = {}  # Columna -> 'int', 'float', 'bool', 'string' o None (solo nulos)
+        self._values = {}  # Columna -> valores distintos como texto (None si superan DICTIONARY_MAX_VALUES)
+        self._counts = {}  # Columna -> número de valores no nulos
+
+    def _write(self, row):
+        super()._write(row)
+        for column, value in row.items():
+            kind = _value_kind(value)
+            previous = self._kinds.get(column)
+            self._kinds[column] = _merge_kinds(previous, kind)
+            if kind is None:
+                continue
+            self._counts[column] = self._counts.get(column, 0) + 1
+            values = self._values.setdefault(column, set())
+            if values is not None:
+                values.add(_to_text(value))
+                if len(values) > DICTIONARY_MAX_VALUES:
+                    self._values[column] = None  # Demasiados valores distintos: texto sin diccionario
+
+    def _schema(self):
+        """
+        Construye el esquema del archivo y los diccionarios de las columnas que se codifican con ellos.
+        """
+        import pyarrow as pa
+
+        fields = []
+        dictionaries = {}
+        for column in self.columns:
+            kind = self._kinds.get(column)
+            values = self._values.get(column)
+            if kind == 'string' and values is not None and len(values) * 2 <= self._counts.get(column, 0):
+                # Diccionario fijo para todos los bloques: Arrow IPC no admite cambiarlo entre bloques
+                dictionaries[column] = pa.array(sorted(values), type=pa.string())
+                fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+            else:
+                fields.append(pa.field(column, getattr(pa, ARROW_TYPES[kind])()))
+        return pa.schema(fields), dictionaries
+
+    def _batches(self, schema, dictionaries):
+        """
+        Lee las filas volcadas y las devuelve en bloques (RecordBatch) de ARROW_CHUNK_ROWS filas.
+        """
+        import pyarrow as pa
+
+        indexes = {column: {value: index for index, value in enumerate(dictionary.to_pylist())} for column, dictionary in dictionaries.items()}
+        chunk = []
+        for row in self._spooled_rows():
+            chunk.append(row)
+            if len(chunk) >= ARROW_CHUNK_ROWS:
+                yield _record_batch(pa, chunk, schema, dictionaries, indexes)
+                chunk = []
+        if chunk:
+            yield _record_batch(pa, chunk, schema, dictionaries, indexes)
+
+
+class ParquetWriter(_ArrowWriter):
+    """
+    Escribe un archivo Parquet con un grupo de filas por bloque.
+    """
+
+    def _finalize(self):
+        import pyarrow.parquet as pq  # Solo se necesita al generar un informe en Parquet
+
+        schema, dictionaries = self._schema()
+        with pq.ParquetWriter(self.path, schema, compression=ARROW_COMPRESSION) as writer:
+            for batch in self._batches(schema, dictionaries):
+                writer.write_batch(batch, row_group_size=ARROW_CHUNK_ROWS)
+
+
+class FeatherWriter(_ArrowWriter):
+    """
+    Escribe un archivo Arrow IPC (Feather v2), que se carga sin conversión (por ejemplo, con pyarrow o pandas).
+    """
+
+    def _finalize(self):
+        import pyarrow as pa  # Solo se necesita al generar un informe en Feather
+
+        schema, dictionaries = self._schema()
+        options = pa.ipc.IpcWriteOptions(compression=ARROW_COMPRESSION)
+        with pa.OSFile(self.path, 'wb') as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+            for batch in self._batches(schema, dictionaries):
+                writer.write_batch(batch)
+
+
+def _value_kind(value):
+    """
+    Clasifica un valor de una fila según el tipo de columna que necesita.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    return 'string'
+
+
+def _merge_kinds(previous, kind):
+    """
+    Combina el tipo deducido de una columna con el de un nuevo valor.
+    """
+    if previous is None or previous == kind:
+        return kind
+    if kind is None:
+        return previous
+    if {previous, kind} == {'int', 'float'}:
+        return 'float'
+    return 'string'  # Valores de tipos distintos (por ejemplo, números y 'Unknown'): se guardan como texto
+
+
+def _to_text(value):
+    """
+    Convierte un valor en el texto que se guarda en una columna de texto.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _record_batch(pa, rows, schema, dictionaries, indexes):
+    """
+    Convierte un bloque de filas en un RecordBatch con el esquema del archivo.
+    """
+    arrays = []
+    for field in schema:
+        column = field.name
+        values = [row.get(column) for row in rows]
+        if column in dictionaries:
+            index = indexes[column]
+            codes = pa.array([None if value is None else index[_to_text(value)] for value in values], type=pa.int32())
+            arrays.append(pa.DictionaryArray.from_arrays(codes, dictionaries[column]))
+        elif pa.types.is_string(field.type):
+            arrays.append(pa.array([None if value is None else _to_text(value) for value in values], type=field.type))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
@@ -0,0 +1,30 @@
+"""
+Decodificación de JSON con orjson cuando está instalado.
+
+orjson analiza las respuestas de la API varias veces más rápido que el módulo
+json de la biblioteca estándar y crea objetos más compactos. Es opcional
+(pip install orjson): si no está disponible se usa json sin cambios de
+comportamiento. El decodificador se elige la primera vez que se usa, para no
+cargar orjson en las ejecuciones que no decodifican nada (por ejemplo, --help).
+"""
+import json
+
+_loads = None  # Función de decodificación elegida
+
+
+def loads(data):
+    """
+    Decodifica un documento JSON.
+
+    :param data: Texto o bytes (UTF-8) con el documento.
+    :return: Objeto de Python resultante.
+    :raises ValueError: Si el documento no es JSON válido.
+    """
+    global _loads
+    if _loads is None:
+        try:
+            import orjson  # Dependencia opcional
+            _loads = orjson.loads
+        except ImportError:
+            _loads = json.loads
+    return _loads(data)
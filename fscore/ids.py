@@ -0,0 +1,216 @@
+"""
+Conjuntos de IDs representados como intervalos ordenados.
+
+Una selección como 1-200000 se guarda como un único intervalo en lugar de una
+lista de 200000 enteros. Las exclusiones se aplican restando intervalos, la
+pertenencia se comprueba con búsqueda binaria y los IDs se recorren de forma
+perezosa, en orden ascendente y sin duplicados.
+"""
+import bisect
+import re
+
+# Separadores admitidos entre IDs: comas y saltos de línea. Los espacios no
+# separan, para que un rango escrito como '143 - 145' siga siendo un rango
+_SEPARATORS = re.compile(r'[,\r\n]+')
+
+# Tamaño de los bloques leídos de un archivo de IDs
+_CHUNK_SIZE = 64 * 1024
+
+
+class IdSet:
+    """
+    Conjunto inmutable de IDs enteros guardado como intervalos cerrados
+    [inicio, fin] ordenados, disjuntos y no contiguos.
+
+    :param ranges: Iterable de tuplas (inicio, fin), en cualquier orden y
+        pudiendo solaparse. Los intervalos vacíos (inicio > fin) se ignoran.
+    """
+
+    def __init__(self, ranges=()):
+        merged = []
+        for start, end in sorted(_coalesce(r for r in ranges if r[0] <= r[1])):
+            if merged and start <= merged[-1][1] + 1:
+                if end > merged[-1][1]:
+                    merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        self._starts = [start for start, _ in merged]
+        self._ends = [end for _, end in merged]
+        self._len = sum(end - start + 1 for start, end in merged)
+
+    @classmethod
+    def from_ids(cls, ids):
+        """
+        Crea un conjunto a partir de IDs sueltos, agrupando los consecutivos.
+
+        :param ids: Iterable de enteros.
+        """
+        return cls((id_, id_) for id_ in ids)
+
+    @property
+    def ranges(self):
+        """
+        Lista de intervalos (inicio, fin) del conjunto.
+        """
+        return list(zip(self._starts, self._ends))
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __iter__(self):
+        for start, end in zip(self._starts, self._ends):
+            yield from range(start, end + 1)
+
+    def __contains__(self, id_):
+        index = bisect.bisect_right(self._starts, id_) - 1
+        return index >= 0 and id_ <= self._ends[index]
+
+    def __or__(self, other):
+        return IdSet(self.ranges + other.ranges)
+
+    def __sub__(self, other):
+        """
+        Diferencia de conjuntos, recorriendo ambas listas de intervalos a la vez.
+        """
+        result = []
+        others = other.ranges
+        j = 0
+        for start, end in self.ranges:
+            while j < len(others) and others[j][1] < start:
+                j += 1
+            k = j
+            while k < len(others) and others[k][0] <= end:
+                if others[k][0] > start:
+                    result.append((start, others[k][0] - 1))
+                start = max(start, others[k][1] + 1)
+                k += 1
+            if start <= end:
+                result.append((start, end))
+        return IdSet(result)
+
+    def __eq__(self, other):
+        if not isinstance(other, IdSet):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def min(self):
+        """
+        Devuelve el menor ID del conjunto.
+
+        :raises ValueError: Si el conjunto está vacío.
+        """
+        if not self._starts:
+            raise ValueError("El conjunto de IDs está vacío")
+        return self._starts[0]
+
+    def max(self):
+        """
+        Devuelve el mayor ID del conjunto.
+
+        :raises ValueError: Si el conjunto está vacío.
+        """
+        if not self._ends:
+            raise ValueError("El conjunto de IDs está vacío")
+        return self._ends[-1]
+
+    def split(self, parts):
+        """
+        Divide el conjunto en tramos consecutivos con el mismo número de IDs (±1).
+
+        :param parts: Número de tramos.
+        :return: Lista de IdSet no vacíos, en orden (menos de parts si no hay IDs suficientes).
+        """
+        parts = max(1, min(parts, self._len))
+        size, extra = divmod(self._len, parts)
+        chunks = []
+        current = []
+        wanted = size + (1 if extra else 0)
+        for start, end in self.ranges:
+            while start <= end:
+                take = min(wanted, end - start + 1)
+                current.append((start, start + take - 1))
+                start += take
+                wanted -= take
+                if wanted == 0:
+                    chunks.append(IdSet(current))
+                    current = []
+                    wanted = size + (1 if len(chunks) < extra else 0)
+        return chunks
+
+    def __repr__(self):
+        parts = [str(start) if start == end else f"{start}-{end}" for start, end in self.ranges]
+        return f"IdSet({','.join(parts)})"
+
+
+def _coalesce(ranges):
+    """
+    Une sobre la marcha los intervalos contiguos que llegan seguidos, para que
+    una lista larga de IDs consecutivos no ocupe una tupla por ID.
+    """
+    current = None
+    for start, end in ranges:
+        if current is not None and current[0] <= start <= current[1] + 1:
+            current = (current[0], max(current[1], end))
+            continue
+        if current is not None:
+            yield current
+        current = (start, end)
+    if current is not None:
+        yield current
+
+
+def iter_tokens(file):
+    """
+    Lee un archivo de IDs por bloques y devuelve sus elementos uno a uno.
+    Admite IDs separados por comas o saltos de línea, sin cargar el archivo
+    completo en memoria.
+
+    :param file: Archivo de texto abierto.
+    :return: Generador de cadenas (IDs o rangos) sin separadores ni espacios alrededor.
+    """
+    pending = ''
+    while True:
+        chunk = file.read(_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts = _SEPARATORS.split(pending + chunk)
+        pending = parts.pop()  # El último elemento puede continuar en el siguiente bloque
+        for part in parts:
+            part = part.strip()
+            if part:
+                yield part
+    pending = pending.strip()
+    if pending:
+        yield pending
+
+
+def split_tokens(text):
+    """
+    Divide una lista de IDs escrita en la línea de comandos.
+
+    :param text: Cadena con IDs o rangos separados por comas o saltos de línea.
+    :return: Lista de cadenas sin separadores ni espacios alrededor.
+    """
+    return [part.strip() for part in _SEPARATORS.split(text) if part.strip()]
+
+
+def parse_token(token):
+    """
+    Convierte un elemento ('143', '143-145' o '143 - 145') en un intervalo.
+
+    :param token: ID o rango.
+    :return: Tupla (inicio, fin).
+    :raises ValueError: Si el elemento no es un ID ni un rango válido.
+    """
+    token = token.strip()
+    if '-' in token:
+        start, end = (part.strip() for part in token.split('-'))
+        if not (start.isdigit() and end.isdigit()):
+            raise ValueError(token)
+        return int(start), int(end)
+    if not token.isdigit():
+        raise ValueError(token)
+    return int(token), int(token)
@@ -0,0 +1,50 @@
+"""
+Memoria acotada para resultados de consultas repetidas a la API.
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Caché en memoria con política LRU (se descarta el elemento usado hace más
+    tiempo al superar `maxsize`). Es segura para usarse desde varios hilos.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Devuelve el valor asociado a `key` o `default` si no está en la caché.
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        """
+        Guarda `value` asociado a `key`, descartando el elemento más antiguo si es necesario.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """
+        Vacía la caché.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
@@ -0,0 +1,376 @@
+"""
+Métricas de ejecución de las herramientas.
+
+Registra, para cada tipo de endpoint, el número de peticiones, los códigos de
+estado y un histograma de latencias, además de los reintentos, el tiempo de
+espera impuesto por el limitador, los aciertos de la caché persistente, las
+peticiones ahorradas al agrupar consultas idénticas simultáneas y el
+tiempo dedicado a cada etapa del proceso (carga de catálogos, construcción de
+filas, escritura del informe...). Al terminar se puede mostrar un resumen
+(--stats) o guardar todos los datos en JSON (--stats-json).
+
+El registro es global y seguro para hilos y corrutinas; las funciones de este
+módulo operan sobre él.
+"""
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from colorama import Fore
+
+from fscore import cache as response_cache
+
+# Límites superiores (en milisegundos) de los intervalos del histograma de latencias
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """
+    Histograma de latencias con intervalos fijos, más el número de muestras,
+    la suma, el mínimo y el máximo.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # El último intervalo recoge lo que supera el mayor límite
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value_ms):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value_ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value_ms
+        self.min = value_ms if self.min is None else min(self.min, value_ms)
+        self.max = value_ms if self.max is None else max(self.max, value_ms)
+
+    @classmethod
+    def from_dict(cls, data, buckets=LATENCY_BUCKETS_MS):
+        """
+        Reconstruye un histograma a partir de su to_dict() (por ejemplo, el de otro proceso).
+        """
+        histogram = cls(buckets)
+        histogram.counts = [data['buckets'].get(f'le_{bound}', 0) for bound in buckets] + [data['buckets'].get('inf', 0)]
+        histogram.count = data['count']
+        histogram.total = data['total_ms']
+        histogram.min = data['min_ms']
+        histogram.max = data['max_ms']
+        return histogram
+
+    def merge(self, other):
+        """
+        Suma a este histograma las muestras de otro con los mismos intervalos.
+        """
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, fraction):
+        """
+        Estima un percentil con el límite superior del intervalo en el que cae.
+
+        :param fraction: Percentil entre 0 y 1 (por ejemplo: 0.95).
+        :return: Milisegundos, o None si no hay muestras.
+        """
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'mean_ms': round(self.total / self.count, 3) if self.count else None,
+            'min_ms': None if self.min is None else round(self.min, 3),
+            'max_ms': None if self.max is None else round(self.max, 3),
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'buckets': {
+                **{f'le_{bound}': count for bound, count in zip(self.buckets, self.counts)},
+                'inf': self.counts[-1],
+            },
+        }
+
+
+class Metrics:
+    """
+    Registro de métricas de una ejecución.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def reset(self):
+        """
+        Pone a cero todas las métricas.
+        """
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self.started = time.time()
+        self._started_monotonic = time.monotonic()
+        self.endpoints = {}  # Tipo de endpoint -> {'requests', 'status', 'latency'}
+        self.retries = {}  # Motivo (código de estado o 'network') -> número de reintentos
+        self.throttle_waits = 0
+        self.throttle_wait_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+        self.stages = {}  # Etapa -> {'calls', 'seconds'}
+
+    def record_request(self, endpoint, status, seconds):
+        """
+        Registra una petición HTTP completada (incluidos los intentos fallidos).
+
+        :param endpoint: Tipo de endpoint (ver endpoint_name).
+        :param status: Código de estado HTTP o 'error' si no hubo respuesta.
+        :param seconds: Duración de la petición.
+        """
+        with self._lock:
+            entry = self.endpoints.get(endpoint)
+            if entry is None:
+                entry = self.endpoints[endpoint] = {'requests': 0, 'status': {}, 'latency': Histogram()}
+            entry['requests'] += 1
+            entry['status'][str(status)] = entry['status'].get(str(status), 0) + 1
+            entry['latency'].add(seconds * 1000)
+
+    def record_retry(self, reason):
+        """
+        Registra un reintento.
+
+        :param reason: Código de estado que lo provocó o 'network' si fue un error de red.
+        """
+        with self._lock:
+            self.retries[str(reason)] = self.retries.get(str(reason), 0) + 1
+
+    def record_throttle(self, seconds):
+        """
+        Registra una espera impuesta por el limitador de peticiones.
+        """
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.throttle_waits += 1
+            self.throttle_wait_seconds += seconds
+
+    def record_cache(self, hit):
+        """
+        Registra una consulta a la caché persistente.
+        """
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def record_coalesced(self):
+        """
+        Registra una consulta que reutilizó la respuesta de otra idéntica en curso.
+        """
+        with self._lock:
+            self.coalesced += 1
+
+    def record_stage(self, stage, seconds):
+        """
+        Acumula el tiempo dedicado a una etapa del proceso.
+        """
+        with self._lock:
+            entry = self.stages.setdefault(stage, {'calls': 0, 'seconds': 0.0})
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        Mide el tiempo de un bloque y lo suma a la etapa indicada.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start)
+
+    def summary(self):
+        """
+        Devuelve todas las métricas como un diccionario serializable en JSON.
+        """
+        with self._lock:
+            lookups = self.cache_hits + self.cache_misses
+            endpoints = {
+                name: {'requests': entry['requests'], 'status': dict(entry['status']), 'latency': entry['latency'].to_dict()}
+                for name, entry in sorted(self.endpoints.items())
+            }
+            return {
+                'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(self.started)),
+                'elapsed_seconds': round(time.monotonic() - self._started_monotonic, 3),
+                'requests': sum(entry['requests'] for entry in self.endpoints.values()),
+                'endpoints': endpoints,
+                'retries': dict(self.retries),
+                'throttle': {'waits': self.throttle_waits, 'seconds': round(self.throttle_wait_seconds, 3)},
+                'cache': {
+                    'hits': self.cache_hits,
+                    'misses': self.cache_misses,
+                    'hit_ratio': round(self.cache_hits / lookups, 4) if lookups else None,
+                },
+                'coalesced': self.coalesced,
+                'stages': {
+                    name: {'calls': entry['calls'], 'seconds': round(entry['seconds'], 3)}
+                    for name, entry in sorted(self.stages.items())
+                },
+            }
+
+
+# Registro global compartido por el cliente, los exportadores y las herramientas
+registry = Metrics()
+
+record_request = registry.record_request
+record_retry = registry.record_retry
+record_throttle = registry.record_throttle
+record_cache = registry.record_cache
+record_coalesced = registry.record_coalesced
+record_stage = registry.record_stage
+timer = registry.timer
+summary = registry.summary
+reset = registry.reset
+
+
+def endpoint_name(path):
+    """
+    Agrupa las rutas de la API por tipo de endpoint, para que las métricas no
+    tengan una entrada por cada ID.
+
+    :param path: Ruta relativa de la petición (por ejemplo: 'assets/143/components/').
+    :return: Nombre del tipo de endpoint (por ejemplo: 'components' o 'assets').
+    """
+    if '://' in path:  # URL absoluta (por ejemplo, la página siguiente de la cabecera Link)
+        path = path.split('/api/v2/', 1)[-1]
+    endpoint = response_cache.classify(path)
+    if endpoint:
+        return endpoint
+    path = path.split('?', 1)[0].strip('/')
+    return re.sub(r'/\d+', '/{id}', path) or 'root'
+
+
+def combine(summaries, elapsed_seconds):
+    """
+    Combina las métricas de varios procesos (por ejemplo, los tramos de
+    fsexport.py) en un único resumen con el formato de summary().
+
+    :param summaries: Lista de resultados de summary().
+    :param elapsed_seconds: Duración total de la ejecución.
+    :return: Diccionario con el mismo formato que summary().
+    """
+    endpoints = {}
+    retries = {}
+    stages = {}
+    for data in summaries:
+        for name, entry in data['endpoints'].items():
+            merged = endpoints.setdefault(name, {'requests': 0, 'status': {}, 'latency': Histogram()})
+            merged['requests'] += entry['requests']
+            for status, count in entry['status'].items():
+                merged['status'][status] = merged['status'].get(status, 0) + count
+            merged['latency'].merge(Histogram.from_dict(entry['latency']))
+        for reason, count in data['retries'].items():
+            retries[reason] = retries.get(reason, 0) + count
+        for name, entry in data['stages'].items():
+            merged = stages.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            merged['calls'] += entry['calls']
+            merged['seconds'] += entry['seconds']
+    hits = sum(data['cache']['hits'] for data in summaries)
+    misses = sum(data['cache']['misses'] for data in summaries)
+    return {
+        'started_at': min((data['started_at'] for data in summaries), default=None),
+        'elapsed_seconds': round(elapsed_seconds, 3),
+        'requests': sum(data['requests'] for data in summaries),
+        'endpoints': {
+            name: {'requests': entry['requests'], 'status': entry['status'], 'latency': entry['latency'].to_dict()}
+            for name, entry in sorted(endpoints.items())
+        },
+        'retries': retries,
+        'throttle': {
+            'waits': sum(data['throttle']['waits'] for data in summaries),
+            'seconds': round(sum(data['throttle']['seconds'] for data in summaries), 3),
+        },
+        'cache': {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+        },
+        'coalesced': sum(data.get('coalesced', 0) for data in summaries),
+        'stages': {
+            name: {'calls': entry['calls'], 'seconds': round(entry['seconds'], 3)}
+            for name, entry in sorted(stages.items())
+        },
+    }
+
+
+def print_report(data=None):
+    """
+    Muestra en pantalla el resumen de las métricas.
+
+    :param data: Resultado de summary() (por defecto, el del registro global).
+    """
+    data = data or summary()
+    print(f"{Fore.CYAN}Estadísticas de la ejecución ({data['elapsed_seconds']:.2f} s):")
+    print(f"  Peticiones a la API: {data['requests']}")
+    if data['endpoints']:
+        print(f"  {'Endpoint':<14} {'Peticiones':>10} {'Media (ms)':>11} {'p50':>7} {'p95':>7} {'Máx.':>9}  Estados")
+        for name, entry in data['endpoints'].items():
+            latency = entry['latency']
+            statuses = ', '.join(f"{code}: {count}" for code, count in sorted(entry['status'].items()))
+            print(
+                f"  {name:<14} {entry['requests']:>10} {latency['mean_ms'] or 0:>11.1f} "
+                f"{_format_ms(latency['p50_ms']):>7} {_format_ms(latency['p95_ms']):>7} {latency['max_ms'] or 0:>9.1f}  {statuses}"
+            )
+    retries = sum(data['retries'].values())
+    if retries:
+        reasons = ', '.join(f"{reason}: {count}" for reason, count in sorted(data['retries'].items()))
+        print(f"  Reintentos: {retries} ({reasons})")
+    else:
+        print("  Reintentos: 0")
+    print(f"  Esperas del limitador: {data['throttle']['waits']} ({data['throttle']['seconds']:.2f} s)")
+    cache = data['cache']
+    if cache['hit_ratio'] is not None:
+        print(f"  Caché: {cache['hits']} aciertos, {cache['misses']} fallos ({cache['hit_ratio']:.0%})")
+    if data.get('coalesced'):
+        print(f"  Peticiones agrupadas con otras idénticas en curso: {data['coalesced']}")
+    for name, entry in data['stages'].items():
+        print(f"  Etapa {name}: {entry['seconds']:.3f} s ({entry['calls']} llamadas)")
+
+
+def write_json(path, data=None):
+    """
+    Guarda las métricas en un archivo JSON.
+
+    :param path: Ruta del archivo.
+    :param data: Resultado de summary() (por defecto, el del registro global).
+    """
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data or summary(), file, indent=2, ensure_ascii=False)
+
+
+def _format_ms(value):
+    if value is None:
+        return '-'
+    return f"≤{value}" if isinstance(value, int) else f"{value:.0f}"
@@ -0,0 +1,203 @@
+"""
+Réplica local del inventario de Freshservice en SQLite.
+
+Guarda los activos (con sus type_fields), los usuarios (requesters) y los
+catálogos de departamentos, tipos de activos y ubicaciones, junto con la marca
+de agua (el updated_at más reciente) de cada entidad y la hora de su última
+carga completa. fssync.py la mantiene al día descargando solo lo que ha
+cambiado (y, periódicamente, todo, para quitar lo eliminado en Freshservice) y
+fsmanage.py puede generar informes a partir de ella (--mirror) sin consultar la API.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from fscore import fastjson
+
+# Ubicación por defecto de la réplica
+DEFAULT_MIRROR_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'fstools', 'mirror.sqlite3')
+
+# Catálogos que se guardan en la réplica
+CATALOGS = ('departments', 'asset_types', 'locations')
+
+
+class Mirror:
+    """
+    Acceso a la réplica local, seguro para usarse desde varios hilos.
+
+    :param path: Ruta del archivo SQLite (se crea si no existe).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_MIRROR_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(
+            'CREATE TABLE IF NOT EXISTS assets ('
+            ' display_id INTEGER PRIMARY KEY, updated_at TEXT, data TEXT NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS requesters ('
+            ' id INTEGER PRIMARY KEY, updated_at TEXT, data TEXT NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS catalogs ('
+            ' catalog TEXT NOT NULL, id INTEGER NOT NULL, name TEXT, PRIMARY KEY (catalog, id));'
+            'CREATE TABLE IF NOT EXISTS sync_state ('
+            ' entity TEXT PRIMARY KEY, high_water TEXT, synced_at REAL, full_synced_at REAL);'
+        )
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(sync_state)')}
+        if 'full_synced_at' not in columns:  # Réplica creada por una versión anterior
+            self._db.execute('ALTER TABLE sync_state ADD COLUMN full_synced_at REAL')
+        self._db.commit()
+
+    # --- Escritura (usada por fssync.py) ---
+
+    def upsert_assets(self, assets):
+        """
+        Inserta o actualiza activos.
+
+        :param assets: Lista de activos tal como los devuelve la API (con 'type_fields').
+        :return: Número de activos guardados.
+        """
+        rows = [(asset['display_id'], asset.get('updated_at'), json.dumps(asset, ensure_ascii=False)) for asset in assets]
+        with self._lock:
+            self._db.executemany('INSERT OR REPLACE INTO assets (display_id, updated_at, data) VALUES (?, ?, ?)', rows)
+            self._db.commit()
+        return len(rows)
+
+    def upsert_requesters(self, requesters):
+        """
+        Inserta o actualiza usuarios.
+
+        :param requesters: Lista de usuarios tal como los devuelve la API.
+        :return: Número de usuarios guardados.
+        """
+        rows = [(user['id'], user.get('updated_at'), json.dumps(user, ensure_ascii=False)) for user in requesters]
+        with self._lock:
+            self._db.executemany('INSERT OR REPLACE INTO requesters (id, updated_at, data) VALUES (?, ?, ?)', rows)
+            self._db.commit()
+        return len(rows)
+
+    def delete_missing(self, entity, keep_ids):
+        """
+        Elimina los registros que ya no existen en Freshservice (tras una carga completa).
+
+        :param entity: 'assets' o 'requesters'.
+        :param keep_ids: Conjunto de IDs que se han visto en la carga completa.
+        :return: Número de registros eliminados.
+        """
+        key = 'display_id' if entity == 'assets' else 'id'
+        with self._lock:
+            existing = [row[0] for row in self._db.execute(f'SELECT {key} FROM {entity}')]
+            stale = [(item_id,) for item_id in existing if item_id not in keep_ids]
+            self._db.executemany(f'DELETE FROM {entity} WHERE {key} = ?', stale)
+            self._db.commit()
+        return len(stale)
+
+    def replace_catalog(self, catalog, items):
+        """
+        Sustituye un catálogo completo.
+
+        :param catalog: Nombre del catálogo ('departments', 'asset_types' o 'locations').
+        :param items: Diccionario ID -> nombre.
+        """
+        with self._lock:
+            self._db.execute('DELETE FROM catalogs WHERE catalog = ?', (catalog,))
+            self._db.executemany(
+                'INSERT INTO catalogs (catalog, id, name) VALUES (?, ?, ?)',
+                [(catalog, item_id, name) for item_id, name in items.items()]
+            )
+            self._db.commit()
+
+    def get_high_water(self, entity):
+        """
+        Devuelve la marca de agua (updated_at más reciente sincronizado) de una entidad, o None.
+        """
+        with self._lock:
+            row = self._db.execute('SELECT high_water FROM sync_state WHERE entity = ?', (entity,)).fetchone()
+        return row[0] if row else None
+
+    def set_high_water(self, entity, high_water, full=False):
+        """
+        Guarda la marca de agua de una entidad y la hora de la sincronización.
+
+        :param full: Indica si la sincronización fue una carga completa (se guarda también su hora).
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO sync_state (entity, high_water, synced_at, full_synced_at) VALUES (?, ?, ?, ?)'
+                ' ON CONFLICT (entity) DO UPDATE SET high_water = excluded.high_water, synced_at = excluded.synced_at,'
+                ' full_synced_at = COALESCE(excluded.full_synced_at, sync_state.full_synced_at)',
+                (entity, high_water, now, now if full else None)
+            )
+            self._db.commit()
+
+    def get_full_sync_time(self, entity):
+        """
+        Devuelve la hora (time.time()) de la última carga completa de una entidad, o None.
+        """
+        with self._lock:
+            row = self._db.execute('SELECT full_synced_at FROM sync_state WHERE entity = ?', (entity,)).fetchone()
+        return row[0] if row else None
+
+    # --- Lectura (usada por fsmanage.py --mirror) ---
+
+    def get_asset(self, display_id):
+        """
+        Devuelve un activo (con 'type_fields') o None si no está en la réplica.
+        """
+        with self._lock:
+            row = self._db.execute('SELECT data FROM assets WHERE display_id = ?', (display_id,)).fetchone()
+        return fastjson.loads(row[0]) if row else None
+
+    def asset_lookup(self):
+        """
+        Devuelve una vista de los activos con la interfaz de un diccionario
+        (display_id -> activo), que fsmanage usa igual que el resultado del listado paginado.
+        """
+        return _AssetLookup(self)
+
+    def get_requester(self, user_id):
+        """
+        Devuelve un usuario o None si no está en la réplica.
+        """
+        with self._lock:
+            row = self._db.execute('SELECT data FROM requesters WHERE id = ?', (user_id,)).fetchone()
+        return fastjson.loads(row[0]) if row else None
+
+    def get_catalog(self, catalog):
+        """
+        Devuelve un catálogo como diccionario ID -> nombre.
+        """
+        with self._lock:
+            rows = self._db.execute('SELECT id, name FROM catalogs WHERE catalog = ?', (catalog,)).fetchall()
+        return dict(rows)
+
+    def count(self, entity):
+        """
+        Devuelve el número de registros de 'assets' o 'requesters'.
+        """
+        with self._lock:
+            return self._db.execute(f'SELECT COUNT(*) FROM {entity}').fetchone()[0]
+
+    def close(self):
+        """
+        Cierra la base de datos.
+        """
+        with self._lock:
+            self._db.close()
+
+
+class _AssetLookup:
+    """
+    Vista de solo lectura de los activos de la réplica con el método get() de un diccionario.
+    """
+
+    def __init__(self, mirror):
+        self._mirror = mirror
+
+    def get(self, display_id, default=None):
+        asset = self._mirror.get_asset(display_id)
+        return default if asset is None else asset
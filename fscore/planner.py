@@ -0,0 +1,160 @@
+"""
+Planificación de las peticiones de fsmanage.py.
+
+Según las opciones (-a/-d/-t/-l/-u/-s/-n/-f/-c) y los IDs pedidos, el
+planificador decide cómo obtener los activos con el menor número de peticiones
+y estima el coste de la ejecución antes de empezarla (--dry-run):
+
+- Los datos de un activo y sus type_fields salen de la misma petición
+  (assets/{id}?include=type_fields), o del listado paginado si recorrerlo es
+  más barato que pedir los activos uno a uno.
+- Los catálogos de referencia se descargan una sola vez por ejecución, y no se
+  piden si ya están en memoria (la réplica local) o en la caché en disco.
+- Los usuarios se piden una vez por usuario distinto. Como no se conocen hasta
+  leer los activos, se estima el máximo: uno por activo.
+- Los componentes (-c) siempre se piden activo por activo.
+"""
+import math
+
+# Elementos por página del listado de activos (máximo admitido por la API)
+ASSET_PAGE_SIZE = 100
+# En modo automático se usa el listado paginado si ahorra al menos este factor de peticiones
+BULK_MIN_GAIN = 2
+
+# Catálogos de referencia y opción que los necesita
+CATALOG_OPTIONS = (
+    ("departments", "include_departments"),
+    ("asset_types", "include_asset_type"),
+    ("locations", "include_location"),
+)
+
+
+def needs_asset_request(options):
+    """
+    Indica si hay que obtener los datos del activo (o sus type_fields) para las opciones dadas.
+
+    :param options: Diccionario con las opciones de fsmanage (include_* y type_fields).
+    """
+    return bool(
+        options["include_asset_data"] or options["include_departments"] or options["include_asset_type"]
+        or options["include_location"] or options["include_user"] or options["type_fields"]
+    )
+
+
+def required_catalogs(options):
+    """
+    Devuelve los nombres de los catálogos de referencia que necesitan las opciones.
+    """
+    return [name for name, option in CATALOG_OPTIONS if options[option]]
+
+
+# Función para elegir entre pedir cada activo por su ID o recorrer el listado paginado
+def choose_fetch_mode(asset_ids, options, fetch_mode='auto', bulk_filter=None):
+    """
+    Decide cómo obtener los datos de los activos.
+
+    En modo automático se compara el número de peticiones individuales (una por
+    activo, con sus datos y sus type_fields) con el número estimado de páginas
+    del listado, suponiendo que los display_id son consecutivos (el listado no
+    está ordenado por display_id, así que solo compensa con conjuntos grandes y
+    densos). Los componentes (-c) se piden siempre por activo y no intervienen
+    en la decisión.
+
+    :param asset_ids: IdSet con los IDs de los activos a procesar.
+    :param options: Diccionario con las opciones de fsmanage.
+    :param fetch_mode: 'auto', 'bulk' o 'per-id'.
+    :param bulk_filter: Filtro opcional para el listado; si se indica en modo automático se usa el listado.
+    :return: 'bulk' o 'per-id'.
+    """
+    if fetch_mode != 'auto':
+        return fetch_mode
+    if not needs_asset_request(options):
+        return 'per-id'  # Solo se piden componentes: el listado no ahorra nada
+    if bulk_filter:
+        return 'bulk'
+    if len(asset_ids) < ASSET_PAGE_SIZE:
+        return 'per-id'  # Con menos activos que una página, pedirlos uno a uno nunca es mucho más caro
+    return 'bulk' if len(asset_ids) >= BULK_MIN_GAIN * bulk_pages(asset_ids) else 'per-id'
+
+
+def bulk_pages(asset_ids):
+    """
+    Estima las páginas del listado que hay que recorrer para encontrar los activos,
+    suponiendo display_id consecutivos desde 1.
+    """
+    return math.ceil(asset_ids.max() / ASSET_PAGE_SIZE) if asset_ids else 0
+
+
+class FetchPlan:
+    """
+    Plan de peticiones de una ejecución de fsmanage.py.
+
+    :param mode: Cómo se obtienen los activos: 'per-id', 'bulk' o 'mirror' (réplica local).
+    :param asset_count: Número de activos que se van a procesar.
+    :param catalogs: Catálogos de referencia que hay que descargar de la API.
+    :param steps: Lista de tuplas (descripción, peticiones, es un máximo) con el coste de cada paso.
+    :param rate_per_minute: Peticiones por minuto del limitador, para estimar la duración.
+    """
+
+    def __init__(self, mode, asset_count, catalogs, steps, rate_per_minute):
+        self.mode = mode
+        self.asset_count = asset_count
+        self.catalogs = catalogs
+        self.steps = steps
+        self.rate_per_minute = rate_per_minute
+
+    @property
+    def total(self):
+        """
+        Número total de peticiones estimadas.
+        """
+        return sum(count for _, count, _ in self.steps)
+
+    @property
+    def is_upper_bound(self):
+        """
+        Indica si el total es un máximo (por ejemplo, porque se cuenta un usuario por activo).
+        """
+        return any(upper_bound and count for _, count, upper_bound in self.steps)
+
+    @property
+    def estimated_seconds(self):
+        """
+        Duración mínima de la ejecución al ritmo del limitador.
+        """
+        return self.total * 60 / self.rate_per_minute
+
+
+def plan_fetch(asset_ids, options, fetch_mode='auto', bulk_filter=None, mirror=False, cached_catalogs=(), rate_per_minute=100):
+    """
+    Construye el plan de peticiones de una ejecución sin hacer ninguna petición.
+
+    :param asset_ids: IdSet con los IDs de los activos pendientes.
+    :param options: Diccionario con las opciones de fsmanage.
+    :param fetch_mode: 'auto', 'bulk' o 'per-id' (--fetch-mode).
+    :param bulk_filter: Filtro opcional del listado (--bulk-filter).
+    :param mirror: Indica si los activos, catálogos y usuarios se leen de la réplica local.
+    :param cached_catalogs: Nombres de los catálogos que ya están en memoria o en la caché en disco.
+    :param rate_per_minute: Peticiones por minuto del limitador.
+    :return: Instancia de FetchPlan.
+    """
+    asset_count = len(asset_ids)
+    steps = []
+    if mirror:
+        mode = 'mirror'
+    else:
+        mode = choose_fetch_mode(asset_ids, options, fetch_mode, bulk_filter) if asset_count else 'per-id'
+        if mode == 'bulk':
+            steps.append(("Listado paginado de activos (assets)", bulk_pages(asset_ids), bool(bulk_filter)))
+        elif needs_asset_request(options):
+            path = 'assets/{id}?include=type_fields' if options["type_fields"] else 'assets/{id}'
+            steps.append((f"Datos de los activos ({path})", asset_count, False))
+
+    catalogs = [] if mirror or not asset_count else [name for name in required_catalogs(options) if name not in cached_catalogs]
+    if catalogs:
+        steps.append((f"Catálogos de referencia ({', '.join(catalogs)})", len(catalogs), False))
+    if options["include_user"] and not mirror:
+        steps.append(("Usuarios (requesters/{id}), uno por usuario distinto", asset_count, True))
+    if options["components"] is not None:
+        steps.append(("Componentes (assets/{id}/components)", asset_count, False))
+    return FetchPlan(mode, asset_count, catalogs, steps, rate_per_minute)
@@ -0,0 +1,141 @@
+"""
+Limitador de peticiones compartido por todas las llamadas a la API.
+
+Implementa un token bucket cuyo ritmo se ajusta con las cabeceras que devuelve
+Freshservice (X-Ratelimit-Total, X-Ratelimit-Remaining y Retry-After). Todos los
+hilos y corrutinas comparten el mismo presupuesto, de modo que la herramienta
+puede trabajar justo en el límite del plan sin provocar respuestas 429.
+"""
+import random
+import threading
+import time
+
+# Peticiones por minuto que se asumen hasta que la API informe del límite real
+DEFAULT_RATE_PER_MINUTE = 100
+
+# Espera base y máxima (en segundos) del backoff exponencial ante 429/5xx o errores de red
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+
+class RateLimiter:
+    """
+    Token bucket seguro para hilos y corrutinas.
+
+    :param rate_per_minute: Peticiones por minuto permitidas a toda la cuenta.
+    :param adaptive: Si es True el ritmo se ajusta con la cabecera X-Ratelimit-Total.
+    :param share: Número de procesos que comparten la cuenta a la vez (por ejemplo, los
+        tramos de fsexport.py de un mismo tenant). Cada limitador se queda con una parte
+        igual del ritmo indicado y de lo que informan las cabeceras, que reflejan el
+        consumo de toda la cuenta, para que entre todos no superen el límite.
+    """
+
+    def __init__(self, rate_per_minute=DEFAULT_RATE_PER_MINUTE, adaptive=True, share=1):
+        self.adaptive = adaptive
+        self.share = max(1, int(share))
+        self._lock = threading.Lock()
+        self._set_rate(rate_per_minute / self.share)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self.throttle_wait = 0.0  # Segundos totales de espera impuestos por el limitador
+
+    def _set_rate(self, rate_per_minute):
+        self.rate_per_minute = max(1, int(rate_per_minute))
+        self.capacity = self.rate_per_minute
+        self._rate = self.rate_per_minute / 60.0  # Tokens por segundo
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def reserve(self):
+        """
+        Reserva un turno para hacer una petición.
+
+        Si no hay tokens disponibles se reserva igualmente el siguiente hueco
+        (el saldo queda en negativo), de forma que las peticiones concurrentes
+        salen en orden y espaciadas al ritmo permitido.
+
+        :return: Segundos que hay que esperar antes de hacer la petición.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self._blocked_until - now)
+            self._tokens -= 1
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self._rate)
+            self.throttle_wait += wait
+            return wait
+
+    def acquire(self):
+        """
+        Espera (bloqueando el hilo) hasta que se pueda hacer la siguiente petición.
+
+        :return: Segundos esperados.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        """
+        Versión asíncrona de acquire: espera sin bloquear el bucle de eventos.
+
+        :return: Segundos esperados.
+        """
+        import asyncio  # Solo se necesita con el motor asíncrono
+
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def update(self, headers, status_code=None):
+        """
+        Ajusta el limitador con las cabeceras de una respuesta de la API.
+
+        :param headers: Cabeceras de la respuesta (admite cualquier objeto con get()).
+        :param status_code: Código de estado HTTP de la respuesta.
+        :return: Segundos indicados en Retry-After, o None si no venía la cabecera.
+        """
+        total = _header_int(headers, 'X-Ratelimit-Total')
+        remaining = _header_int(headers, 'X-Ratelimit-Remaining')
+        retry_after = _header_int(headers, 'Retry-After')
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.adaptive and total and max(1, total // self.share) != self.rate_per_minute:
+                self._set_rate(total / self.share)
+            if remaining is not None:
+                # El servidor conoce el consumo de todos los clientes que comparten la clave
+                self._tokens = min(self._tokens, float(remaining) / self.share)
+            if retry_after is not None and (status_code == 429 or remaining == 0):
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                self._tokens = min(self._tokens, 0.0)
+        return retry_after
+
+    def backoff_delay(self, attempt):
+        """
+        Calcula la espera antes de un reintento: backoff exponencial con jitter
+        completo, para que los hilos que fallan a la vez no reintenten a la vez.
+
+        :param attempt: Número de reintento (empezando en 0).
+        :return: Segundos de espera.
+        """
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _header_int(headers, name):
+    """
+    Lee una cabecera numérica, devolviendo None si no existe o no es un número.
+    """
+    value = headers.get(name) if headers is not None else None
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,76 @@
+"""
+Registros compactos de activos.
+
+El listado paginado devuelve cada activo con todos sus campos (descripción,
+fechas, campos de tipo...), pero el informe solo usa unos pocos. Al proyectar
+cada activo sobre un AssetRecord se guardan únicamente los campos que piden
+las opciones activas, de modo que la memoria ocupada por los activos
+descargados depende de las columnas del informe y no del tamaño de la
+respuesta de la API.
+"""
+
+
+class AssetRecord:
+    """
+    Campos de un activo que usa el informe. Los que no se han pedido quedan a None.
+
+    Ofrece el método get() de un diccionario para poder usarse en lugar del
+    activo completo devuelto por la API.
+    """
+
+    __slots__ = ('display_id', 'department_id', 'asset_type_id', 'location_id', 'user_id', 'type_fields')
+
+    def __init__(self, display_id=None, department_id=None, asset_type_id=None, location_id=None, user_id=None, type_fields=None):
+        self.display_id = display_id
+        self.department_id = department_id
+        self.asset_type_id = asset_type_id
+        self.location_id = location_id
+        self.user_id = user_id
+        self.type_fields = type_fields
+
+    def get(self, field, default=None):
+        """
+        Devuelve el valor de un campo, o default si el registro no lo tiene.
+        """
+        if field not in self.__slots__:
+            return default
+        value = getattr(self, field)
+        return default if value is None else value
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__ if getattr(self, name) is not None)
+        return f'AssetRecord({fields})'
+
+
+class AssetProjection:
+    """
+    Convierte activos completos de la API en AssetRecord con los campos necesarios.
+
+    :param options: Diccionario con las opciones de fsmanage (include_* y type_fields).
+    """
+
+    def __init__(self, options):
+        self.fields = [
+            field for field, enabled in (
+                ('department_id', options["include_departments"]),
+                ('asset_type_id', options["include_asset_type"]),
+                ('location_id', options["include_location"]),
+                ('user_id', options["include_user"]),
+            ) if enabled
+        ]
+        self.type_fields = tuple(options["type_fields"].values())
+
+    def __call__(self, asset):
+        """
+        Proyecta un activo.
+
+        :param asset: Diccionario del activo tal como lo devuelve la API.
+        :return: Instancia de AssetRecord.
+        """
+        record = AssetRecord(asset.get('display_id'))
+        for field in self.fields:
+            setattr(record, field, asset.get(field))
+        if self.type_fields:
+            type_fields = asset.get('type_fields') or {}
+            record.type_fields = {field: type_fields[field] for field in self.type_fields if field in type_fields}
+        return record
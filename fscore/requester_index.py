@@ -0,0 +1,464 @@
+"""
+Índice local de usuarios (requesters) para búsquedas por nombre sin consultar la API.
+
+El índice se construye una vez recorriendo el listado paginado de usuarios y
+se guarda en disco junto con los nombres ya normalizados (sin acentos, en
+minúsculas y con los espacios unificados). Al cargarlo se preparan en memoria:
+- Un diccionario de nombres completos para las coincidencias exactas.
+- Las palabras distintas de los nombres, ordenadas y con la lista de nombres
+  que contienen cada una, y la parte local de los correos agrupada por
+  longitud, para encontrar por prefijo las búsquedas parciales ("raf ace")
+  empezando por las mejor puntuadas.
+- Solo si alguna búsqueda no tiene coincidencias exactas ni por prefijo, un
+  índice de trigramas para las búsquedas aproximadas, que toleran erratas.
+Cada búsqueda devuelve los mejores candidatos ordenados por puntuación, de modo
+que los homónimos no se pierden.
+
+La latencia de las búsquedas se mide con bench/search.py.
+"""
+import bisect
+import collections
+import gzip
+import heapq
+import itertools
+import json
+import math
+import os
+import time
+import unicodedata
+
+from fscore import client
+
+# Ubicación por defecto del índice guardado
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'fstools', 'requesters.json.gz')
+
+# Campos de cada usuario que se guardan en el índice
+FIELDS = ('id', 'first_name', 'last_name', 'primary_email')
+
+# Puntuación mínima para considerar un candidato
+MIN_SCORE = 0.3
+
+# Combinaciones de longitudes que se recorren como mucho en las búsquedas por prefijo de varias palabras
+MAX_LEVEL_COMBINATIONS = 4096
+
+# Listas de trigramas (las más cortas) con las que se fija el umbral inicial de las búsquedas aproximadas
+SEED_LISTS = 3
+
+
+def normalize(text):
+    """
+    Normaliza un texto para compararlo: sin acentos, en minúsculas y con un solo
+    espacio entre palabras.
+
+    :param text: Texto original (por ejemplo: 'Ángela  Ibáñez').
+    :return: Texto normalizado (por ejemplo: 'angela ibanez').
+    """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+def _trigrams(text):
+    """
+    Devuelve el conjunto de trigramas de un texto normalizado, con cada palabra
+    delimitada para que el principio y el final cuenten.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _user_keys(user):
+    """
+    Devuelve el nombre completo y la parte local del correo normalizados de un usuario.
+    """
+    name = normalize(f"{user.get('first_name') or ''} {user.get('last_name') or ''}")
+    return name, normalize((user.get('primary_email') or '').split('@')[0])
+
+
+class RequesterIndex:
+    """
+    Índice en memoria de usuarios.
+
+    Los homónimos comparten entrada: las estructuras se construyen sobre los
+    nombres distintos, numerados en orden alfabético para que el desempate por
+    nombre sea una comparación de enteros.
+
+    :param users: Lista de usuarios (diccionarios con al menos 'id', 'first_name' y 'last_name').
+    :param built_at: Momento (segundos desde epoch) en que se descargaron los usuarios.
+    :param keys: Nombre completo y parte local del correo normalizados de cada usuario, como
+        los guarda save(), para no tener que volver a normalizarlos al cargar el índice.
+    """
+
+    def __init__(self, users, built_at=None, keys=None):
+        self.users = [{field: user.get(field) for field in FIELDS} for user in users]
+        self.built_at = built_at or time.time()
+        if keys is None or len(keys) != len(self.users):
+            keys = [_user_keys(user) for user in self.users]
+        self._keys = keys
+        user_names = [name for name, _ in keys]
+        self._names = sorted(set(user_names))  # Nombres completos normalizados distintos
+        self._name_ids = {name: name_id for name_id, name in enumerate(self._names)}  # Coincidencias exactas
+        self._name_users = [[] for _ in self._names]  # Posiciones de los usuarios de cada nombre
+        self._user_names = [self._name_ids[name] for name in user_names]  # Nombre de cada usuario
+        for position, name_id in enumerate(self._user_names):
+            self._name_users[name_id].append(position)
+
+        # Palabras distintas ordenadas y, para cada una, los nombres que la contienen (en orden)
+        postings = {}
+        for name_id, name in enumerate(self._names):
+            for word in set(name.split()):
+                postings.setdefault(word, []).append(name_id)
+        self._words = sorted(postings)
+        self._word_names = [postings[word] for word in self._words]
+
+        # Parte local de los correos, agrupada por longitud: los más cortos puntúan más
+        emails = {}
+        for position, (_, email_user) in enumerate(keys):
+            if email_user:
+                emails.setdefault(len(email_user), []).append((email_user, position))
+        self._email_lengths = sorted(emails)
+        self._emails = {}
+        for length, entries in emails.items():
+            entries.sort()
+            self._emails[length] = ([email for email, _ in entries], [position for _, position in entries])
+
+        # El índice de trigramas solo se necesita para las búsquedas sin coincidencias por prefijo
+        self._grams = None  # Trigrama -> nombres que lo contienen
+        self._gram_counts = None  # Número de trigramas de cada nombre
+        self._max_gram_count = 0
+
+    def __len__(self):
+        return len(self.users)
+
+    def _trigram_index(self):
+        """
+        Construye (la primera vez que se necesita) el índice de trigramas de los nombres.
+        """
+        if self._grams is None:
+            grams = {}
+            counts = []
+            for name_id, name in enumerate(self._names):
+                name_grams = _trigrams(name)
+                counts.append(len(name_grams))
+                for gram in name_grams:
+                    grams.setdefault(gram, []).append(name_id)
+            self._gram_counts = counts
+            self._max_gram_count = max(counts, default=0)
+            self._grams = grams
+        return self._grams
+
+    def _word_levels(self, prefix):
+        """
+        Agrupa por longitud las palabras de los nombres que empiezan por prefix.
+
+        :return: Lista de tuplas (longitud, listas de nombres con alguna palabra de esa longitud),
+            de la longitud más corta a la más larga.
+        """
+        start = bisect.bisect_left(self._words, prefix)
+        end = bisect.bisect_left(self._words, prefix + '\uffff', start)
+        by_length = {}
+        for position in range(start, end):
+            by_length.setdefault(len(self._words[position]), []).append(self._word_names[position])
+        return sorted(by_length.items())
+
+    def _prefix_names(self, words, limit):
+        """
+        Devuelve los mejores nombres en los que todas las palabras de la búsqueda
+        son prefijos de alguna palabra del nombre.
+
+        La puntuación solo depende de la suma de las longitudes de las palabras
+        más cortas del nombre que encajan con cada palabra de la búsqueda, así que
+        los nombres se recorren por niveles de longitud, de más a menos puntuación,
+        sin puntuarlos uno a uno.
+
+        :param words: Palabras normalizadas de la búsqueda.
+        :param limit: Número máximo de nombres (None para todos).
+        :return: Lista de tuplas (puntuación, nombre) ordenada de mayor a menor puntuación.
+        """
+        query_length = sum(len(word) for word in words)
+        word_levels = [self._word_levels(word) for word in words]
+        if len(words) == 1:
+            results = []
+            seen = set()
+            for length, names in word_levels[0]:
+                score = 0.8 + 0.2 * query_length / length * 0.99
+                for name_id in heapq.merge(*names):  # Los empates, por orden alfabético
+                    if name_id not in seen:
+                        seen.add(name_id)
+                        results.append((score, name_id))
+                        if limit is not None and len(results) >= limit:
+                            return results
+            return results
+
+        # Nombres en los que encajan todas las palabras, cruzando primero las menos frecuentes
+        candidates = None
+        for levels in sorted(word_levels, key=lambda levels: sum(len(names) for _, lists in levels for names in lists)):
+            matches = set(itertools.chain.from_iterable(names for _, lists in levels for names in lists))
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+
+        # Para cada palabra, los candidatos según la longitud de la palabra más corta que encaja
+        assigned_levels = []
+        for levels in word_levels:
+            assigned = set()
+            word_assigned = []
+            for length, lists in levels:
+                level = candidates.intersection(itertools.chain.from_iterable(lists)) - assigned
+                if level:
+                    word_assigned.append((length, level))
+                    assigned |= level
+            assigned_levels.append(word_assigned)
+
+        if math.prod(len(levels) for levels in assigned_levels) > MAX_LEVEL_COMBINATIONS:
+            # Demasiadas combinaciones (búsquedas de muchas palabras): se suman nombre a nombre
+            totals = dict.fromkeys(candidates, 0)
+            for levels in assigned_levels:
+                for length, level in levels:
+                    for name_id in level:
+                        totals[name_id] += length
+            ranked = sorted(totals.items(), key=lambda item: (item[1], item[0]))
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [(0.8 + 0.2 * query_length / matched_length * 0.99, name_id) for name_id, matched_length in ranked]
+
+        # Cada nombre está en una sola combinación de niveles: se recorren de menor a mayor longitud total
+        combinations = sorted(itertools.product(*assigned_levels), key=lambda combination: sum(length for length, _ in combination))
+        results = []
+        for matched_length, group in itertools.groupby(combinations, key=lambda combination: sum(length for length, _ in combination)):
+            score = 0.8 + 0.2 * query_length / matched_length * 0.99
+            names = set()
+            for combination in group:
+                names.update(set.intersection(*(level for _, level in combination)))
+            results.extend((score, name_id) for name_id in sorted(names))
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+        return results
+
+    def _email_matches(self, prefix, limit):
+        """
+        Devuelve los mejores usuarios cuyo correo (parte local) empieza por prefix.
+
+        :return: Diccionario posición del usuario -> puntuación.
+        """
+        matches = {}
+        for length in self._email_lengths:
+            if length < len(prefix):
+                continue
+            if limit is not None and len(matches) >= limit:
+                break  # Los correos más largos puntúan menos que los ya encontrados
+            emails, positions = self._emails[length]
+            index = bisect.bisect_left(emails, prefix)
+            score = 0.8 + 0.2 * len(prefix) / length * 0.99
+            while index < len(emails) and emails[index].startswith(prefix):
+                matches[positions[index]] = score
+                index += 1
+        return matches
+
+    def _trigram_names(self, normalized, limit, min_score):
+        """
+        Devuelve los nombres más parecidos por trigramas (coeficiente de Dice
+        escalado a 0.8).
+
+        Para no recorrer las listas de los trigramas más frecuentes, primero se
+        puntúan los nombres que más comparten los trigramas más raros y, con la
+        peor puntuación de esos mejores resultados como umbral, se calcula
+        cuántos trigramas debe compartir como mínimo un nombre para superarlo:
+        solo pueden hacerlo los que aparecen en alguna de las size - mínimo + 1
+        listas más cortas, que son las únicas que se cuentan.
+
+        :param limit: Número máximo de nombres (None para todos).
+        :return: Lista de tuplas (puntuación, nombre) ordenada de mayor a menor puntuación.
+        """
+        grams = self._trigram_index()
+        query_grams = _trigrams(normalized)
+        size = len(query_grams)
+        lists = sorted((grams.get(gram, ()) for gram in query_grams), key=len)
+        best = []  # Montículo con los mejores (puntuación, -nombre)
+        threshold = min_score
+        offered = set()
+        if limit is not None:
+            seeds = collections.Counter(itertools.chain.from_iterable(lists[:SEED_LISTS]))
+            for name_id, _ in seeds.most_common(2 * limit):
+                offered.add(name_id)
+                threshold = self._offer(best, limit, threshold, query_grams, name_id)
+        required = max(1, math.ceil(threshold * size / (1.6 - threshold) - 1e-9))
+        scanned = max(0, size - required + 1)
+        rest = size - scanned  # Trigramas de las listas que no se cuentan
+        counts = collections.Counter(itertools.chain.from_iterable(lists[:scanned]))
+        needed = self._needed_counts(threshold, size, rest)
+        gram_counts = self._gram_counts
+        candidates = [name_id for name_id, count in counts.items() if count >= needed[gram_counts[name_id]]]
+        # Primero los que más trigramas comparten, para subir el umbral cuanto antes
+        candidates.sort(key=counts.__getitem__, reverse=True)
+        for name_id in candidates:
+            if name_id in offered or counts[name_id] < needed[gram_counts[name_id]]:
+                continue
+            updated = self._offer(best, limit, threshold, query_grams, name_id)
+            if updated != threshold:
+                threshold = updated
+                needed = self._needed_counts(threshold, size, rest)
+        return [(score, -name_id) for score, name_id in sorted(best, reverse=True)]
+
+    def _needed_counts(self, threshold, size, rest):
+        """
+        Calcula, para cada número de trigramas de un nombre, cuántas veces debe
+        aparecer en las listas contadas para poder alcanzar el umbral, suponiendo
+        que comparte los rest trigramas de las listas que no se cuentan.
+        """
+        return [
+            math.ceil(threshold * (size + names) / 1.6 - 1e-9) - rest if 1.6 * names / (size + names) >= threshold else size + 1
+            for names in range(self._max_gram_count + 1)
+        ]
+
+    def _offer(self, best, limit, threshold, query_grams, name_id):
+        """
+        Puntúa un nombre por trigramas y lo añade a los mejores si la supera.
+
+        :return: Nuevo umbral (la peor puntuación de los mejores si ya hay limit).
+        """
+        names = self._gram_counts[name_id]
+        score = 1.6 * len(query_grams & _trigrams(self._names[name_id])) / (len(query_grams) + names)
+        entry = (score, -name_id)
+        if score < threshold:
+            return threshold
+        if limit is None or len(best) < limit:
+            heapq.heappush(best, entry)
+        else:
+            heapq.heappushpop(best, entry)
+        if limit is not None and len(best) == limit:
+            threshold = max(threshold, best[0][0])
+        return threshold
+
+    def search(self, query, limit=10, min_score=MIN_SCORE):
+        """
+        Busca usuarios por nombre completo o parcial, o por el principio de su correo.
+
+        La puntuación es 1 si el nombre normalizado coincide exactamente; entre
+        0.8 y 1 si todas las palabras de la búsqueda son prefijos de palabras
+        del nombre (o la búsqueda es el principio del correo), más alta cuanto
+        más completas; y, solo si no hay ninguna coincidencia de ese tipo, la
+        similitud de trigramas (coeficiente de Dice) escalada a 0.8 como máximo,
+        que tolera erratas.
+
+        :param query: Texto a buscar (por ejemplo: 'maria aceit').
+        :param limit: Número máximo de resultados (None para todos).
+        :param min_score: Puntuación mínima de los resultados.
+        :return: Lista de tuplas (puntuación, usuario) ordenada de mayor a menor puntuación.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        words = normalized.split()
+
+        # Nombres exactos y por prefijo: cada nombre aporta al menos un usuario,
+        # así que los mejores resultados están entre los primeros limit nombres
+        name_scores = {name_id: score for score, name_id in self._prefix_names(words, limit)}
+        exact = self._name_ids.get(normalized)
+        if exact is not None:
+            name_scores[exact] = 1.0
+        scores = {}
+        for name_id, score in sorted(name_scores.items(), key=lambda item: (-item[1], item[0])):
+            for position in self._name_users[name_id]:
+                scores[position] = score
+            if limit is not None and len(scores) >= limit:
+                break
+        if len(words) == 1:  # Una sola palabra puede ser el principio del correo
+            for position, score in self._email_matches(words[0], limit).items():
+                scores[position] = max(scores.get(position, 0.0), score)
+
+        if not scores:
+            # Sin coincidencias exactas ni por prefijo, las aproximadas (erratas)
+            for score, name_id in self._trigram_names(normalized, limit, min_score):
+                for position in self._name_users[name_id]:
+                    scores[position] = score
+                if limit is not None and len(scores) >= limit:
+                    break
+
+        ranked = sorted(
+            ((score, position) for position, score in scores.items() if score >= min_score),
+            key=lambda item: (-item[0], self._user_names[item[1]], item[1])
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(round(score, 3), self.users[position]) for score, position in ranked]
+
+    def best_matches(self, query, min_score=MIN_SCORE):
+        """
+        Devuelve todos los usuarios empatados con la mejor puntuación (los
+        homónimos de una coincidencia exacta, por ejemplo).
+
+        :return: Lista de tuplas (puntuación, usuario), vacía si no hay candidatos.
+        """
+        limit = 8
+        while True:
+            results = self.search(query, limit=limit, min_score=min_score)
+            if not results:
+                return []
+            best = results[0][0]
+            if len(results) < limit or results[-1][0] != best:
+                return [result for result in results if result[0] == best]
+            limit *= 4  # Todos los resultados empatan: puede haber más homónimos
+
+    def save(self, path=None):
+        """
+        Guarda los usuarios del índice en disco (JSON comprimido), junto con sus
+        nombres y correos ya normalizados.
+
+        :param path: Ruta del archivo (por defecto DEFAULT_INDEX_PATH).
+        """
+        path = path or DEFAULT_INDEX_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = path + '.tmp'
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as file:
+            json.dump({'built_at': self.built_at, 'users': self.users, 'keys': self._keys}, file, ensure_ascii=False)
+        os.replace(temp_path, path)  # Sustituir de una vez para no dejar un índice a medias
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        Carga un índice guardado con save().
+
+        :param path: Ruta del archivo (por defecto DEFAULT_INDEX_PATH).
+        :return: Instancia de RequesterIndex o None si el archivo no existe o no se puede leer.
+        """
+        path = path or DEFAULT_INDEX_PATH
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return cls(data.get('users', []), data.get('built_at'), data.get('keys'))
+
+    @classmethod
+    def build(cls):
+        """
+        Construye el índice recorriendo el listado paginado de usuarios de la API.
+
+        :return: Instancia de RequesterIndex.
+        :raises requests.exceptions.RequestException: Si falla alguna petición.
+        """
+        return cls(list(client.get_paginated('requesters', 'requesters')))
+
+
+def load_or_build(path=None, rebuild=False, max_age=None):
+    """
+    Carga el índice guardado o lo construye (y lo guarda) si no existe, ha
+    caducado o se pide reconstruirlo.
+
+    :param path: Ruta del archivo del índice.
+    :param rebuild: Si es True se descarga de nuevo aunque exista.
+    :param max_age: Antigüedad máxima en segundos del índice guardado (None para no caducar).
+    :return: Tupla (índice, construido) donde construido indica si se descargó de la API.
+    :raises requests.exceptions.RequestException: Si falla la descarga.
+    """
+    if not rebuild:
+        index = RequesterIndex.load(path)
+        if index is not None and (max_age is None or time.time() - index.built_at <= max_age):
+            return index, False
+    index = RequesterIndex.build()
+    index.save(path)
+    return index, True
@@ -0,0 +1,137 @@
+"""
+Agrupación de peticiones idénticas en curso ("single-flight").
+
+Cuando varios hilos o corrutinas piden a la vez el mismo recurso (por ejemplo,
+el mismo usuario para varios activos) antes de que exista una entrada en la
+caché, solo el primero hace la petición; los demás esperan a que termine y
+reciben su mismo resultado o una copia de su excepción. Una vez resuelta, la
+clave se libera, de modo que las peticiones posteriores vuelven a consultar la
+caché o la API con normalidad.
+"""
+import copy
+import threading
+
+
+class _Call:
+    """
+    Petición en curso y su resultado, compartidos por todos los que la esperan.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa las llamadas simultáneas con la misma clave desde varios hilos.
+
+    :param on_shared: Función opcional que se llama cada vez que una llamada se
+        une a otra en curso (por ejemplo, para contarlas en las métricas).
+    """
+
+    def __init__(self, on_shared=None):
+        self.on_shared = on_shared
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, function, *args):
+        """
+        Ejecuta function(*args), o espera al resultado de la llamada en curso con la misma clave.
+
+        :param key: Clave que identifica la petición (por ejemplo, ruta y parámetros).
+        :param function: Función que hace la petición.
+        :return: Resultado de la llamada.
+        :raises Exception: Una copia de la excepción que lanzó la llamada compartida.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            if self.on_shared is not None:
+                self.on_shared()
+            call.done.wait()
+            if call.error is not None:
+                raise _copy_error(call.error)
+            return call.result
+        try:
+            call.result = function(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def __len__(self):
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Agrupa las llamadas simultáneas con la misma clave desde varias corrutinas
+    del mismo bucle de eventos.
+
+    :param on_shared: Función opcional que se llama cada vez que una llamada se
+        une a otra en curso.
+    """
+
+    def __init__(self, on_shared=None):
+        self.on_shared = on_shared
+        self._tasks = {}
+
+    async def do(self, key, function, *args):
+        """
+        Ejecuta la corrutina function(*args), o espera a la que está en curso con la misma clave.
+
+        La petición se ejecuta en su propia tarea: si se cancela una de las
+        corrutinas que la esperan, las demás siguen recibiendo el resultado.
+
+        :return: Resultado de la llamada.
+        """
+        import asyncio  # Solo se necesita con el motor asíncrono
+
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(function(*args))
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+            return await asyncio.shield(task)
+        if self.on_shared is not None:
+            self.on_shared()
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise _copy_error(e) from None
+
+    def _forget(self, key, task):
+        """
+        Libera la clave al terminar la tarea y recoge su excepción, por si ya no
+        queda ninguna corrutina esperándola.
+        """
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self):
+        return len(self._tasks)
+
+
+def _copy_error(error):
+    """
+    Copia una excepción compartida para relanzarla en otro hilo o corrutina sin
+    que las trazas de todos se acumulen sobre el mismo objeto.
+    """
+    try:
+        duplicate = copy.copy(error)
+    except Exception:
+        return error
+    duplicate.__traceback__ = None
+    return duplicate
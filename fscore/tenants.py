@@ -0,0 +1,164 @@
+"""
+Configuración de varios tenants (cuentas) de Freshservice.
+
+Cada tenant tiene su propio subdominio, clave de la API y límite de peticiones,
+independiente del resto. Se definen en un archivo JSON (por defecto
+~/.config/fstools/tenants.json):
+
+    {
+        "tenants": {
+            "espana": {"subdomain": "acme-es", "api_key_env": "FS_KEY_ES", "rate_limit": 200, "ids": "1-20000"},
+            "mexico": {"subdomain": "acme-mx", "api_key": "...", "rate_limit": 100}
+        }
+    }
+
+- subdomain o base_url: Subdominio de Freshservice o URL base de la API.
+- api_key o api_key_env: Clave de la API o variable de entorno que la contiene
+  (para no guardar la clave en el archivo).
+- rate_limit (opcional): Peticiones por minuto del plan del tenant. Si no se
+  indica, el limitador se ajusta con las cabeceras de la API.
+- ids (opcional): IDs de activos que exporta fsexport.py si no se indican con -i.
+- shards (opcional): Tramos en que fsexport.py divide los IDs del tenant.
+
+Las respuestas guardadas en la caché local y el índice de usuarios se separan
+por tenant, para no mezclar datos de cuentas distintas.
+"""
+import json
+import os
+
+from fscore import cache as response_cache
+from fscore import client
+from fscore.ratelimit import RateLimiter
+
+# Ubicación por defecto del archivo de tenants
+DEFAULT_TENANTS_PATH = os.path.join(os.path.expanduser('~'), '.config', 'fstools', 'tenants.json')
+
+# Directorio bajo el que se guardan la caché y el índice de usuarios de cada tenant
+TENANTS_CACHE_DIR = os.path.join(response_cache.DEFAULT_CACHE_DIR, 'tenants')
+
+
+class TenantConfigError(ValueError):
+    """
+    El archivo de tenants no existe, no es válido o no define el tenant pedido.
+    """
+
+
+class Tenant:
+    """
+    Datos de conexión de un tenant.
+
+    :param name: Nombre del tenant en el archivo de configuración.
+    :param subdomain: Subdominio de Freshservice.
+    :param api_key: Clave de la API.
+    :param base_url: URL base alternativa de la API (por ejemplo, el servidor de pruebas).
+    :param rate_limit: Peticiones por minuto del plan, o None para ajustarlas con las cabeceras de la API.
+    :param ids: IDs de activos por defecto (mismo formato que -i) o None.
+    :param shards: Tramos en que se dividen sus IDs en fsexport.py, o None para usar el valor por defecto.
+    """
+
+    def __init__(self, name, subdomain=None, api_key=None, base_url=None, rate_limit=None, ids=None, shards=None):
+        self.name = name
+        self.subdomain = subdomain
+        self.api_key = api_key
+        self.base_url = base_url
+        self.rate_limit = rate_limit
+        self.ids = ids
+        self.shards = shards
+
+    @property
+    def cache_dir(self):
+        """
+        Directorio de la caché local y del índice de usuarios del tenant.
+        """
+        return os.path.join(TENANTS_CACHE_DIR, self.name)
+
+    def __repr__(self):
+        return f'Tenant({self.name!r}, subdomain={self.subdomain!r})'
+
+
+def load_tenants(path=None):
+    """
+    Lee el archivo de tenants.
+
+    :param path: Ruta del archivo JSON (por defecto DEFAULT_TENANTS_PATH).
+    :return: Diccionario nombre -> Tenant, en el orden del archivo.
+    :raises TenantConfigError: Si el archivo no existe o algún tenant no es válido.
+    """
+    path = path or DEFAULT_TENANTS_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        raise TenantConfigError(f"No existe el archivo de tenants '{path}'.") from None
+    except ValueError as e:
+        raise TenantConfigError(f"El archivo de tenants '{path}' no es JSON válido: {e}") from None
+
+    entries = data.get('tenants') if isinstance(data, dict) else None
+    if not isinstance(entries, dict) or not entries:
+        raise TenantConfigError(f"El archivo de tenants '{path}' debe tener una clave 'tenants' con al menos un tenant.")
+    return {name: _parse_tenant(name, entry) for name, entry in entries.items()}
+
+
+def _parse_tenant(name, entry):
+    """
+    Valida la definición de un tenant y crea su instancia de Tenant.
+    """
+    if not isinstance(entry, dict):
+        raise TenantConfigError(f"El tenant '{name}' debe ser un objeto JSON.")
+    if not entry.get('subdomain') and not entry.get('base_url'):
+        raise TenantConfigError(f"El tenant '{name}' necesita 'subdomain' o 'base_url'.")
+    api_key = entry.get('api_key')
+    if not api_key and entry.get('api_key_env'):
+        api_key = os.environ.get(entry['api_key_env'])
+        if not api_key:
+            raise TenantConfigError(f"La variable de entorno {entry['api_key_env']} con la clave del tenant '{name}' no está definida.")
+    if not api_key:
+        raise TenantConfigError(f"El tenant '{name}' necesita 'api_key' o 'api_key_env'.")
+    for field in ('rate_limit', 'shards'):
+        value = entry.get(field)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+            raise TenantConfigError(f"'{field}' del tenant '{name}' debe ser un entero positivo.")
+    return Tenant(
+        name,
+        subdomain=entry.get('subdomain'),
+        api_key=api_key,
+        base_url=entry.get('base_url'),
+        rate_limit=entry.get('rate_limit'),
+        ids=entry.get('ids'),
+        shards=entry.get('shards'),
+    )
+
+
+def get_tenant(name, path=None):
+    """
+    Devuelve un tenant del archivo de configuración.
+
+    :raises TenantConfigError: Si el archivo no es válido o no define el tenant.
+    """
+    tenants = load_tenants(path)
+    if name not in tenants:
+        raise TenantConfigError(f"El tenant '{name}' no está definido. Tenants disponibles: {', '.join(tenants)}.")
+    return tenants[name]
+
+
+def use_tenant(tenant, rate_per_minute=None, share=1):
+    """
+    Configura el cliente compartido del proceso para trabajar con un tenant.
+
+    :param tenant: Instancia de Tenant.
+    :param rate_per_minute: Peticiones por minuto de este proceso (por ejemplo, la parte
+        del límite del tenant que le corresponde a un tramo). Por defecto, el límite del
+        tenant o, si no lo define, el que indiquen las cabeceras de la API.
+    :param share: Sin límite fijo, número de procesos que usan el tenant a la vez: el
+        límite que indican las cabeceras de la API se reparte entre todos ellos.
+    """
+    rate_per_minute = rate_per_minute or tenant.rate_limit
+    client.base_url = tenant.base_url  # Sin base_url se usa la URL del subdominio
+    client.configure(key=tenant.api_key, domain=tenant.subdomain, rate_per_minute=rate_per_minute)
+    if rate_per_minute is None:
+        # Limitador nuevo y adaptativo: no heredar el ritmo de otro tenant atendido por el mismo proceso
+        client.limiter = RateLimiter(share=share)
+    response_cache.DEFAULT_CACHE_DIR = tenant.cache_dir
+    from fscore import requester_index  # Solo se necesita para separar el índice por tenant
+
+    requester_index.DEFAULT_INDEX_PATH = os.path.join(tenant.cache_dir, 'requesters.json.gz')
@@ -0,0 +1,330 @@
+import os
+import time
+import shutil
+import tempfile
+import argparse
+from colorama import Fore, init
+from fscore import cli  # Opciones comunes de línea de comandos (--rate-limit, --stats)
+from fscore import client  # Cliente HTTP compartido (se configura en cada proceso para su tenant)
+from fscore import export  # Escritura en streaming de los informes
+from fscore import fastjson
+from fscore import metrics  # Métricas de cada tramo (peticiones realizadas)
+from fscore import tenants  # Configuración de los tenants (subdominio, clave y límite de peticiones)
+from fscore.ids import IdSet
+from fscore.planner import plan_fetch
+import fsmanage  # Obtención de los activos y construcción de las filas del informe
+
+# Inicializar colorama
+init(autoreset=True)
+
+# Columna que identifica el tenant de cada fila del informe combinado
+TENANT_COLUMN = 'tenant'
+
+
+class ShardError(Exception):
+    """
+    Error de un tramo en el que algún activo no se pudo obtener por errores de la API.
+    """
+
+
+# Función para dividir el trabajo de cada tenant en tramos
+def plan_shards(selected_tenants, ids_input, exclude_input, shards, processes=None, rate_limit=None):
+    """
+    Divide los IDs de cada tenant en tramos consecutivos con el mismo número de
+    activos. El límite de peticiones de cada tenant (--rate-limit, su
+    'rate_limit' o, si no hay ninguno, el que anuncian las cabeceras de la API)
+    se reparte a partes iguales entre los tramos que pueden ejecutarse a la vez
+    (como mucho, uno por proceso), de modo que entre todos no lo superan. Los
+    tenants no comparten límite, así que el ritmo total crece con el número de
+    tenants.
+
+    :param selected_tenants: Lista de instancias de Tenant.
+    :param ids_input: IDs de -i (mismo formato que en fsmanage.py) o None para usar los 'ids' de cada tenant.
+    :param exclude_input: IDs a excluir (-e) o None.
+    :param shards: Tramos por tenant si el tenant no define 'shards'.
+    :param processes: Número máximo de procesos simultáneos, o None para uno por tramo.
+    :param rate_limit: Peticiones por minuto de cada tenant; tiene prioridad sobre su 'rate_limit'.
+    :return: Lista de tramos (diccionarios con tenant, shard, shards, ranges, assets, rate y share;
+        rate es None si el limitador se ajusta con las cabeceras de la API, y share es el
+        número de tramos simultáneos del tenant entre los que se reparte el límite).
+    """
+    tasks = []
+    for tenant in selected_tenants:
+        source = ids_input or tenant.ids
+        if not source:
+            print(f"{Fore.YELLOW}Advertencia: No se indicaron IDs para el tenant '{tenant.name}' (usa -i o 'ids' en el archivo de tenants). Se omite.")
+            continue
+        asset_ids = fsmanage.process_asset_ids(source, exclude_input)
+        if not asset_ids:
+            print(f"{Fore.YELLOW}Advertencia: No hay IDs válidos para el tenant '{tenant.name}'. Se omite.")
+            continue
+        parts = asset_ids.split(tenant.shards or shards)
+        limit = rate_limit or tenant.rate_limit
+        concurrent = min(processes or len(parts), len(parts))
+        rate = max(1, limit // concurrent) if limit else None
+        for index, part in enumerate(parts, start=1):
+            tasks.append({
+                "tenant": tenant,
+                "shard": index,
+                "shards": len(parts),
+                "ranges": part.ranges,
+                "assets": len(part),
+                "rate": rate,
+                "share": concurrent
+            })
+    return tasks
+
+
+# Función que exporta un tramo en un proceso independiente
+def export_shard(task, options, workers, engine, cache, part_path):
+    """
+    Configura el cliente del proceso para el tenant del tramo, obtiene sus
+    activos y escribe sus filas (con la columna del tenant) en un archivo JSONL
+    temporal.
+
+    :param task: Tramo devuelto por plan_shards.
+    :param options: Diccionario de opciones de fsmanage.build_options.
+    :param workers: Activos que se procesan en paralelo dentro del tramo.
+    :param engine: Motor de procesamiento: 'thread' o 'async'.
+    :param cache: Indica si se usa la caché local (separada por tenant).
+    :param part_path: Archivo JSONL donde se escriben las filas del tramo.
+    :return: Diccionario con el resumen del tramo (activos, filas, peticiones, métricas y duración).
+    :raises ShardError: Si algún activo no se pudo obtener (por ejemplo, porque la API siguió
+        respondiendo 429 o 5xx tras los reintentos): el tramo no se da por completado.
+    :raises requests.exceptions.RequestException: Si no se pudieron descargar los catálogos o el listado de activos.
+    """
+    start = time.perf_counter()
+    tenant = task["tenant"]
+
+    # Un mismo proceso puede atender tramos de varios tenants: no reutilizar sus datos
+    fsmanage.reset_reference_data()
+    metrics.reset()
+    tenants.use_tenant(tenant, task["rate"], task["share"])
+    if cache:
+        client.enable_cache()
+
+    asset_ids = IdSet(task["ranges"])
+    failed = 0
+    try:
+        with metrics.timer('reference_data'):
+            fsmanage.load_reference_data(options["include_departments"], options["include_asset_type"], options["include_location"])
+        plan = plan_fetch(asset_ids, options, cached_catalogs=fsmanage.cached_catalogs(), rate_per_minute=client.limiter.rate_per_minute)
+        results = fsmanage.run_plan(plan, asset_ids, options, workers, engine)
+        with export.JsonlWriter(part_path) as writer:
+            for rows in results:
+                if rows is None:  # El activo no se pudo obtener
+                    failed += 1
+                    continue
+                for row in rows:
+                    writer.write_row({TENANT_COLUMN: tenant.name, **row})
+    finally:
+        client.disable_cache()
+        client.close()
+    if failed:
+        raise ShardError(f"{failed} de {task['assets']} activos no se pudieron obtener por errores de la API")
+    return {
+        "tenant": tenant.name,
+        "shard": task["shard"],
+        "assets": task["assets"],
+        "rows": writer.rows_written,
+        "requests": metrics.summary()["requests"],
+        "metrics": metrics.summary(),
+        "seconds": time.perf_counter() - start
+    }
+
+
+# Función para combinar los archivos de los tramos en el informe final
+def merge_parts(part_paths, output_file):
+    """
+    Escribe en el informe final las filas de los tramos, en orden (tenant y tramo),
+    leyéndolas en streaming.
+
+    :param part_paths: Archivos JSONL de los tramos completados, en orden.
+    :param output_file: Archivo de salida (cualquier formato de fscore.export).
+    :return: Número de filas escritas.
+    """
+    with export.open_writer(output_file) as writer:
+        for part_path in part_paths:
+            if not os.path.exists(part_path):
+                continue  # Tramo sin filas
+            with open(part_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    writer.write_row(fastjson.loads(line))
+        return writer.rows_written
+
+
+# Función para ordenar los tramos de forma que los tenants avancen a la vez
+def _interleave(tasks):
+    """
+    Devuelve las posiciones de los tramos alternando tenants (primer tramo de
+    cada tenant, después el segundo...), para que con menos procesos que tramos
+    todos los tenants consuman su límite de peticiones a la vez.
+    """
+    return sorted(range(len(tasks)), key=lambda index: tasks[index]["shard"])
+
+
+# Función principal (devuelve el código de salida del proceso)
+def main(tenant_names, ids_input, exclude_input, options, output_file, tenants_file=None, shards=1, processes=None, workers=4, engine='thread', cache=False, rate_limit=None, stats_args=None):
+    """
+    Exporta los activos de los tenants elegidos y combina los tramos en un único informe.
+
+    :param rate_limit: Peticiones por minuto de cada tenant, repartidas entre sus tramos simultáneos.
+    :param stats_args: Argumentos con --stats y --stats-json; si se indican, se muestran o
+        guardan las métricas de todos los tramos combinadas.
+    :return: Código de salida (0 si el informe se guardó completo, 1 si hubo errores).
+    """
+    # Si no tiene extensión, generar el informe en Excel como fsmanage.py
+    if not os.path.splitext(output_file)[1]:
+        output_file += ".xlsx"
+    if not export.get_format(output_file):
+        print(f"{Fore.RED}Error: Formato de salida no admitido '{output_file}'. Usa una de estas extensiones: {', '.join(export.FORMATS)}.")
+        return 1
+    missing = export.missing_dependency(output_file)
+    if missing:
+        print(f"{Fore.RED}Error: El formato de '{output_file}' requiere el paquete {missing} (pip install {missing}).")
+        return 1
+    if engine == 'async':
+        try:
+            import aiohttp  # noqa: F401  Comprobar que la dependencia opcional está instalada
+        except ImportError:
+            print(f"{Fore.RED}Error: El motor asíncrono requiere el paquete aiohttp (pip install aiohttp).")
+            return 1
+
+    # Leer los tenants y quedarse con los pedidos (por defecto, todos)
+    try:
+        available = tenants.load_tenants(tenants_file)
+    except tenants.TenantConfigError as e:
+        print(f"{Fore.RED}Error: {e}")
+        return 1
+    unknown = [name for name in tenant_names or () if name not in available]
+    if unknown:
+        print(f"{Fore.RED}Error: Tenants no definidos: {', '.join(unknown)}. Tenants disponibles: {', '.join(available)}.")
+        return 1
+    selected = [available[name] for name in (tenant_names or available)]
+
+    tasks = plan_shards(selected, ids_input, exclude_input, shards, processes, rate_limit)
+    if not tasks:
+        print(f"{Fore.RED}Error: No hay activos que exportar.")
+        return 1
+    processes = max(1, processes or len(tasks))
+    print(f"{Fore.CYAN}Exportando {sum(task['assets'] for task in tasks)} activos de {len({task['tenant'].name for task in tasks})} tenants en {len(tasks)} tramos con {min(processes, len(tasks))} procesos...")
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed  # Solo se necesita al repartir los tramos
+
+    work_dir = tempfile.mkdtemp(prefix='fsexport-')
+    part_paths = [os.path.join(work_dir, f"{index:05d}.jsonl") for index in range(len(tasks))]
+    failed = 0  # Tramos que fallaron
+    total_requests = 0
+    summaries = []  # Métricas de cada tramo completado
+    row_count = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = {}
+            for index in _interleave(tasks):
+                task = tasks[index]
+                futures[executor.submit(export_shard, task, options, workers, engine, cache, part_paths[index])] = task
+            for future in as_completed(futures):
+                task = futures[future]
+                label = f"{task['tenant'].name} (tramo {task['shard']}/{task['shards']})"
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"{Fore.RED}Error en {label}: {e}")
+                    continue
+                total_requests += result["requests"]
+                summaries.append(result["metrics"])
+                print(f"{Fore.GREEN}{label}: {result['assets']} activos, {result['rows']} filas, {result['requests']} peticiones en {result['seconds']:.1f} s")
+
+        # Un informe incompleto no se escribe: quien lo use no podría saber qué activos faltan
+        if not failed:
+            row_count = merge_parts(part_paths, output_file)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    if stats_args is not None:
+        cli.report_metrics(stats_args, metrics.combine(summaries, elapsed))
+    if failed:
+        print(f"{Fore.RED}{failed} tramos fallaron.")
+        print(f"{Fore.RED}No se ha guardado el informe porque estaría incompleto.")
+        return 1
+    if not row_count:
+        print(f"{Fore.RED}No se obtuvieron datos.")
+        return 1
+    print(f"{Fore.GREEN}Datos guardados en {output_file} ({row_count} filas, {total_requests} peticiones en {elapsed:.1f} s).")
+    return 0
+
+if __name__ == "__main__":
+    # Configurar argumentos de línea de comandos
+    parser = argparse.ArgumentParser(
+        description=f"{Fore.CYAN}Exporta los activos de varios tenants de Freshservice en paralelo (un proceso por tramo de IDs) a un único informe con la columna 'tenant'.",
+        epilog=f"{Fore.YELLOW}Ejemplo de uso: python fsexport.py --tenants espana mexico -i 1-20000 --shards 2 -a -o inventario.parquet"
+    )
+    parser.add_argument(
+        '--tenants-file',
+        metavar='ARCHIVO',
+        help=f"{Fore.GREEN}Archivo JSON con los tenants (por defecto: {tenants.DEFAULT_TENANTS_PATH})."
+    )
+    parser.add_argument(
+        '-T', '--tenants',
+        nargs='+',
+        metavar='TENANT',
+        help=f"{Fore.GREEN}Tenants que se exportan (por defecto: todos los del archivo)."
+    )
+    parser.add_argument(
+        '-i', '--ids',
+        help=f"{Fore.GREEN}IDs o rangos de los activos de cada tenant (mismo formato que en fsmanage.py). Por defecto, los 'ids' de cada tenant en el archivo."
+    )
+    parser.add_argument(
+        '-e', '--exclude',
+        help=f"{Fore.GREEN}IDs de los activos a excluir en todos los tenants."
+    )
+    parser.add_argument(
+        '-o', '--output',
+        required=True,
+        help=f"{Fore.GREEN}Archivo del informe combinado: Excel (.xlsx, por defecto), .csv, .json, .jsonl, .parquet o .feather."
+    )
+    fsmanage.add_report_arguments(parser)
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=1,
+        help=f"{Fore.GREEN}Tramos de IDs en que se divide cada tenant, cada uno en su propio proceso y con una parte del límite de peticiones del tenant (por defecto: 1; se puede fijar por tenant con 'shards')."
+    )
+    parser.add_argument(
+        '-p', '--processes',
+        type=int,
+        help=f"{Fore.GREEN}Número máximo de procesos simultáneos (por defecto: uno por tramo)."
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=4,
+        help=f"{Fore.GREEN}Activos que se procesan en paralelo dentro de cada tramo (por defecto: 4)."
+    )
+    parser.add_argument(
+        '--engine',
+        choices=['thread', 'async'],
+        default='thread',
+        help=f"{Fore.GREEN}Motor de procesamiento de cada tramo: 'thread' o 'async' (requiere aiohttp). Por defecto: thread."
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help=f"{Fore.GREEN}Usa la caché local de respuestas, separada por tenant (~/.cache/fstools/tenants)."
+    )
+    cli.add_client_arguments(
+        parser,
+        tenant_options=False,
+        rate_limit_help=f"{Fore.GREEN}Peticiones por minuto de cada tenant, repartidas entre sus tramos simultáneos. Por defecto, el 'rate_limit' del tenant o, si no lo tiene, el límite que anuncian las cabeceras de la API (también repartido)."
+    )
+    args = parser.parse_args()
+
+    options = fsmanage.build_options(args.components, args.asset_data, args.departments, args.asset_type, args.location, args.user, args.system_os, args.machine_ip, args.type_field)
+    if options is None:
+        raise SystemExit(1)
+
+    # Ejecutar la función principal con los argumentos especificados
+    raise SystemExit(main(args.tenants, args.ids, args.exclude, options, args.output, args.tenants_file, args.shards, args.processes, args.workers, args.engine, args.cache, args.rate_limit, args))
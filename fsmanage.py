@@ -1,112 +1,152 @@
 import os
-import pandas as pd
+import threading
+from collections import deque
 import requests
 import argparse
 from colorama import Fore, Style, init
-import openpyxl
-from openpyxl.styles import Alignment, Font, PatternFill
+from fscore import cli  # Opciones comunes de línea de comandos (--rate-limit y --stats)
+from fscore import client  # Cliente HTTP compartido (clave, subdominio y pool de conexiones)
+from fscore import export  # Escritura en streaming de los informes
+from fscore import metrics  # Métricas de la ejecución (--stats)
+from fscore.ids import IdSet, iter_tokens, parse_token, split_tokens
+from fscore.checkpoint import Checkpoint, CheckpointMismatchError
+from fscore.memo import LRUCache
+from fscore.planner import ASSET_PAGE_SIZE, needs_asset_request, plan_fetch
+from fscore.records import AssetProjection
 
 # Inicializar colorama
 init(autoreset=True)
 
-# Configuración de la API (Clave definida directamente en el código)
-api_key = 'your_api_key'  # Reemplaza 'your_default_api_key' con tu clave real
-subdomain = 'subdomain'  # Subdominio de Freshservice
-base_url = f'https://{subdomain}.freshservice.com/api/v2/assets/'
+# Número máximo de usuarios que se recuerdan durante una ejecución
+USER_CACHE_SIZE = 4096
+
+# Campos de type_fields que se extraen de cada activo (columna del informe -> campo de la API).
+# Se pueden redefinir o ampliar desde la línea de comandos con -f columna=campo.
+TYPE_FIELDS = {
+    "system_os": "os_23001176139",  # -s: Sistema operativo
+    "machine_ip": "computer_ip_address_23001176139"  # -n: Dirección IP
+}
+
+# Traducción de las abreviaturas de -c a los tipos de componentes de la API.
+# Por ejemplo, "-c cpu ram" busca los componentes de tipo "Processor" y "Memory".
+COMPONENT_TRANSLATION = {
+    "cpu": "Processor",       # Procesador
+    "ram": "Memory",          # Memoria RAM
+    "hdd": "Logical Drive",   # Disco lógico
+    "nic": "Network Adapter"  # Adaptador de red
+}
 
 
 # Función para obtener los componentes de un activo
 def get_asset_components(asset_id):
-    url = f'https://{subdomain}.freshservice.com/api/v2/assets/{asset_id}/components/'  # Endpoint para componentes
     try:
-        response = requests.get(url, auth=(api_key, ''))
-        response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-        data = response.json()
+        data = client.get_json(f'assets/{asset_id}/components/')  # Endpoint para componentes
         if 'components' in data:  # Verificar si la clave 'components' está presente
             return data['components']
         else:
             print(f"{Fore.YELLOW}Advertencia: No se encontraron componentes para el ID {asset_id}")
             return []
     except requests.exceptions.RequestException as e:
-        print(f"{Fore.RED}Error al obtener componentes para el ID {asset_id}: {e}")
+        _raise_unless_not_found(e, f"Error al obtener componentes para el ID {asset_id}")
+        print(f"{Fore.YELLOW}Advertencia: No se encontraron componentes para el ID {asset_id}")
         return []
 
+# Función para distinguir un recurso inexistente (404) de un error de la API
+def is_not_found(error):
+    """
+    Indica si el error de una petición se debe a que el recurso no existe (404).
+
+    :param error: Excepción de requests.
+    """
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code == 404
+
+def _raise_unless_not_found(error, error_message):
+    """
+    Trata el error de una petición de un activo o de uno de sus datos de
+    referencia. Si el recurso no existe (404) no hace nada y el llamante lo
+    trata como un resultado vacío ('Unknown'); con cualquier otro error (5xx,
+    429 tras los reintentos, red) lo muestra y lo vuelve a lanzar, para que el
+    activo falle y no se dé por completado (por ejemplo, en el checkpoint).
+    """
+    if is_not_found(error):
+        return
+    print(f"{Fore.RED}{error_message}: {error}")
+    raise error
+
 # Función para obtener los departamentos desde la API
 def get_departments():
-    url = f'https://{subdomain}.freshservice.com/api/v2/departments/'  # URL correcta para departamentos
     try:
-        response = requests.get(url, auth=(api_key, ''))
-        response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-        data = response.json()
-        if 'departments' in data:  # Verificar si la clave 'departments' está presente
-            return {dept['id']: dept['name'] for dept in data['departments']}
-        else:
+        # Recorrer todas las páginas del listado de departamentos
+        departments = {dept['id']: dept['name'] for dept in client.get_paginated('departments/', 'departments')}
+        if not departments:
             print(f"{Fore.YELLOW}Advertencia: No se encontraron departamentos.")
-            return {}
+        return departments
     except requests.exceptions.RequestException as e:
         print(f"{Fore.RED}Error al obtener departamentos: {e}")
-        return {}
+        raise  # Distinto de un catálogo vacío: no se memoriza y se reintenta
 
-# Función para obtener los datos de un activo
-def get_asset_data(asset_id):
-    url = f'https://{subdomain}.freshservice.com/api/v2/assets/{asset_id}'  # Endpoint para obtener datos del activo
+# Función para obtener los datos de un activo (y, si se piden, sus type_fields en la misma petición)
+def get_asset_data(asset_id, include_type_fields=False):
     try:
-        response = requests.get(url, auth=(api_key, ''))
-        response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-        data = response.json()
+        params = {'include': 'type_fields'} if include_type_fields else None
+        data = client.get_json(f'assets/{asset_id}', params)  # Endpoint para obtener datos del activo
         if 'asset' in data:  # Verificar si la clave 'asset' está presente
             return data['asset']
         else:
             print(f"{Fore.YELLOW}Advertencia: No se encontraron datos para el ID {asset_id}")
             return None
     except requests.exceptions.RequestException as e:
-        print(f"{Fore.RED}Error al obtener datos para el ID {asset_id}: {e}")
+        _raise_unless_not_found(e, f"Error al obtener datos para el ID {asset_id}")
+        print(f"{Fore.YELLOW}Advertencia: No se encontraron datos para el ID {asset_id}")
         return None
 
 # Función para obtener los tipos de activos desde la API
 def get_asset_types():
-    url = f'https://{subdomain}.freshservice.com/api/v2/asset_types/'  # URL para obtener los tipos de activos
     try:
-        response = requests.get(url, auth=(api_key, ''))
-        response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-        data = response.json()
-        if 'asset_types' in data:  # Verificar si la clave 'asset_types' está presente
-            return {asset_type['id']: asset_type['name'] for asset_type in data['asset_types']}
-        else:
+        # Recorrer todas las páginas del listado de tipos de activos
+        asset_types = {asset_type['id']: asset_type['name'] for asset_type in client.get_paginated('asset_types/', 'asset_types')}
+        if not asset_types:
             print(f"{Fore.YELLOW}Advertencia: No se encontraron tipos de activos.")
-            return {}
+        return asset_types
     except requests.exceptions.RequestException as e:
         print(f"{Fore.RED}Error al obtener tipos de activos: {e}")
-        return {}
+        raise  # Distinto de un catálogo vacío: no se memoriza y se reintenta
 
 # Función para obtener el nombre del tipo de activo desde la API
 def get_asset_type_name(asset_type_id):
-    url = f'https://{subdomain}.freshservice.com/api/v2/asset_types/{asset_type_id}'  # URL para obtener el tipo de activo
     try:
-        response = requests.get(url, auth=(api_key, ''))
-        response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-        data = response.json()
+        data = client.get_json(f'asset_types/{asset_type_id}')  # URL para obtener el tipo de activo
         if 'asset_type' in data:  # Verificar si la clave 'asset_type' está presente
             return data['asset_type'].get('name', 'Unknown')  # Devolver el nombre del tipo de activo
         else:
             return 'Unknown'
     except requests.exceptions.RequestException as e:
-        print(f"{Fore.RED}Error al obtener el tipo de activo para ID {asset_type_id}: {e}")
+        _raise_unless_not_found(e, f"Error al obtener el tipo de activo para ID {asset_type_id}")
         return 'Unknown'
 
+# Función para obtener las ubicaciones desde la API
+def get_locations():
+    try:
+        # Recorrer todas las páginas del listado de ubicaciones
+        locations = {location['id']: location['name'] for location in client.get_paginated('locations/', 'locations')}
+        if not locations:
+            print(f"{Fore.YELLOW}Advertencia: No se encontraron ubicaciones.")
+        return locations
+    except requests.exceptions.RequestException as e:
+        print(f"{Fore.RED}Error al obtener ubicaciones: {e}")
+        raise  # Distinto de un catálogo vacío: no se memoriza y se reintenta
+
 # Función para obtener el nombre de la ubicación desde la API
 def get_location_name(location_id):
-    url = f'https://{subdomain}.freshservice.com/api/v2/locations/{location_id}'  # URL para obtener la ubicación
     try:
-        response = requests.get(url, auth=(api_key, ''))
-        response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-        data = response.json()
+        data = client.get_json(f'locations/{location_id}')  # URL para obtener la ubicación
         if 'location' in data:  # Verificar si la clave 'location' está presente
             return data['location'].get('name', 'Unknown')  # Devolver el nombre de la ubicación
         else:
             return 'Unknown'
     except requests.exceptions.RequestException as e:
-        print(f"{Fore.RED}Error al obtener la ubicación para ID {location_id}: {e}")
+        _raise_unless_not_found(e, f"Error al obtener la ubicación para ID {location_id}")
         return 'Unknown'
 
 # Función para obtener la información del usuario desde la API
@@ -115,109 +155,253 @@ def get_user_info(user_id):
     Obtiene la información del usuario desde la API.
 
     :param user_id: ID del usuario.
-    :return: Diccionario con el nombre, apellido y correo electrónico del usuario.
+    :return: Diccionario con el nombre, apellido y correo electrónico del usuario ('Unknown' si no existe).
+    :raises requests.exceptions.RequestException: Si la petición falla por un motivo distinto de que el usuario no exista.
     """
-    url = f'https://{subdomain}.freshservice.com/api/v2/requesters/{user_id}'  # URL para obtener la información del usuario
     try:
-        response = requests.get(url, auth=(api_key, ''))
-        response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-        data = response.json()
+        data = client.get_json(f'requesters/{user_id}')  # URL para obtener la información del usuario
         if 'requester' in data:  # Verificar si la clave 'requester' está presente
-            user = data['requester']
-            return {
-                "first_name": user.get('first_name', 'Unknown'),
-                "last_name": user.get('last_name', 'Unknown'),
-                "primary_email": user.get('primary_email', 'Unknown')
-            }
+            return summarize_user(data['requester'])
         else:
-            return {"first_name": "Unknown", "last_name": "Unknown", "primary_email": "Unknown"}
+            return summarize_user({})
     except requests.exceptions.RequestException as e:
-        print(f"{Fore.RED}Error al obtener la información del usuario para ID {user_id}: {e}")
-        return {"first_name": "Unknown", "last_name": "Unknown", "primary_email": "Unknown"}
+        _raise_unless_not_found(e, f"Error al obtener la información del usuario para ID {user_id}")
+        return summarize_user({})
 
-# Función para obtener el sistema operativo de la máquina desde la API
-def get_system_os(asset_id):
+def summarize_user(user):
     """
-    Obtiene el sistema operativo de la máquina desde la API.
+    Extrae el nombre, apellido y correo electrónico de los datos de un usuario.
 
-    :param asset_id: ID del activo.
-    :return: Nombre del sistema operativo o 'Unknown' si no se encuentra.
+    :param user: Diccionario del usuario tal como lo devuelve la API.
+    :return: Diccionario con first_name, last_name y primary_email ('Unknown' si faltan).
     """
-    # Construir correctamente la URL para evitar problemas con caracteres especiales
-    url = f'https://{subdomain}.freshservice.com/api/v2/assets?include=type_fields&filter="name:\'ASSET-{asset_id}\'"'
-    try:
-        response = requests.get(url, auth=(api_key, ''))
-        response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-        data = response.json()
-        if 'assets' in data and len(data['assets']) > 0:  # Verificar si hay activos en la respuesta
-            asset = data['assets'][0]
-            # Asegurarse de que la clave 'type_fields' esté presente y obtener el sistema operativo
-            type_fields = asset.get('type_fields', {})
-            return type_fields.get('os_23001176139', 'Unknown')  # Extraer el sistema operativo
-        else:
-            print(f"{Fore.YELLOW}Advertencia: No se encontró el sistema operativo para el activo ID {asset_id}.")
-            return 'Unknown'
-    except requests.exceptions.RequestException as e:
-        print(f"{Fore.RED}Error al obtener el sistema operativo para el activo ID {asset_id}: {e}")
-        return 'Unknown'
+    return {
+        "first_name": user.get('first_name', 'Unknown'),
+        "last_name": user.get('last_name', 'Unknown'),
+        "primary_email": user.get('primary_email', 'Unknown')
+    }
 
-# Función para obtener la dirección IP de la máquina desde la API
-def get_machine_ip(asset_id):
+# Función para extraer campos de type_fields de un activo
+def extract_type_fields(asset, fields):
     """
-    Obtiene la dirección IP de la máquina desde la API.
+    Extrae los campos indicados de la clave 'type_fields' de un activo ya descargado.
 
-    :param asset_id: ID del activo.
-    :return: Dirección IP o 'Unknown' si no se encuentra.
+    :param asset: Diccionario del activo incluido con include=type_fields.
+    :param fields: Diccionario columna -> nombre del campo dentro de type_fields.
+    :return: Diccionario columna -> valor ('Unknown' si el campo no se encuentra).
     """
-    url = f'https://{subdomain}.freshservice.com/api/v2/assets?include=type_fields&filter="name:\'ASSET-{asset_id}\'"'
-    try:
-        response = requests.get(url, auth=(api_key, ''))
-        response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-        data = response.json()
-        if 'assets' in data and len(data['assets']) > 0:  # Verificar si hay activos en la respuesta
-            asset = data['assets'][0]
-            # Asegurarse de que la clave 'type_fields' esté presente y obtener la dirección IP
-            type_fields = asset.get('type_fields', {})
-            return type_fields.get('computer_ip_address_23001176139', 'Unknown')  # Extraer la dirección IP
-        else:
-            print(f"{Fore.YELLOW}Advertencia: No se encontró la dirección IP para el activo ID {asset_id}.")
-            return 'Unknown'
-    except requests.exceptions.RequestException as e:
-        print(f"{Fore.RED}Error al obtener la dirección IP para el activo ID {asset_id}: {e}")
-        return 'Unknown'
+    type_fields = asset.get('type_fields') or {}
+    return {column: type_fields.get(field, 'Unknown') for column, field in fields.items()}
+
+# Función para obtener en bloque los activos pedidos mediante el listado paginado
+def fetch_assets_bulk(asset_ids, bulk_filter=None, projection=None):
+    """
+    Recorre el listado paginado de activos (con sus type_fields) y se queda solo
+    con los activos cuyo display_id está entre los pedidos. El recorrido termina
+    en cuanto se han encontrado todos.
+
+    :param asset_ids: IdSet con los IDs de los activos a buscar.
+    :param bulk_filter: Filtro opcional de la API para acotar el listado (por ejemplo: asset_type_id:23000123456).
+    :param projection: AssetProjection opcional para guardar solo los campos que usa el informe.
+    :return: Diccionario ID -> datos del activo (incluye 'type_fields') o AssetRecord con los activos encontrados.
+    :raises requests.exceptions.RequestException: Si alguna página del listado no se puede obtener.
+    """
+    found = {}
+    params = {'include': 'type_fields'}
+    if bulk_filter:
+        params['filter'] = f'"{bulk_filter}"'
+    for asset in client.get_paginated('assets', 'assets', params, per_page=ASSET_PAGE_SIZE):
+        display_id = asset.get('display_id')
+        if display_id in asset_ids:
+            found[display_id] = projection(asset) if projection else asset
+            if len(found) == len(asset_ids):
+                break  # No hace falta recorrer el resto de páginas
+    return found
+
+# Datos de referencia: catálogos (ID -> nombre) que se descargan una sola vez por ejecución
+# y memoria LRU de usuarios, para no repetir la misma consulta en cada activo
+_catalog_loaders = {
+    "departments": get_departments,
+    "asset_types": get_asset_types,
+    "locations": get_locations
+}
+_catalog_paths = {
+    "departments": "departments/",
+    "asset_types": "asset_types/",
+    "locations": "locations/"
+}
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+_user_cache = LRUCache(USER_CACHE_SIZE)
+_user_directory = None  # Fuente local de usuarios (por ejemplo, la réplica de --mirror)
+
+def get_catalog(name):
+    """
+    Devuelve un catálogo de referencia, descargándolo la primera vez que se pide.
+    Si la descarga falla no se memoriza nada, de modo que la siguiente llamada
+    vuelve a intentarlo.
+
+    :param name: Nombre del catálogo ('departments', 'asset_types' o 'locations').
+    :return: Diccionario ID -> nombre.
+    :raises requests.exceptions.RequestException: Si el catálogo no se pudo descargar.
+    """
+    catalog = _catalogs.get(name)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(name)
+            if catalog is None:
+                catalog = _catalogs[name] = _catalog_loaders[name]()
+    return catalog
+
+def cached_catalogs():
+    """
+    Devuelve los nombres de los catálogos que no hace falta pedir a la API porque
+    ya están en memoria o en la caché persistente en disco.
+    """
+    return {
+        name for name, path in _catalog_paths.items()
+        if name in _catalogs or client.is_cached(path, {'per_page': client.MAX_PER_PAGE, 'page': 1})
+    }
+
+def load_reference_data(include_departments, include_asset_type, include_location):
+    """
+    Precarga los catálogos de referencia necesarios para las opciones habilitadas.
+
+    :param include_departments: Indica si se necesita el catálogo de departamentos.
+    :param include_asset_type: Indica si se necesita el catálogo de tipos de activos.
+    :param include_location: Indica si se necesita el catálogo de ubicaciones.
+    """
+    if include_departments:
+        get_catalog("departments")
+    if include_asset_type:
+        get_catalog("asset_types")
+    if include_location:
+        get_catalog("locations")
+
+def seed_reference_data(catalogs, user_directory=None):
+    """
+    Carga los catálogos desde una fuente local en lugar de la API.
+
+    :param catalogs: Diccionario nombre del catálogo -> diccionario ID -> nombre.
+    :param user_directory: Función opcional que recibe un ID de usuario y devuelve sus
+        datos (como los de la API) o None si no los conoce.
+    """
+    global _user_directory
+    with _catalogs_lock:
+        _catalogs.update(catalogs)
+    _user_directory = user_directory
+
+def reset_reference_data():
+    """
+    Descarta los catálogos y los usuarios memorizados.
+    """
+    global _user_directory
+    with _catalogs_lock:
+        _catalogs.clear()
+    _user_cache.clear()
+    _user_directory = None
+
+def lookup_department_name(department_id):
+    """
+    Devuelve el nombre del departamento usando el catálogo precargado.
+    """
+    return get_catalog("departments").get(department_id, 'Unknown')
+
+def lookup_asset_type_name(asset_type_id):
+    """
+    Devuelve el nombre del tipo de activo usando el catálogo precargado. Si el
+    tipo no está en el catálogo se consulta individualmente y se añade a él.
+    """
+    catalog = get_catalog("asset_types")
+    if asset_type_id not in catalog:
+        name = get_asset_type_name(asset_type_id)
+        if name == 'Unknown':
+            return name
+        catalog[asset_type_id] = name
+    return catalog[asset_type_id]
+
+def lookup_location_name(location_id):
+    """
+    Devuelve el nombre de la ubicación usando el catálogo precargado. Si la
+    ubicación no está en el catálogo se consulta individualmente y se añade a él.
+    """
+    catalog = get_catalog("locations")
+    if location_id not in catalog:
+        name = get_location_name(location_id)
+        if name == 'Unknown':
+            return name
+        catalog[location_id] = name
+    return catalog[location_id]
+
+def _is_known_user(user_info):
+    """
+    Indica si la información de usuario contiene algún dato real (no solo 'Unknown').
+    """
+    return any(value != 'Unknown' for value in user_info.values())
+
+def known_user_info(user_id):
+    """
+    Devuelve la información de un usuario si ya se conoce (memorizada o en la
+    fuente local de usuarios), o None si hay que pedirla a la API.
+    """
+    user_info = _user_cache.get(user_id)
+    if user_info is None and _user_directory is not None:
+        user = _user_directory(user_id)
+        if user is not None:
+            user_info = summarize_user(user)
+            _user_cache.put(user_id, user_info)
+    return user_info
+
+def lookup_user_info(user_id):
+    """
+    Devuelve la información del usuario, consultando la API solo la primera vez
+    que aparece cada ID (hasta USER_CACHE_SIZE usuarios distintos).
+    """
+    user_info = known_user_info(user_id)
+    if user_info is None:
+        user_info = get_user_info(user_id)
+        if _is_known_user(user_info):  # No memorizar los errores para poder reintentarlos
+            _user_cache.put(user_id, user_info)
+    return user_info
 
 # Función para procesar los IDs de activos
 def process_asset_ids(ids_input, exclude_input=None):
-    ids = []
+    """
+    Interpreta la selección de IDs de activos (-i) y aplica las exclusiones (-e).
+
+    :param ids_input: IDs y rangos separados por comas (por ejemplo: 143,150-160) o un
+        archivo con los IDs separados por comas o saltos de línea.
+    :param exclude_input: IDs a excluir, con el mismo formato (opcional).
+    :return: IdSet con los IDs, que se recorre en orden ascendente y sin duplicados.
+    """
     if os.path.isfile(ids_input):  # Si es un archivo
         with open(ids_input, 'r') as file:
-            ids = file.read().strip().split(',')
+            expanded_ids = IdSet(_parse_id_tokens(iter_tokens(file)))
     else:  # Si es una lista de IDs separada por comas
-        ids = ids_input.split(',')
-
-    expanded_ids = []
-    for id_part in ids:
-        id_part = id_part.strip()
-        if '-' in id_part:  # Detectar rangos como 143-145
-            try:
-                start, end = map(int, id_part.split('-'))
-                expanded_ids.extend(range(start, end + 1))  # Expandir el rango
-            except ValueError:
-                print(f"{Fore.RED}Error: Rango inválido '{id_part}'. Ignorando.")
-        elif id_part.isdigit():  # Si es un ID individual
-            expanded_ids.append(int(id_part))
-        else:
-            print(f"{Fore.RED}Error: ID inválido '{id_part}'. Ignorando.")
+        expanded_ids = IdSet(_parse_id_tokens(split_tokens(ids_input)))
 
     # Procesar exclusiones si se especifican
     if exclude_input:
         exclude_ids = process_asset_ids(exclude_input)  # Reutilizar la misma lógica para exclusiones
-        expanded_ids = [id_ for id_ in expanded_ids if id_ not in exclude_ids]
+        expanded_ids = expanded_ids - exclude_ids
 
     return expanded_ids
 
+def _parse_id_tokens(tokens):
+    """
+    Convierte los elementos de la selección en intervalos, avisando de los inválidos.
+    """
+    for id_part in tokens:
+        try:
+            yield parse_token(id_part)
+        except ValueError:
+            if '-' in id_part:  # Detectar rangos como 143-145
+                print(f"{Fore.RED}Error: Rango inválido '{id_part}'. Ignorando.")
+            else:
+                print(f"{Fore.RED}Error: ID inválido '{id_part}'. Ignorando.")
+
 # Función común para obtener los datos iniciales de un activo
-def fetch_asset_data(asset_id, include_asset_data, include_departments, include_asset_type, include_location, include_user):
+def fetch_asset_data(asset_id, include_asset_data, include_departments, include_asset_type, include_location, include_user, asset_data=None):
     """
     Obtiene los datos iniciales de un activo desde la API y los procesa según las opciones habilitadas.
 
@@ -227,9 +411,9 @@ def fetch_asset_data(asset_id, include_asset_data, include_departments, include_
     :param include_asset_type: Indica si se debe obtener el tipo de activo asociado.
     :param include_location: Indica si se debe obtener la ubicación asociada.
     :param include_user: Indica si se debe obtener la información del usuario asociada.
+    :param asset_data: Datos del activo ya descargados (por ejemplo, con el listado paginado). Si se indican, no se vuelven a pedir.
     :return: Diccionario con los datos procesados del activo.
     """
-    asset_data = None
     department_name = None
     asset_type_name = None
     location_name = None
@@ -237,7 +421,8 @@ def fetch_asset_data(asset_id, include_asset_data, include_departments, include_
 
     # Obtener los datos del activo si se especifica -a o si son necesarios para -d, -t, -l o -u
     if include_asset_data or include_departments or include_asset_type or include_location or include_user:
-        asset_data = get_asset_data(asset_id)
+        if asset_data is None:
+            asset_data = get_asset_data(asset_id)
         if not asset_data:
             return None  # Si no se pueden obtener los datos del activo, devolver None
 
@@ -245,26 +430,25 @@ def fetch_asset_data(asset_id, include_asset_data, include_departments, include_
     if include_departments:
         department_id = asset_data.get('department_id') if asset_data else None
         if department_id:
-            department_mapping = get_departments()
-            department_name = department_mapping.get(department_id, 'Unknown')
+            department_name = lookup_department_name(department_id)
 
     # Obtener el tipo de activo si se especifica -t
     if include_asset_type:
         asset_type_id = asset_data.get('asset_type_id') if asset_data else None
         if asset_type_id:
-            asset_type_name = get_asset_type_name(asset_type_id)
+            asset_type_name = lookup_asset_type_name(asset_type_id)
 
     # Obtener la localización si se especifica -l
     if include_location:
         location_id = asset_data.get('location_id') if asset_data else None
         if location_id:
-            location_name = get_location_name(location_id)
+            location_name = lookup_location_name(location_id)
 
     # Obtener la información del usuario si se especifica -u
     if include_user:
         user_id = asset_data.get('user_id') if asset_data else None
         if user_id:
-            user_info = get_user_info(user_id)
+            user_info = lookup_user_info(user_id)
 
     return {
         "asset_data": asset_data,
@@ -274,52 +458,478 @@ def fetch_asset_data(asset_id, include_asset_data, include_departments, include_
         "user_info": user_info
     }
 
-def format_excel_file(file_path):
-    """
-    Aplica formato al archivo Excel generado:
-    - Ajusta el ancho de las columnas al tamaño del contenido más largo.
-    - Aplica un fondo azul oscuro con fuente blanca a la primera fila.
-    - Aplica un fondo azul claro al resto de las filas.
-
-    :param file_path: Ruta del archivo Excel a formatear.
-    """
-    wb = openpyxl.load_workbook(file_path)
-    ws = wb.active
-
-    # Estilos
-    header_fill = PatternFill(start_color="003366", end_color="003366", fill_type="solid")  # Azul oscuro
-    header_font = Font(color="FFFFFF", bold=True)  # Fuente blanca y negrita
-    row_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")  # Azul claro
-
-    # Ajustar el ancho de las columnas
-    for col in ws.columns:
-        max_length = 0
-        col_letter = col[0].column_letter  # Obtener la letra de la columna
-        for cell in col:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        adjusted_width = max_length + 2  # Añadir unos caracteres extra
-        ws.column_dimensions[col_letter].width = adjusted_width
-
-    # Aplicar estilos a la primera fila (encabezados)
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-
-    # Aplicar estilos al resto de las filas
-    for row in ws.iter_rows(min_row=2):
-        for cell in row:
-            cell.fill = row_fill
-
-    # Guardar el archivo con los cambios
-    wb.save(file_path)
+# Función para calcular las columnas comunes a todas las filas de un activo
+def build_asset_columns(asset_info, type_values, options):
+    """
+    Calcula una sola vez por activo las columnas a nivel de activo (departamento,
+    tipo, ubicación, usuario y campos de tipo), que después se combinan con cada
+    fila de componente.
+
+    :param asset_info: Diccionario devuelto por fetch_asset_data o None.
+    :param type_values: Diccionario columna -> valor de los campos de type_fields pedidos.
+    :param options: Diccionario con las opciones de main (include_*).
+    :return: Diccionario columna -> valor.
+    """
+    columns = {}
+    if options["include_departments"]:
+        columns["department_name"] = asset_info["department_name"] if asset_info else None
+    if options["include_asset_type"]:
+        columns["asset_type"] = asset_info["asset_type_name"] if asset_info else None
+    if options["include_location"]:
+        columns["location_name"] = asset_info["location_name"] if asset_info else None
+    user_info = asset_info["user_info"] if asset_info else None
+    if options["include_user"] and user_info:
+        columns["user_first_name"] = user_info.get('first_name')
+        columns["user_last_name"] = user_info.get('last_name')
+        columns["user_email"] = user_info.get('primary_email')
+    columns.update(type_values)  # Campos de tipo (-s, -n y -f)
+    return columns
 
-# Función principal
-def main(ids_input, exclude_input, components, output_file, verbose, include_departments, include_asset_data, include_asset_type, include_location, include_user, include_system_os, include_machine_ip):
+# Función para construir las filas del informe de un activo
+def build_asset_rows(asset_id, asset_info, type_values, components_data, options):
+    """
+    Construye las filas del informe de un activo a partir de la información ya obtenida.
+
+    Con -c se genera una fila por cada detalle de componente: las columnas del
+    componente y las del activo se preparan una vez y se combinan con cada
+    detalle, sin modificar los datos recibidos de la API (que pueden estar en la
+    caché o en la réplica local).
+
+    :param asset_id: ID del activo.
+    :param asset_info: Diccionario devuelto por fetch_asset_data o None.
+    :param type_values: Diccionario columna -> valor de los campos de type_fields pedidos.
+    :param components_data: Lista de componentes del activo o None si no se pidieron.
+    :param options: Diccionario con las opciones de main (components e include_*).
+    :return: Lista de filas (diccionarios) del activo.
+    """
+    columns = build_asset_columns(asset_info, type_values, options)
+    components = options["components"]
+
+    # Si no se especifica -c, solo agregar información básica del activo
+    if components is None:
+        return [{"asset_id": asset_id, **columns}]
+
+    wanted = set(components)  # Tipos de componentes pedidos (vacío: todos)
+    rows = []
+    for component in components_data or ():  # Solo procesar si hay componentes
+        component_type = component.get('component_type', 'Unknown')
+        if wanted and component_type not in wanted:
+            continue
+        component_columns = {
+            'component_type': component_type,
+            'asset_id': asset_id,
+            'component_name': component.get('name', 'Unknown'),
+            'component_status': component.get('status', 'Unknown'),
+            **columns,
+        }
+        rows.extend({**detail, **component_columns} for detail in component.get('component_data') or ())
+    return rows
+
+# Función para obtener los datos de un activo según el plan de peticiones
+def _get_asset(asset_id, options, prefetched=None):
+    """
+    Obtiene los datos de un activo del listado ya descargado o, si no lo hay, con
+    una sola petición que incluye sus type_fields cuando se piden -s, -n o -f.
+
+    :return: Tupla (datos del activo o None, se han buscado los datos del activo).
+    """
+    if prefetched is not None:
+        # Modo listado: los datos del activo y sus type_fields ya están descargados
+        asset = prefetched.get(asset_id)
+        if asset is None:
+            print(f"{Fore.YELLOW}Advertencia: No se encontraron datos para el ID {asset_id}")
+        return asset, True
+    if not needs_asset_request(options):
+        return None, False  # Solo se piden componentes
+    return get_asset_data(asset_id, bool(options["type_fields"])), True
+
+# Función para obtener todas las filas del informe correspondientes a un activo
+def process_asset(asset_id, options, prefetched=None):
+    """
+    Obtiene la información de un activo desde la API y construye sus filas del informe.
+
+    :param asset_id: ID del activo.
+    :param options: Diccionario con las opciones de main (components e include_*).
+    :param prefetched: Diccionario ID -> activo obtenido con fetch_assets_bulk, o None para pedir el activo individualmente.
+    :return: Lista de filas (diccionarios) del activo.
+    :raises requests.exceptions.RequestException: Si los datos o los componentes del activo no se pueden obtener
+        por un error de la API (un activo que no existe no es un error).
+    """
+    asset, fetched = _get_asset(asset_id, options, prefetched)
+    if fetched and asset is None:
+        type_values = {column: 'Unknown' for column in options["type_fields"]}
+        asset_info = None
+    else:
+        type_values = extract_type_fields(asset or {}, options["type_fields"])
+        asset_info = fetch_asset_data(asset_id, options["include_asset_data"], options["include_departments"], options["include_asset_type"], options["include_location"], options["include_user"], asset_data=asset)
+
+    if not asset_info and not (options["type_fields"] or options["components"]):
+        return []  # Si no se pueden obtener los datos del activo y no se usan -s, -n, -f o -c, omitirlo
+
+    # Obtener los componentes del activo si se especifica -c
+    components_data = None
+    if options["components"] is not None:  # Solo buscar componentes si se especifica -c
+        components_data = get_asset_components(asset_id)
+
+    with metrics.timer('row_building'):
+        return build_asset_rows(asset_id, asset_info, type_values, components_data, options)
+
+def _process_asset_safely(asset_id, options, prefetched=None):
+    """
+    Ejecuta process_asset aislando los errores, para que el fallo de un activo
+    no detenga el procesamiento del resto.
+
+    :return: Lista de filas del activo, o None si no se pudo obtener.
+    """
+    try:
+        return process_asset(asset_id, options, prefetched)
+    except requests.exceptions.RequestException:
+        return None  # El error ya se ha mostrado
+    except Exception as e:
+        print(f"{Fore.RED}Error inesperado al procesar el activo ID {asset_id}: {e}")
+        return None
+
+# Función para procesar los activos, en serie o en paralelo
+def run_assets(asset_ids, options, workers=1, prefetched=None):
+    """
+    Procesa los activos y devuelve sus filas en el mismo orden que asset_ids.
+
+    Con workers > 1 los activos se procesan en un pool de hilos. Como máximo hay
+    2 * workers activos pendientes a la vez, de modo que la concurrencia y la
+    memoria quedan acotadas aunque la lista de IDs sea muy grande.
+
+    :param asset_ids: IDs de los activos a procesar.
+    :param options: Diccionario con las opciones de main (components e include_*).
+    :param workers: Número de hilos que realizan peticiones simultáneas.
+    :param prefetched: Activos ya descargados con fetch_assets_bulk (opcional).
+    :return: Generador con la lista de filas de cada activo (None si no se pudo obtener), en orden.
+    """
+    if workers <= 1:
+        for asset_id in asset_ids:
+            yield _process_asset_safely(asset_id, options, prefetched)
+        return
+
+    # Ajustar el pool de conexiones para que cada hilo disponga de una conexión keep-alive
+    if client.pool_size < workers:
+        client.configure(pool=workers)
+
+    from concurrent.futures import ThreadPoolExecutor  # Solo se necesita con varios hilos
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for asset_id in asset_ids:
+            pending.append(executor.submit(_process_asset_safely, asset_id, options, prefetched))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+async def _none_async():
+    """
+    Corrutina vacía para las consultas que no se han pedido.
+    """
+    return None
+
+# Función auxiliar para realizar una petición asíncrona mostrando los errores como el resto de funciones
+async def _get_json_async(aclient, path, error_message):
+    """
+    Realiza una petición con el cliente asíncrono.
+
+    :param aclient: Instancia de AsyncClient.
+    :param path: Ruta relativa del endpoint.
+    :param error_message: Mensaje que se muestra si la petición falla.
+    :return: Diccionario con los datos de la respuesta o None si el recurso no existe.
+    :raises requests.exceptions.RequestException: Si la petición falla por un motivo distinto de que el recurso no exista.
+    """
+    try:
+        return await aclient.get_json(path)
+    except requests.exceptions.RequestException as e:
+        _raise_unless_not_found(e, error_message)
+        return None
+
+# Versión asíncrona de fetch_asset_data
+async def fetch_asset_data_async(aclient, asset_id, include_asset_data, include_departments, include_asset_type, include_location, include_user, asset_data=None):
+    """
+    Obtiene los datos iniciales de un activo igual que fetch_asset_data, pero lanza
+    las consultas dependientes (departamento, tipo, ubicación y usuario) a la vez.
+
+    :param aclient: Instancia de AsyncClient.
+    :param asset_data: Datos del activo ya descargados. Si se indican, no se vuelven a pedir.
+    :return: Diccionario con los datos procesados del activo o None.
+    """
+    if not (include_asset_data or include_departments or include_asset_type or include_location or include_user):
+        return {"asset_data": asset_data, "department_name": None, "asset_type_name": None, "location_name": None, "user_info": None}
+
+    if asset_data is None:
+        data = await _get_json_async(aclient, f'assets/{asset_id}', f"Error al obtener datos para el ID {asset_id}")
+        if not data or 'asset' not in data:
+            print(f"{Fore.YELLOW}Advertencia: No se encontraron datos para el ID {asset_id}")
+            return None
+        asset_data = data['asset']
+
+    async def department_name():
+        department_id = asset_data.get('department_id')
+        if not department_id:
+            return None
+        return lookup_department_name(department_id)
+
+    async def asset_type_name():
+        asset_type_id = asset_data.get('asset_type_id')
+        if not asset_type_id:
+            return None
+        catalog = get_catalog("asset_types")
+        if asset_type_id not in catalog:
+            data = await _get_json_async(aclient, f'asset_types/{asset_type_id}', f"Error al obtener el tipo de activo para ID {asset_type_id}")
+            if not data or 'asset_type' not in data:
+                return 'Unknown'
+            catalog[asset_type_id] = data['asset_type'].get('name', 'Unknown')
+        return catalog[asset_type_id]
+
+    async def location_name():
+        location_id = asset_data.get('location_id')
+        if not location_id:
+            return None
+        catalog = get_catalog("locations")
+        if location_id not in catalog:
+            data = await _get_json_async(aclient, f'locations/{location_id}', f"Error al obtener la ubicación para ID {location_id}")
+            if not data or 'location' not in data:
+                return 'Unknown'
+            catalog[location_id] = data['location'].get('name', 'Unknown')
+        return catalog[location_id]
+
+    async def user_info():
+        user_id = asset_data.get('user_id')
+        if not user_id:
+            return None
+        cached = known_user_info(user_id)
+        if cached is not None:
+            return cached
+        data = await _get_json_async(aclient, f'requesters/{user_id}', f"Error al obtener la información del usuario para ID {user_id}")
+        info = summarize_user(data['requester'] if data and 'requester' in data else {})
+        if _is_known_user(info):
+            _user_cache.put(user_id, info)
+        return info
+
+    import asyncio
+
+    results = await asyncio.gather(
+        department_name() if include_departments else _none_async(),
+        asset_type_name() if include_asset_type else _none_async(),
+        location_name() if include_location else _none_async(),
+        user_info() if include_user else _none_async()
+    )
+    return {
+        "asset_data": asset_data,
+        "department_name": results[0],
+        "asset_type_name": results[1],
+        "location_name": results[2],
+        "user_info": results[3]
+    }
+
+# Versión asíncrona de get_asset_data
+async def _get_asset_async(aclient, asset_id, options):
+    """
+    Obtiene los datos de un activo (con sus type_fields si se piden) usando el cliente asíncrono.
+
+    :return: Diccionario con los datos del activo o None si no se encuentra.
+    :raises requests.exceptions.RequestException: Si la petición falla por un motivo distinto de que el activo no exista.
+    """
+    params = {'include': 'type_fields'} if options["type_fields"] else None
+    try:
+        data = await aclient.get_json(f'assets/{asset_id}', params)
+    except requests.exceptions.RequestException as e:
+        _raise_unless_not_found(e, f"Error al obtener datos para el ID {asset_id}")
+        data = {}
+    if 'asset' not in data:
+        print(f"{Fore.YELLOW}Advertencia: No se encontraron datos para el ID {asset_id}")
+        return None
+    return data['asset']
+
+# Versión asíncrona de process_asset
+async def process_asset_async(aclient, asset_id, options, prefetched=None):
+    """
+    Obtiene la información de un activo con el cliente asíncrono y construye sus filas del informe.
+    Las consultas independientes entre sí se lanzan de forma concurrente.
+
+    :param aclient: Instancia de AsyncClient.
+    :param asset_id: ID del activo.
+    :param options: Diccionario con las opciones de main (components e include_*).
+    :param prefetched: Diccionario ID -> activo obtenido con fetch_assets_bulk, o None para pedir el activo individualmente.
+    :return: Lista de filas (diccionarios) del activo.
+    :raises requests.exceptions.RequestException: Igual que process_asset.
+    """
+    if prefetched is not None or not needs_asset_request(options):
+        asset, fetched = _get_asset(asset_id, options, prefetched)
+    else:
+        # Una sola petición por activo para sus datos y sus type_fields
+        asset, fetched = await _get_asset_async(aclient, asset_id, options), True
+    if fetched and asset is None:
+        type_values = {column: 'Unknown' for column in options["type_fields"]}
+        asset_info = None
+    else:
+        type_values = extract_type_fields(asset or {}, options["type_fields"])
+        asset_info = await fetch_asset_data_async(aclient, asset_id, options["include_asset_data"], options["include_departments"], options["include_asset_type"], options["include_location"], options["include_user"], asset_data=asset)
+        if asset_info and asset_info["asset_data"] is None:
+            asset_info = None  # Igual que fetch_asset_data cuando no se pide ningún dato del activo
+
+    if not asset_info and not (options["type_fields"] or options["components"]):
+        return []  # Si no se pueden obtener los datos del activo y no se usan -s, -n, -f o -c, omitirlo
+
+    # Obtener los componentes del activo si se especifica -c
+    components_data = None
+    if options["components"] is not None:
+        try:
+            data = await aclient.get_json(f'assets/{asset_id}/components/')
+        except requests.exceptions.RequestException as e:
+            _raise_unless_not_found(e, f"Error al obtener componentes para el ID {asset_id}")
+            data = {}
+        components_data = data.get('components')
+        if components_data is None:
+            print(f"{Fore.YELLOW}Advertencia: No se encontraron componentes para el ID {asset_id}")
+
+    with metrics.timer('row_building'):
+        return build_asset_rows(asset_id, asset_info, type_values, components_data, options)
+
+async def _process_asset_async_safely(aclient, asset_id, options, prefetched=None):
+    """
+    Ejecuta process_asset_async aislando los errores de cada activo.
+
+    :return: Lista de filas del activo, o None si no se pudo obtener.
+    """
+    try:
+        return await process_asset_async(aclient, asset_id, options, prefetched)
+    except requests.exceptions.RequestException:
+        return None  # El error ya se ha mostrado
+    except Exception as e:
+        print(f"{Fore.RED}Error inesperado al procesar el activo ID {asset_id}: {e}")
+        return None
+
+# Función para procesar los activos con el motor asíncrono
+def run_assets_async(asset_ids, options, concurrency=1, prefetched=None):
+    """
+    Procesa los activos con asyncio sobre un único pool de conexiones y devuelve
+    sus filas en el mismo orden que asset_ids.
+
+    Como máximo hay 2 * concurrency activos en curso; todas sus peticiones se
+    multiplexan en un mismo hilo sobre el pool de conexiones del cliente asíncrono.
+
+    :param asset_ids: IDs de los activos a procesar.
+    :param options: Diccionario con las opciones de main (components e include_*).
+    :param concurrency: Número de activos que se procesan simultáneamente.
+    :param prefetched: Activos ya descargados con fetch_assets_bulk (opcional).
+    :return: Generador con la lista de filas de cada activo (None si no se pudo obtener), en orden.
+    """
+    import asyncio  # Solo se necesita con el motor asíncrono
+    from fscore.aio import AsyncClient
+
+    concurrency = max(1, concurrency)
+    loop = asyncio.new_event_loop()
+    aclient = AsyncClient(limit=max(client.pool_size, concurrency))
+    pending = deque()
+    try:
+        loop.run_until_complete(aclient.open())
+        for asset_id in asset_ids:
+            pending.append(loop.create_task(_process_asset_async_safely(aclient, asset_id, options, prefetched)))
+            if len(pending) >= concurrency * 2:
+                yield loop.run_until_complete(pending.popleft())
+        while pending:
+            yield loop.run_until_complete(pending.popleft())
+    finally:
+        for task in pending:  # Cancelar lo pendiente si se interrumpe la iteración
+            task.cancel()
+        loop.run_until_complete(aclient.close())
+        loop.close()
+
+# Función para interpretar las columnas de type_fields indicadas con -f
+def parse_type_field_specs(specs):
+    """
+    Convierte las especificaciones 'columna=campo' de la opción -f en un diccionario.
+
+    :param specs: Lista de cadenas 'columna=campo' o None.
+    :return: Diccionario columna -> campo, o None si alguna especificación no es válida.
+    """
+    fields = {}
+    for spec in specs or []:
+        column, sep, field = spec.partition('=')
+        if not sep or not column.strip() or not field.strip():
+            print(f"{Fore.RED}Error: Campo de tipo inválido '{spec}'. Usa el formato columna=campo (por ejemplo: serial=serial_number_23001176139).")
+            return None
+        fields[column.strip()] = field.strip()
+    return fields
+
+# Función para combinar las filas ya guardadas en el checkpoint con las nuevas
+def merge_checkpoint(asset_ids, done_ids, results, checkpoint):
+    """
+    Devuelve las filas de todos los activos en el orden de asset_ids: las de los
+    activos completados en una ejecución anterior se leen del checkpoint y las
+    nuevas se registran en él a medida que llegan.
+
+    :param asset_ids: IDs de todos los activos pedidos.
+    :param done_ids: Conjunto de IDs completados al empezar la ejecución.
+    :param results: Generador con las filas de los activos pendientes (None si no se pudieron obtener), en orden.
+    :param checkpoint: Instancia de Checkpoint.
+    :return: Generador con la lista de filas de cada activo, en orden.
+    """
+    for asset_id in asset_ids:
+        if asset_id in done_ids:
+            yield checkpoint.rows(asset_id)
+        else:
+            rows = next(results)
+            if rows is not None:  # Los activos que fallaron no se registran, para reintentarlos al reanudar
+                checkpoint.record(asset_id, rows)
+            yield rows
+
+# Función para volcar las filas a medida que se obtienen
+def write_results(results, output_file, verbose):
+    """
+    Escribe las filas de los activos a medida que llegan, sin acumular el informe en memoria.
+
+    :param results: Iterable con la lista de filas de cada activo, o None si no se pudo obtener (por ejemplo, el generador de run_assets).
+    :param output_file: Archivo de salida (xlsx, csv, json o jsonl) o None para no guardar.
+    :param verbose: Si es True se muestra cada fila en pantalla.
+    :return: Tupla (número de filas obtenidas, número de activos que no se pudieron obtener).
+    """
+    writer = export.open_writer(output_file) if output_file else None
+    row_count = 0
+    failed = 0
+    try:
+        for rows in results:
+            if rows is None:
+                failed += 1
+                continue
+            for row in rows:
+                if writer:
+                    with metrics.timer('export_rows'):
+                        writer.write_row(row)
+                # Mostrar en pantalla si verbose es True
+                if verbose:
+                    if row_count == 0:
+                        print(f"{Fore.CYAN}Datos obtenidos:")
+                    print("  " + ", ".join(f"{column}: {value}" for column, value in row.items()))
+                row_count += 1
+    finally:
+        if writer:
+            with metrics.timer(f'export_{export.get_format(output_file)}_finalize'):
+                writer.close()
+    return row_count, failed
+
+# Función para construir las opciones que determinan qué información se obtiene de cada activo
+def build_options(components, include_asset_data, include_departments, include_asset_type, include_location, include_user, include_system_os=False, include_machine_ip=False, type_field_specs=None):
+    """
+    Construye el diccionario de opciones que usan process_asset y el resto de
+    funciones de procesamiento (y que identifica un checkpoint).
+
+    :param components: Tipos o abreviaturas de componentes de -c (lista vacía: todos), o None para no pedirlos.
+    :param include_asset_data: Indica si se deben obtener los datos del activo (-a). Habilita también -d, -t, -l, -u, -s y -n.
+    :param include_departments: Indica si se debe obtener el departamento (-d).
+    :param include_asset_type: Indica si se debe obtener el tipo de activo (-t).
+    :param include_location: Indica si se debe obtener la ubicación (-l).
+    :param include_user: Indica si se debe obtener el usuario (-u).
+    :param include_system_os: Indica si se debe obtener el sistema operativo (-s).
+    :param include_machine_ip: Indica si se debe obtener la dirección IP (-n).
+    :param type_field_specs: Lista de especificaciones 'columna=campo' de -f o None.
+    :return: Diccionario de opciones, o None si alguna especificación de -f no es válida.
+    """
     # Si se especifica -a, habilitar automáticamente -d, -t, -l, -u, -s y -n
     if include_asset_data:
         include_departments = True
@@ -329,135 +939,260 @@ def main(ids_input, exclude_input, components, output_file, verbose, include_dep
         include_system_os = True
         include_machine_ip = True
 
-    # Diccionario de traducción de abreviaturas a nombres reales de componentes
-    component_translation = {
-        "cpu": "Processor",
-        "ram": "Memory",
-        "hdd": "Logical Drive",
-        "nic": "Network Adapter"
+    # Traducir las abreviaturas de -c a los tipos de componentes de la API
+    if components:
+        components = [COMPONENT_TRANSLATION.get(c.lower(), c) for c in components]
+
+    # Campos de type_fields a extraer: -s y -n usan TYPE_FIELDS (o su redefinición con -f)
+    # y el resto de columnas indicadas con -f se añaden al informe
+    custom_fields = parse_type_field_specs(type_field_specs)
+    if custom_fields is None:
+        return None
+    type_fields = {}
+    if include_system_os:
+        type_fields["system_os"] = custom_fields.get("system_os", TYPE_FIELDS["system_os"])
+    if include_machine_ip:
+        type_fields["machine_ip"] = custom_fields.get("machine_ip", TYPE_FIELDS["machine_ip"])
+    for column, field in custom_fields.items():
+        if column not in TYPE_FIELDS:
+            type_fields[column] = field
+
+    return {
+        "components": components,
+        "include_asset_data": include_asset_data,
+        "include_departments": include_departments,
+        "include_asset_type": include_asset_type,
+        "include_location": include_location,
+        "include_user": include_user,
+        "type_fields": type_fields
     }
 
+# Función para añadir a un parser las opciones que determinan las columnas del informe
+def add_report_arguments(parser):
     """
-    Diccionario de componentes:
-    Este diccionario traduce abreviaturas de componentes a sus nombres completos utilizados en la API.
+    Añade a un parser de argparse las opciones -c, -a, -d, -t, -l, -u, -s, -n y -f
+    (compartidas con fsexport.py). Se convierten en opciones con build_options.
+    """
+    parser.add_argument(
+        '-c', '--components',
+        nargs='*',  # Permitir cero o más valores
+        help=f"{Fore.GREEN}Especifica los tipos de componentes a incluir (por ejemplo: processor memory). Si no se especifica, no se mostrarán componentes."
+    )
+    parser.add_argument(
+        '-d', '--departments',
+        action='store_true',
+        help=f"{Fore.GREEN}Incluye el nombre del departamento asociado a cada activo."
+    )
+    parser.add_argument(
+        '-a', '--asset-data',
+        action='store_true',
+        help=f"{Fore.GREEN}Obtiene los datos del activo desde la API (por ejemplo: department_id)."
+    )
+    parser.add_argument(
+        '-t', '--asset-type',
+        action='store_true',
+        help=f"{Fore.GREEN}Incluye el tipo de activo asociado a cada activo."
+    )
+    parser.add_argument(
+        '-l', '--location',
+        action='store_true',
+        help=f"{Fore.GREEN}Incluye el nombre de la ubicación asociada a cada activo."
+    )
+    parser.add_argument(
+        '-u', '--user',
+        action='store_true',
+        help=f"{Fore.GREEN}Incluye la información del usuario asociada a cada activo (nombre, apellido y correo electrónico)."
+    )
+    parser.add_argument(
+        '-s', '--system-os',
+        action='store_true',
+        help=f"{Fore.GREEN}Incluye el sistema operativo de la máquina asociada a cada activo."
+    )
+    parser.add_argument(
+        '-n', '--machine-ip',
+        action='store_true',
+        help=f"{Fore.GREEN}Incluye la dirección IP de la máquina asociada a cada activo."
+    )
+    parser.add_argument(
+        '-f', '--type-field',
+        action='append',
+        metavar='COLUMNA=CAMPO',
+        help=f"{Fore.GREEN}Añade una columna con un campo de type_fields (por ejemplo: serial=serial_number_23001176139). Se puede repetir. Con system_os o machine_ip redefine el campo usado por -s o -n. Se obtiene en la misma petición que -s y -n."
+    )
 
-    component_translation = {
-        "cpu": "Processor",       # Procesador
-        "ram": "Memory",          # Memoria RAM
-        "hdd": "Logical Drive",   # Disco lógico
-        "nic": "Network Adapter"  # Adaptador de red
-    }
+# Función para ejecutar el plan de peticiones
+def run_plan(plan, asset_ids, options, workers=1, engine='thread', bulk_filter=None, mirror=None):
+    """
+    Obtiene los activos como indica el plan (listado paginado, réplica local o
+    uno a uno) y los procesa con el motor elegido.
 
-    Ejemplo:
-    Si se especifica "-c cpu ram", se buscarán componentes de tipo "Processor" y "Memory".
+    :param plan: Instancia de FetchPlan construida para asset_ids.
+    :param asset_ids: IdSet con los IDs de los activos a procesar.
+    :param options: Diccionario con las opciones de build_options.
+    :param workers: Número de activos que se procesan en paralelo.
+    :param engine: 'thread' o 'async' (requiere aiohttp).
+    :param bulk_filter: Filtro opcional del listado paginado.
+    :param mirror: Instancia de Mirror si plan.mode es 'mirror'.
+    :return: Generador con la lista de filas de cada activo, en orden.
     """
+    # Obtener los activos en bloque con el listado paginado si es más barato que pedirlos uno a uno
+    prefetched = None
+    if plan.mode == 'mirror':
+        prefetched = mirror.asset_lookup()
+    elif plan.mode == 'bulk':
+        print(f"{Fore.CYAN}Obteniendo los activos mediante el listado paginado...")
+        try:
+            with metrics.timer('bulk_listing'):
+                prefetched = fetch_assets_bulk(asset_ids, bulk_filter, AssetProjection(options))
+        except requests.exceptions.RequestException as e:
+            # Con el listado incompleto no se sabe qué activos existen: pedirlos uno a uno
+            print(f"{Fore.RED}Error al obtener el listado de activos: {e}")
+            print(f"{Fore.YELLOW}Se pedirán los activos uno a uno.")
+            prefetched = None
 
-    # Validar la opción -c
-    if components:
-        components = [component_translation.get(c.lower(), c) for c in components]
+    if engine == 'async':
+        return run_assets_async(asset_ids, options, workers, prefetched)
+    return run_assets(asset_ids, options, workers, prefetched)
+
+# Función para mostrar el plan de peticiones de --dry-run
+def print_plan(plan):
+    """
+    Muestra las peticiones que haría la ejecución y cuánto tardaría al ritmo del limitador.
+
+    :param plan: Instancia de FetchPlan.
+    """
+    modes = {
+        'per-id': "una petición por activo",
+        'bulk': "listado paginado",
+        'mirror': "réplica local"
+    }
+    print(f"{Fore.CYAN}Plan de peticiones para {plan.asset_count} activos ({modes[plan.mode]}):")
+    if not plan.steps:
+        print("  Ninguna petición a la API.")
+    for step, count, upper_bound in plan.steps:
+        print(f"  {step}: {'hasta ' if upper_bound else ''}{count}")
+    minutes, seconds = divmod(round(plan.estimated_seconds), 60)
+    duration = f"{minutes} min {seconds} s" if minutes else f"{seconds} s"
+    total = f"hasta {plan.total}" if plan.is_upper_bound else str(plan.total)
+    print(f"{Fore.GREEN}Total: {total} peticiones, unos {duration} a {plan.rate_per_minute} peticiones por minuto.")
 
+# Función principal
+def main(ids_input, exclude_input, components, output_file, verbose, include_departments, include_asset_data, include_asset_type, include_location, include_user, include_system_os, include_machine_ip, workers=1, engine='thread', cache=False, refresh=False, type_field_specs=None, fetch_mode='auto', bulk_filter=None, checkpoint_file=None, mirror_path=None, dry_run=False):
+    """
+    Genera el informe de los activos seleccionados con las opciones de la línea de comandos.
+
+    :return: Código de salida: 0 si todos los activos se obtuvieron, 1 si hubo errores
+        (opciones no válidas o activos que no se pudieron obtener).
+    """
     # Procesar los IDs de activos
     asset_ids = process_asset_ids(ids_input, exclude_input)
 
     if not asset_ids:
         print(f"{Fore.RED}Error: No se encontraron IDs válidos en la entrada proporcionada.")
-        return
+        return 1
 
     # Si se especifica -o y no tiene extensión, agregar ".xlsx" por defecto
     if output_file and not os.path.splitext(output_file)[1]:
         output_file += ".xlsx"
+    if output_file and not export.get_format(output_file):
+        print(f"{Fore.RED}Error: Formato de salida no admitido '{output_file}'. Usa una de estas extensiones: {', '.join(export.FORMATS)}.")
+        return 1
+    missing = export.missing_dependency(output_file) if output_file else None
+    if missing:
+        print(f"{Fore.RED}Error: El formato de '{output_file}' requiere el paquete {missing} (pip install {missing}).")
+        return 1
 
-    all_data = []
-    for asset_id in asset_ids:
-        # Obtener el sistema operativo si se especifica -s
-        system_os = None
-        if include_system_os:
-            system_os = get_system_os(asset_id)
-
-        # Obtener la dirección IP si se especifica -n
-        machine_ip = None
-        if include_machine_ip:
-            machine_ip = get_machine_ip(asset_id)
-
-        # Llamar a la función común para obtener los datos iniciales del activo
-        asset_info = fetch_asset_data(asset_id, include_asset_data, include_departments, include_asset_type, include_location, include_user)
-        if not asset_info and not (include_system_os or include_machine_ip or components):
-            continue  # Si no se pueden obtener los datos del activo y no se usan -s, -n o -c, omitirlo
-
-        asset_data = asset_info["asset_data"] if asset_info else None
-        department_name = asset_info["department_name"] if asset_info else None
-        asset_type_name = asset_info["asset_type_name"] if asset_info else None
-        location_name = asset_info["location_name"] if asset_info else None
-        user_info = asset_info["user_info"] if asset_info else None
-
-        # Obtener los componentes del activo si se especifica -c
-        if components is not None:  # Solo buscar componentes si se especifica -c
-            components_data = get_asset_components(asset_id)
-            if components_data:  # Solo procesar si hay componentes
-                for component in components_data:
-                    component_type = component.get('component_type', 'Unknown')
-                    component_details = component.get('component_data', [])
-
-                    # Filtrar por tipos de componentes si se especifican
-                    if not components or component_type in components:
-                        for detail in component_details:
-                            detail['component_type'] = component_type  # Agregar el tipo de componente
-                            detail['asset_id'] = asset_id  # Agregar el ID del activo
-                            detail['component_name'] = component.get('name', 'Unknown')  # Agregar el nombre del componente
-                            detail['component_status'] = component.get('status', 'Unknown')  # Agregar el estado del componente
-                            if include_departments:
-                                detail['department_name'] = department_name  # Agregar el nombre del departamento
-                            if include_asset_type:
-                                detail['asset_type'] = asset_type_name  # Agregar el tipo de activo
-                            if include_location:
-                                detail['location_name'] = location_name  # Agregar el nombre de la ubicación
-                            if include_user and user_info:
-                                detail['user_first_name'] = user_info.get('first_name')
-                                detail['user_last_name'] = user_info.get('last_name')
-                                detail['user_email'] = user_info.get('primary_email')
-                            if include_system_os:
-                                detail['system_os'] = system_os
-                            if include_machine_ip:
-                                detail['machine_ip'] = machine_ip
-                            all_data.append(detail)
-        else:
-            # Si no se especifica -c, solo agregar información básica del activo
-            basic_data = {"asset_id": asset_id}
-            if include_departments:
-                basic_data["department_name"] = department_name
-            if include_asset_type:
-                basic_data["asset_type"] = asset_type_name
-            if include_location:
-                basic_data["location_name"] = location_name
-            if include_user and user_info:
-                basic_data["user_first_name"] = user_info.get('first_name')
-                basic_data["user_last_name"] = user_info.get('last_name')
-                basic_data["user_email"] = user_info.get('primary_email')
-            if include_system_os:
-                basic_data["system_os"] = system_os
-            if include_machine_ip:
-                basic_data["machine_ip"] = machine_ip
-            all_data.append(basic_data)
-
-    # Crear un DataFrame
-    if all_data:
-        df = pd.DataFrame(all_data)
-
-        # Guardar en archivo si se especifica
-        if output_file:
-            df.to_excel(output_file, index=False)
-            print(f"{Fore.GREEN}Datos guardados en {output_file}")
+    # Opciones que determinan qué información se obtiene de cada activo
+    options = build_options(components, include_asset_data, include_departments, include_asset_type, include_location, include_user, include_system_os, include_machine_ip, type_field_specs)
+    if options is None:
+        return 1
 
-            # Aplicar formato si el archivo es .xlsx
-            if output_file.endswith(".xlsx"):
-                format_excel_file(output_file)
+    # Activar la caché persistente en disco si se especifica --cache o --refresh
+    if cache or refresh:
+        client.enable_cache(refresh=refresh)
 
-        # Mostrar en pantalla si verbose es True
-        if verbose:
-            print(f"{Fore.CYAN}Datos obtenidos:")
-            print(df)
+    # Con --mirror, los activos, usuarios y catálogos se leen de la réplica local (fssync.py)
+    mirror = None
+    if mirror_path:
+        if not os.path.isfile(mirror_path):
+            print(f"{Fore.RED}Error: No existe la réplica '{mirror_path}'. Créala primero con fssync.py.")
+            return 1
+        from fscore.mirror import CATALOGS, Mirror  # Solo se necesita con --mirror
+
+        mirror = Mirror(mirror_path)
+        seed_reference_data({name: mirror.get_catalog(name) for name in CATALOGS}, mirror.get_requester)
+
+    # Con --checkpoint, saltar los activos completados en una ejecución anterior
+    # (con --dry-run solo se consulta el diario si ya existe, sin crearlo)
+    checkpoint = None
+    done_ids = set()
+    pending_ids = asset_ids
+    if checkpoint_file and not (dry_run and not os.path.exists(checkpoint_file)):
+        try:
+            checkpoint = Checkpoint(checkpoint_file, signature=options)
+        except CheckpointMismatchError as e:
+            print(f"{Fore.RED}Error: {e}")
+            return 1
+        done_ids = checkpoint.completed_ids()
+        if done_ids:
+            print(f"{Fore.CYAN}Reanudando desde {checkpoint_file}: {len(done_ids)} activos ya completados.")
+        pending_ids = asset_ids - IdSet.from_ids(sorted(done_ids))
+
+    # Planificar las peticiones: modo de obtención de los activos y catálogos que hay que descargar
+    plan = plan_fetch(pending_ids, options, fetch_mode, bulk_filter, mirror is not None, cached_catalogs(), client.limiter.rate_per_minute)
+    if dry_run:
+        print_plan(plan)
+        if checkpoint is not None:
+            checkpoint.close()
+        if mirror is not None:
+            mirror.close()
+        return 0
+
+    # Descargar una sola vez los catálogos de referencia que se van a necesitar
+    with metrics.timer('reference_data'):
+        try:
+            load_reference_data(options["include_departments"], options["include_asset_type"], options["include_location"])
+        except requests.exceptions.RequestException:
+            print(f"{Fore.RED}No se pudieron descargar los catálogos de referencia; no se ha procesado ningún activo.")
+            if checkpoint is not None:
+                checkpoint.close()
+            if mirror is not None:
+                mirror.close()
+            return 1
+
+    # Elegir el motor de procesamiento: hilos (por defecto) o asyncio
+    if engine == 'async':
+        try:
+            import aiohttp  # noqa: F401  Comprobar que la dependencia opcional está instalada
+        except ImportError:
+            print(f"{Fore.RED}Error: El motor asíncrono requiere el paquete aiohttp (pip install aiohttp).")
+            if checkpoint is not None:
+                checkpoint.close()
+            if mirror is not None:
+                mirror.close()
+            return 1
+    results = run_plan(plan, pending_ids, options, workers, engine, bulk_filter, mirror)
+    if checkpoint is not None:
+        results = merge_checkpoint(asset_ids, done_ids, results, checkpoint)
+
+    # Escribir las filas a medida que se obtienen
+    try:
+        row_count, failed = write_results(results, output_file, verbose)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        if mirror is not None:
+            mirror.close()
+    if failed:
+        print(f"{Fore.RED}{failed} activos no se pudieron obtener por errores de la API y no están en el informe.")
+        if checkpoint is not None:
+            print(f"{Fore.YELLOW}Relanza la ejecución con el mismo --checkpoint para reintentarlos.")
+    if row_count:
+        if output_file:
+            print(f"{Fore.GREEN}Datos guardados en {output_file}")
     else:
         print(f"{Fore.RED}No se obtuvieron datos.")
+    return 1 if failed else 0
 
 if __name__ == "__main__":
     # Configurar argumentos de línea de comandos
@@ -482,20 +1217,15 @@ Si se especifica "-c cpu ram", se buscarán componentes de tipo "Processor" y "M
     parser.add_argument(
         '-i', '--ids',
         required=True,
-        help=f"{Fore.GREEN}IDs de los activos separados por comas (por ejemplo: 143,197,302) o un archivo .txt con los IDs."
+        help=f"{Fore.GREEN}IDs o rangos de los activos separados por comas (por ejemplo: 143,197,300-310) o un archivo con los IDs separados por comas o saltos de línea."
     )
     parser.add_argument(
         '-e', '--exclude',
         help=f"{Fore.GREEN}IDs de los activos a excluir, separados por comas o como un rango (por ejemplo: 145,147 o 145-147)."
     )
-    parser.add_argument(
-        '-c', '--components',
-        nargs='*',  # Permitir cero o más valores
-        help=f"{Fore.GREEN}Especifica los tipos de componentes a incluir (por ejemplo: processor memory). Si no se especifica, no se mostrarán componentes."
-    )
     parser.add_argument(
         '-o', '--output',
-        help=f"{Fore.GREEN}Nombre del archivo Excel donde se guardarán los datos (por ejemplo: output.xlsx)."
+        help=f"{Fore.GREEN}Archivo donde se guardarán los datos: Excel (.xlsx, por defecto), .csv, .json, .jsonl, .parquet o .feather (por ejemplo: output.xlsx). Parquet y Feather (requieren pyarrow) son más rápidos y compactos para exportaciones grandes."
     )
     parser.add_argument(
         '-v', '--verbose',
@@ -503,42 +1233,69 @@ Si se especifica "-c cpu ram", se buscarán componentes de tipo "Processor" y "M
         default=True,
         help=f"{Fore.GREEN}Muestra los datos en pantalla (por defecto: true). Usa -v false para desactivar."
     )
+    add_report_arguments(parser)
     parser.add_argument(
-        '-d', '--departments',
-        action='store_true',
-        help=f"{Fore.GREEN}Incluye el nombre del departamento asociado a cada activo."
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help=f"{Fore.GREEN}Número de activos que se procesan en paralelo (por defecto: 1). El orden de las filas se mantiene."
     )
     parser.add_argument(
-        '-a', '--asset-data',
-        action='store_true',
-        help=f"{Fore.GREEN}Obtiene los datos del activo desde la API (por ejemplo: department_id)."
+        '--engine',
+        choices=['thread', 'async'],
+        default='thread',
+        help=f"{Fore.GREEN}Motor de procesamiento: 'thread' (pool de hilos) o 'async' (asyncio, requiere aiohttp). Por defecto: thread."
     )
     parser.add_argument(
-        '-t', '--asset-type',
-        action='store_true',
-        help=f"{Fore.GREEN}Incluye el tipo de activo asociado a cada activo."
+        '--fetch-mode',
+        choices=['auto', 'bulk', 'per-id'],
+        default='auto',
+        help=f"{Fore.GREEN}Cómo se obtienen los activos: 'per-id' (una petición por activo), 'bulk' (listado paginado de activos) o 'auto' (elige el más barato según los IDs pedidos). Por defecto: auto."
     )
     parser.add_argument(
-        '-l', '--location',
-        action='store_true',
-        help=f"{Fore.GREEN}Incluye el nombre de la ubicación asociada a cada activo."
+        '--bulk-filter',
+        help=f"{Fore.GREEN}Filtro de la API para acotar el listado paginado (por ejemplo: \"asset_type_id:23000123456\"). Implica el modo bulk salvo con --fetch-mode per-id."
     )
     parser.add_argument(
-        '-u', '--user',
+        '--mirror',
+        metavar='ARCHIVO',
+        help=f"{Fore.GREEN}Genera el informe a partir de la réplica local creada con fssync.py (por ejemplo: ~/.cache/fstools/mirror.sqlite3) en lugar de consultar la API. Los componentes (-c) se siguen pidiendo a la API."
+    )
+    parser.add_argument(
+        '--checkpoint',
+        metavar='ARCHIVO',
+        help=f"{Fore.GREEN}Guarda el progreso en un diario (por ejemplo: export.ckpt). Si la ejecución se interrumpe, al relanzarla con el mismo archivo se saltan los activos ya completados."
+    )
+    parser.add_argument(
+        '--dry-run',
         action='store_true',
-        help=f"{Fore.GREEN}Incluye la información del usuario asociada a cada activo (nombre, apellido y correo electrónico)."
+        help=f"{Fore.GREEN}No consulta la API: muestra las peticiones que haría la ejecución con las opciones indicadas y cuánto tardaría al ritmo del limitador."
     )
     parser.add_argument(
-        '-s', '--system-os',
+        '--cache',
+        dest='cache',
         action='store_true',
-        help=f"{Fore.GREEN}Incluye el sistema operativo de la máquina asociada a cada activo."
+        help=f"{Fore.GREEN}Guarda las respuestas de la API en una caché local (~/.cache/fstools) y la reutiliza en siguientes ejecuciones."
     )
     parser.add_argument(
-        '-n', '--machine-ip',
+        '--no-cache',
+        dest='cache',
+        action='store_false',
+        help=f"{Fore.GREEN}No usa la caché local (comportamiento por defecto)."
+    )
+    parser.add_argument(
+        '--refresh',
         action='store_true',
-        help=f"{Fore.GREEN}Incluye la dirección IP de la máquina asociada a cada activo."
+        help=f"{Fore.GREEN}Ignora las respuestas guardadas en la caché local y las vuelve a descargar."
     )
+    cli.add_client_arguments(parser)
+    parser.set_defaults(cache=False)
     args = parser.parse_args()
+    cli.apply_client_arguments(args)
 
     # Ejecutar la función principal con los argumentos especificados
-    main(args.ids, args.exclude, args.components, args.output, args.verbose, args.departments, args.asset_data, args.asset_type, args.location, args.user, args.system_os, args.machine_ip)
+    status = main(args.ids, args.exclude, args.components, args.output, args.verbose, args.departments, args.asset_data, args.asset_type, args.location, args.user, args.system_os, args.machine_ip, args.workers, args.engine, args.cache, args.refresh, args.type_field, args.fetch_mode, args.bulk_filter, args.checkpoint, args.mirror, args.dry_run)
+
+    # Mostrar o guardar las métricas de la ejecución
+    cli.report_metrics(args)
+    raise SystemExit(status)
@@ -1,95 +1,233 @@
+import os
 import requests
 import argparse
 from colorama import Fore, Style, init
-import time  # Importar el módulo time para manejar la espera
+from fscore import cli  # Opciones comunes de línea de comandos (--rate-limit y --stats)
+from fscore import client  # Cliente HTTP compartido (clave, subdominio y pool de conexiones)
+from fscore import export  # Escritura en streaming de los informes
+from fscore import requester_index  # Índice local de usuarios para búsquedas aproximadas
 
 # Inicializar colorama
 init(autoreset=True)
 
-# Configuración de la API
-api_key = ''  # Reemplaza 'your_default_api_key' con tu clave real
-subdomain = ''  # Define el subdominio aquí
-base_url = f'https://{subdomain}.freshservice.com/api/v2/'
+# Elementos por página en las búsquedas (la API admite como máximo 100; se cambia con --per-page)
+page_size = client.MAX_PER_PAGE
 
-def handle_rate_limit(response):
-    """
-    Maneja el error de límite de solicitudes (HTTP 429).
-    Espera un minuto antes de reintentar la solicitud.
-
-    :param response: Objeto de respuesta de la solicitud.
-    """
-    if response.status_code == 429:
-        print(f"{Fore.YELLOW}Advertencia: Límite de solicitudes alcanzado. Esperando 1 minuto antes de reintentar...")
-        time.sleep(60)  # Esperar 60 segundos
+# Páginas de resultados que se piden a la vez cuando la API indica el total
+PAGE_READ_AHEAD = 4
 
-# Función para buscar un usuario por nombre y apellido
-def search_user(first_name, last_name):
+# Función para buscar los usuarios con un nombre y apellido
+def search_users(first_name, last_name):
     """
-    Busca un usuario en la API de Freshservice por nombre y apellido.
+    Busca en la API de Freshservice todos los usuarios con un nombre y apellido
+    (los homónimos incluidos), recorriendo todas las páginas de resultados.
 
     :param first_name: Nombre del usuario.
     :param last_name: Apellido del usuario.
-    :return: Diccionario con los datos del usuario o None si no se encuentra.
-    """
-    url = f'{base_url}requesters?query="first_name:\'{first_name}\'"&query="last_name:\'{last_name}\'"'
-    while True:
-        try:
-            response = requests.get(url, auth=(api_key, ''))
-            if response.status_code == 429:
-                handle_rate_limit(response)
-                continue  # Reintentar la solicitud
-            response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-            data = response.json()
-            if 'requesters' in data and len(data['requesters']) > 0:
-                return data['requesters'][0]  # Devolver el primer usuario encontrado
-            else:
-                print(f"{Fore.YELLOW}Advertencia: No se encontró ningún usuario con el nombre '{first_name}' y apellido '{last_name}'.")
-                return None
-        except requests.exceptions.RequestException as e:
-            print(f"{Fore.RED}Error al buscar el usuario: {e}")
-            return None
+    :return: Generador con los usuarios encontrados, a medida que llegan.
+    :raises requests.exceptions.RequestException: Si alguna página no se puede obtener (tras los
+        reintentos). No se trata como un usuario inexistente.
+    """
+    path = f'requesters?query="first_name:\'{first_name}\'"&query="last_name:\'{last_name}\'"'
+    found = 0
+    # El cliente espera y reintenta si se alcanza el límite de solicitudes
+    for user in client.iter_pages(path, 'requesters', per_page=page_size, read_ahead=PAGE_READ_AHEAD):
+        found += 1
+        yield user
+    if not found:
+        print(f"{Fore.YELLOW}Advertencia: No se encontró ningún usuario con el nombre '{first_name}' y apellido '{last_name}'.")
 
 # Función para buscar los activos asociados a un usuario por user_id
 def search_assets_by_user(user_id):
     """
-    Busca los activos asociados a un usuario en la API de Freshservice.
+    Busca los activos asociados a un usuario en la API de Freshservice,
+    recorriendo todas las páginas de resultados.
 
     :param user_id: ID del usuario.
-    :return: Lista de activos asociados o una lista vacía si no se encuentran.
-    """
-    url = f'{base_url}assets?query="user_id:{user_id}"'
-    while True:
-        try:
-            response = requests.get(url, auth=(api_key, ''))
-            if response.status_code == 429:
-                handle_rate_limit(response)
-                continue  # Reintentar la solicitud
-            response.raise_for_status()  # Lanza una excepción si el código de estado no es 200
-            data = response.json()
-            if 'assets' in data and len(data['assets']) > 0:
-                return data['assets']  # Devolver la lista de activos
-            else:
-                print(f"{Fore.YELLOW}Advertencia: No se encontraron activos asociados al usuario con ID {user_id}.")
-                return []
-        except requests.exceptions.RequestException as e:
-            print(f"{Fore.RED}Error al buscar los activos asociados al usuario: {e}")
-            return []
+    :return: Generador con los activos asociados, a medida que llegan.
+    :raises requests.exceptions.RequestException: Si alguna página no se puede obtener (tras los
+        reintentos). No se trata como un usuario sin activos.
+    """
+    path = f'assets?query="user_id:{user_id}"'
+    found = 0
+    # El cliente espera y reintenta si se alcanza el límite de solicitudes
+    for asset in client.iter_pages(path, 'assets', per_page=page_size, read_ahead=PAGE_READ_AHEAD):
+        found += 1
+        yield asset
+    if not found:
+        print(f"{Fore.YELLOW}Advertencia: No se encontraron activos asociados al usuario con ID {user_id}.")
 
-# Función principal
-def main(search_name):
-    # Unir los argumentos capturados como nombre completo
-    full_name = ' '.join(search_name)
+# Función para dividir un nombre completo en nombre y apellido
+def split_name(full_name):
+    """
+    Divide un nombre completo en nombre y apellido por el primer espacio.
+
+    :param full_name: Nombre completo (por ejemplo: 'Rafael Aceituno').
+    :return: Tupla (nombre, apellido) o None si no hay apellido.
+    """
+    parts = full_name.split(' ', 1)  # Dividir en dos partes: nombre y apellido
+    if len(parts) != 2 or not parts[0] or not parts[1].strip():
+        return None
+    return parts[0], parts[1].strip()
+
+# Función para leer los nombres de un archivo, sin repetir
+def read_names(names_file):
+    """
+    Lee los nombres completos de un archivo (uno por línea). Se ignoran las
+    líneas vacías y las que empiezan por '#', y los nombres repetidos (sin
+    distinguir mayúsculas ni espacios de más) se buscan una sola vez.
+
+    :param names_file: Ruta del archivo.
+    :return: Lista de nombres en el orden del archivo.
+    """
+    names = []
+    seen = set()
+    with open(names_file, 'r', encoding='utf-8') as file:
+        for line in file:
+            name = ' '.join(line.split())
+            if not name or name.startswith('#'):
+                continue
+            key = name.casefold()
+            if key not in seen:
+                seen.add(key)
+                names.append(name)
+    return names
+
+# Función para obtener las filas del informe de un nombre
+def resolve_name(full_name, index=None):
+    """
+    Busca un usuario y sus activos y devuelve las filas del informe por lotes:
+    una por activo, o una sola si el usuario no existe o no tiene activos.
+    Con el índice local, si hay varios usuarios empatados con la mejor
+    puntuación (homónimos) se incluyen todos. Si alguna consulta a la API
+    falla, se devuelve una sola fila con el estado 'error' y el mensaje, en
+    lugar de un resultado incompleto.
+
+    :param full_name: Nombre completo del usuario.
+    :param index: Índice local de usuarios (RequesterIndex) o None para buscar en la API.
+    :return: Lista de filas (diccionarios).
+    """
+    row = {
+        'search_name': full_name,
+        'status': None,
+        'match_score': None,
+        'user_id': None,
+        'first_name': None,
+        'last_name': None,
+        'email': None,
+        'asset_display_id': None,
+        'asset_name': None,
+        'error': None,
+    }
+    try:
+        if index is not None:
+            matches = index.best_matches(full_name)
+            if not matches:
+                return [dict(row, status='user_not_found')]
+            rows = []
+            for score, user in matches:
+                rows.extend(_user_rows(dict(row, match_score=score), user))
+            return rows
+
+        names = split_name(full_name)
+        if names is None:
+            print(f"{Fore.RED}Error: '{full_name}' no tiene nombre y apellido separados por un espacio. Ignorando.")
+            return [dict(row, status='invalid_name')]
+
+        rows = []
+        for user in search_users(*names):  # Todos los homónimos
+            rows.extend(_user_rows(row, user))
+        return rows or [dict(row, status='user_not_found')]
+    except requests.exceptions.RequestException as e:
+        print(f"{Fore.RED}Error al buscar '{full_name}': {e}")
+        return [dict(row, status='error', error=str(e))]
+
+def _user_rows(row, user):
+    """
+    Completa la fila base con los datos de un usuario y devuelve una fila por cada uno de sus activos.
+
+    :raises requests.exceptions.RequestException: Si los activos del usuario no se pueden obtener.
+    """
+    row = dict(row)
+    row.update({
+        'user_id': user.get('id'),
+        'first_name': user.get('first_name'),
+        'last_name': user.get('last_name'),
+        'email': user.get('primary_email'),
+    })
+
+    rows = [
+        dict(row, status='ok', asset_display_id=asset.get('display_id'), asset_name=asset.get('name'))
+        for asset in search_assets_by_user(user.get('id'))
+    ]
+    return rows or [dict(row, status='no_assets')]
+
+# Función para buscar en lote los usuarios de un archivo
+def main_batch(names_file, output_file=None, workers=8, index=None):
+    """
+    Busca todos los nombres de un archivo a la vez (compartiendo el límite de
+    peticiones) y genera un único informe usuario -> activos.
+
+    :param names_file: Archivo con un nombre completo por línea.
+    :param output_file: Informe de salida (.xlsx, .csv, .json, .jsonl, .parquet o .feather) o None para mostrarlo en pantalla.
+    :param workers: Número de búsquedas simultáneas.
+    :param index: Índice local de usuarios (RequesterIndex) o None para buscar en la API.
+    :return: Código de salida: 0, o 1 si hubo errores (también si alguna búsqueda falló por la API).
+    """
+    if not os.path.isfile(names_file):
+        print(f"{Fore.RED}Error: No se encontró el archivo '{names_file}'.")
+        return 1
+    if output_file and not os.path.splitext(output_file)[1]:
+        output_file += ".xlsx"
+    if output_file and not export.get_format(output_file):
+        print(f"{Fore.RED}Error: Formato de salida no admitido '{output_file}'. Usa una de estas extensiones: {', '.join(export.FORMATS)}.")
+        return 1
+    missing = export.missing_dependency(output_file) if output_file else None
+    if missing:
+        print(f"{Fore.RED}Error: El formato de '{output_file}' requiere el paquete {missing} (pip install {missing}).")
+        return 1
+
+    names = read_names(names_file)
+    if not names:
+        print(f"{Fore.RED}Error: El archivo '{names_file}' no contiene nombres.")
+        return 1
+    print(f"{Fore.CYAN}Buscando {len(names)} usuarios...")
+
+    from concurrent.futures import ThreadPoolExecutor  # Solo se necesita en el modo por lotes
+
+    writer = export.open_writer(output_file) if output_file else None
+    found = 0
+    errors = 0
     try:
-        first_name, last_name = full_name.split(' ', 1)  # Dividir en dos partes: nombre y apellido
-    except ValueError:
-        print(f"{Fore.RED}Error: Debes proporcionar un nombre y un apellido separados por un espacio.")
-        return
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for rows in executor.map(lambda name: resolve_name(name, index), names):  # Resultados en el orden del archivo
+                if rows[0]['status'] == 'error':
+                    errors += 1
+                elif rows[0]['user_id'] is not None:
+                    found += 1
+                for row in rows:
+                    if writer:
+                        writer.write_row(row)
+                    else:
+                        print("  " + ", ".join(f"{column}: {value}" for column, value in row.items()))
+    finally:
+        if writer:
+            writer.close()
 
-    # Buscar el usuario por nombre y apellido
-    user = search_user(first_name, last_name)
-    if not user:
-        return  # Terminar si no se encuentra el usuario
+    print(f"{Fore.GREEN}Usuarios encontrados: {found} de {len(names)}.")
+    if errors:
+        print(f"{Fore.RED}{errors} búsquedas fallaron por errores de la API (estado 'error' en el informe).")
+    if output_file:
+        print(f"{Fore.GREEN}Datos guardados en {output_file}")
+    return 1 if errors else 0
+
+# Función para mostrar un usuario y sus activos
+def show_user(user):
+    """
+    Muestra los datos de un usuario y busca y muestra sus activos.
 
+    :param user: Diccionario con los datos del usuario.
+    """
     # Extraer información del usuario
     user_id = user.get('id', 'Unknown')
     user_first_name = user.get('first_name', 'Unknown')
@@ -100,30 +238,144 @@ def main(search_name):
     print(f"  Apellido: {user_last_name}")
     print(f"  ID de Usuario: {user_id}")
 
-    # Buscar los activos asociados al usuario
-    assets = search_assets_by_user(user_id)
-    if assets:
-        print(f"{Fore.CYAN}Activos asociados al usuario:")
-        for asset in assets:
-            asset_name = asset.get('name', 'Unknown')
-            display_id = asset.get('display_id', 'Unknown')
-            print(f"  - Nombre del Activo: {asset_name}")
-            print(f"    ID de Visualización: {display_id}")
-    else:
+    # Buscar los activos asociados al usuario y mostrarlos a medida que llegan
+    count = 0
+    for asset in search_assets_by_user(user_id):
+        if count == 0:
+            print(f"{Fore.CYAN}Activos asociados al usuario:")
+        asset_name = asset.get('name', 'Unknown')
+        display_id = asset.get('display_id', 'Unknown')
+        print(f"  - Nombre del Activo: {asset_name}")
+        print(f"    ID de Visualización: {display_id}")
+        count += 1
+    if count == 0:
         print(f"{Fore.YELLOW}No se encontraron activos asociados al usuario.")
 
+# Función para cargar (o construir) el índice local de usuarios
+def load_index(rebuild=False):
+    """
+    Carga el índice local de usuarios, descargándolo de la API si todavía no existe.
+
+    :param rebuild: Si es True se vuelve a descargar aunque exista.
+    :return: Instancia de RequesterIndex o None si no se pudo construir.
+    """
+    if rebuild or not os.path.isfile(requester_index.DEFAULT_INDEX_PATH):
+        print(f"{Fore.CYAN}Construyendo el índice local de usuarios...")
+    try:
+        index, built = requester_index.load_or_build(rebuild=rebuild)
+    except requests.exceptions.RequestException as e:
+        print(f"{Fore.RED}Error al construir el índice local de usuarios: {e}")
+        return None
+    if built:
+        print(f"{Fore.CYAN}Índice guardado en {requester_index.DEFAULT_INDEX_PATH} ({len(index)} usuarios).")
+    return index
+
+# Función principal
+def main(search_name, index=None, max_results=10):
+    """
+    Busca un usuario por su nombre completo y muestra sus activos.
+
+    :return: Código de salida: 0, o 1 si el nombre no es válido o la API falló.
+    """
+    # Unir los argumentos capturados como nombre completo
+    full_name = ' '.join(search_name)
+
+    try:
+        # Con el índice local se admiten nombres parciales y se muestran todos los candidatos
+        if index is not None:
+            candidates = index.search(full_name, limit=max_results)
+            if not candidates:
+                print(f"{Fore.YELLOW}Advertencia: No se encontró ningún usuario parecido a '{full_name}'.")
+                return 0
+            print(f"{Fore.CYAN}Candidatos encontrados ({len(candidates)}):")
+            for score, user in candidates:
+                print(f"  [{score:.2f}] {user.get('first_name')} {user.get('last_name')} (ID: {user.get('id')}, {user.get('primary_email')})")
+            best = candidates[0][0]
+            for score, user in candidates:
+                if score == best:  # Mostrar los activos de la mejor coincidencia y de sus homónimos
+                    show_user(user)
+            return 0
+
+        names = split_name(full_name)
+        if names is None:
+            print(f"{Fore.RED}Error: Debes proporcionar un nombre y un apellido separados por un espacio.")
+            return 1
+        first_name, last_name = names
+
+        # Buscar el usuario por nombre y apellido y mostrar todos los homónimos
+        for user in search_users(first_name, last_name):
+            show_user(user)
+    except requests.exceptions.RequestException as e:
+        print(f"{Fore.RED}Error al buscar '{full_name}': {e}")
+        return 1
+    return 0
+
 if __name__ == "__main__":
     # Configurar argumentos de línea de comandos
     parser = argparse.ArgumentParser(
         description=f"{Fore.CYAN}Buscador de usuarios y activos asociados en Freshservice."
     )
-    parser.add_argument(
+    search = parser.add_mutually_exclusive_group(required=True)
+    search.add_argument(
         '-sn', '--search-name',
         nargs='+',  # Capturar múltiples palabras como una lista
-        required=True,
         help=f"{Fore.GREEN}Nombre completo del usuario a buscar (por ejemplo: Rafael Aceituno)."
     )
+    search.add_argument(
+        '--names-file',
+        metavar='ARCHIVO',
+        help=f"{Fore.GREEN}Archivo con un nombre completo por línea. Se buscan todos a la vez y se genera un único informe."
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help=f"{Fore.GREEN}Con --names-file, archivo del informe: Excel (.xlsx, por defecto), .csv, .json, .jsonl, .parquet o .feather. Si no se indica, se muestra en pantalla."
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=8,
+        help=f"{Fore.GREEN}Con --names-file, número de búsquedas simultáneas (por defecto: 8). Todas comparten el límite de peticiones."
+    )
+    parser.add_argument(
+        '--index',
+        action='store_true',
+        help=f"{Fore.GREEN}Busca en un índice local de usuarios (~/.cache/fstools) en lugar de en la API: admite nombres parciales, sin acentos o con erratas y muestra todos los candidatos. El índice se descarga la primera vez."
+    )
+    parser.add_argument(
+        '--rebuild-index',
+        action='store_true',
+        help=f"{Fore.GREEN}Vuelve a descargar el índice local de usuarios (implica --index)."
+    )
+    parser.add_argument(
+        '--max-results',
+        type=int,
+        default=10,
+        help=f"{Fore.GREEN}Con --index, número máximo de candidatos que se muestran (por defecto: 10)."
+    )
+    parser.add_argument(
+        '--per-page',
+        type=int,
+        default=client.MAX_PER_PAGE,
+        help=f"{Fore.GREEN}Resultados por página en las búsquedas (por defecto y como máximo: {client.MAX_PER_PAGE})."
+    )
+    cli.add_client_arguments(parser)
     args = parser.parse_args()
+    cli.apply_client_arguments(args)
+
+    page_size = max(1, min(args.per_page, client.MAX_PER_PAGE))
+
+    index = None
+    if args.index or args.rebuild_index:
+        index = load_index(args.rebuild_index)
+        if index is None:
+            raise SystemExit(1)
 
     # Ejecutar la función principal con los argumentos especificados
-    main(args.search_name)
+    if args.names_file:
+        status = main_batch(args.names_file, args.output, args.workers, index)
+    else:
+        status = main(args.search_name, index, args.max_results)
+
+    # Mostrar o guardar las métricas de la ejecución
+    cli.report_metrics(args)
+    raise SystemExit(status)
@@ -0,0 +1,406 @@
+import os
+import json
+import time
+import socket
+import threading
+import argparse
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import requests
+from colorama import Fore, init
+from fscore import cli  # Opciones comunes de línea de comandos (--rate-limit y --stats)
+from fscore import client  # Cliente HTTP compartido (clave, subdominio y pool de conexiones)
+from fscore import metrics  # Métricas de la ejecución (/stats)
+from fscore.ids import IdSet, parse_token, split_tokens
+import fsmanage  # Enriquecimiento de activos (catálogos y usuarios en memoria)
+import fssearch  # Búsqueda de usuarios y de sus activos
+
+# Inicializar colorama
+init(autoreset=True)
+
+# Datos que se incluyen por defecto al enriquecer un activo (parámetro include)
+ENRICH_FIELDS = ('department', 'asset_type', 'location', 'user', 'system_os', 'machine_ip')
+
+# Máximo de activos que se pueden pedir en una sola consulta a /assets
+MAX_ASSETS_PER_REQUEST = 1000
+
+
+class ServiceError(Exception):
+    """
+    Error de una consulta al servicio, con el código de estado HTTP que se devuelve.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class LookupService:
+    """
+    Estado compartido entre las consultas: los catálogos de referencia y los
+    usuarios se quedan en memoria (en fsmanage) y las conexiones a la API en el
+    pool del cliente, de modo que solo la primera consulta paga la carga en frío.
+
+    :param index: Índice local de usuarios (RequesterIndex) para /users/search, o None para buscar en la API.
+    :param catalog_ttl: Segundos tras los que se vuelven a descargar los catálogos y se olvidan los usuarios.
+    :param workers: Hilos con los que se enriquecen los activos de una consulta a /assets.
+    """
+
+    def __init__(self, index=None, catalog_ttl=3600, workers=4):
+        self.index = index
+        self.catalog_ttl = catalog_ttl
+        self.workers = max(1, workers)
+        self.started = time.time()
+        self.served = 0
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def warm_up(self):
+        """
+        Descarga los catálogos de referencia antes de atender la primera consulta.
+        """
+        with metrics.timer('reference_data'):
+            fsmanage.load_reference_data(True, True, True)
+        self._loaded_at = time.monotonic()
+
+    def _refresh_reference_data(self):
+        """
+        Descarta los catálogos y los usuarios memorizados cuando han caducado.
+        """
+        if not self.catalog_ttl:
+            return
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at > self.catalog_ttl:
+                fsmanage.reset_reference_data()
+                self._loaded_at = None
+            if self._loaded_at is None:
+                self.warm_up()
+
+    def handle(self, path, query):
+        """
+        Atiende una consulta.
+
+        :param path: Ruta de la consulta (por ejemplo: '/assets/143').
+        :param query: Diccionario parámetro -> lista de valores.
+        :return: Datos de la respuesta (serializables en JSON).
+        :raises ServiceError: Si la ruta no existe, faltan parámetros o no se encuentra el recurso.
+        """
+        parts = [part for part in path.split('/') if part]
+        with self._lock:
+            self.served += 1
+        if parts == ['health']:
+            return {'status': 'ok', 'uptime_seconds': round(time.time() - self.started, 1), 'served': self.served}
+        if parts == ['stats']:
+            return metrics.summary()
+        self._refresh_reference_data()
+        if parts == ['users', 'search']:
+            return self.search_users(_param(query, 'name'), _int_param(query, 'limit', 10))
+        if len(parts) == 3 and parts[0] == 'users' and parts[2] == 'assets':
+            return self.user_assets(_int_value(parts[1], 'ID de usuario'))
+        if len(parts) == 2 and parts[0] == 'assets':
+            asset_id = _int_value(parts[1], 'ID de activo')
+            options = self.report_options(query)
+            assets, not_found = self.fetch_assets(IdSet([(asset_id, asset_id)]), options)
+            if not_found:
+                raise ServiceError(404, f"No se encontraron datos para el activo {asset_id}")
+            return {'asset_id': asset_id, 'rows': self.enrich(IdSet([(asset_id, asset_id)]), options, assets)}
+        if parts == ['assets']:
+            asset_ids = _id_set(_param(query, 'ids'))
+            options = self.report_options(query)
+            assets, not_found = self.fetch_assets(asset_ids, options)
+            rows = self.enrich(IdSet.from_ids(sorted(assets)), options, assets) if assets else []
+            return {'assets': len(asset_ids), 'rows': rows, 'not_found': not_found}
+        raise ServiceError(404, f"Ruta desconocida: {path}")
+
+    def search_users(self, name, limit):
+        """
+        Busca usuarios por nombre: con el índice local admite nombres parciales y
+        erratas; sin él, busca en la API el nombre y apellido exactos (con homónimos).
+        """
+        if self.index is not None:
+            return {
+                'query': name,
+                'users': [dict(_user_fields(user), score=score) for score, user in self.index.search(name, limit=limit)],
+            }
+        names = fssearch.split_name(' '.join(name.split()))
+        if names is None:
+            raise ServiceError(400, "El nombre debe tener nombre y apellido separados por un espacio")
+        users = []
+        for user in fssearch.search_users(*names):
+            users.append(_user_fields(user))
+            if len(users) >= limit:
+                break
+        return {'query': name, 'users': users}
+
+    def user_assets(self, user_id):
+        """
+        Devuelve los activos asociados a un usuario.
+        """
+        assets = [
+            {'display_id': asset.get('display_id'), 'name': asset.get('name')}
+            for asset in fssearch.search_assets_by_user(user_id)
+        ]
+        return {'user_id': user_id, 'assets': assets}
+
+    def report_options(self, query):
+        """
+        Construye las opciones de fsmanage a partir de los parámetros de la consulta.
+
+        :param query: Parámetros de la consulta: include (lista separada por comas
+            de ENRICH_FIELDS, por defecto todos), components y fields (columna=campo de type_fields).
+        :return: Diccionario de opciones de fsmanage.build_options.
+        """
+        include = set(_list_param(query, 'include', ENRICH_FIELDS))
+        unknown = include - set(ENRICH_FIELDS)
+        if unknown:
+            raise ServiceError(400, f"Datos desconocidos en include: {', '.join(sorted(unknown))}")
+        components = _list_param(query, 'components', None) if 'components' in query else None
+        options = fsmanage.build_options(
+            components,
+            False,
+            'department' in include,
+            'asset_type' in include,
+            'location' in include,
+            'user' in include,
+            'system_os' in include,
+            'machine_ip' in include,
+            _list_param(query, 'fields', None),
+        )
+        if options is None:
+            raise ServiceError(400, "Campo de tipo inválido en fields (formato columna=campo)")
+        return options
+
+    def fetch_assets(self, asset_ids, options):
+        """
+        Pide los activos a la API (con sus type_fields si se necesitan), para que
+        los inexistentes se indiquen como tales con cualquier include y no como
+        filas de 'Unknown'.
+
+        :param asset_ids: IdSet con los IDs de los activos.
+        :param options: Diccionario de opciones devuelto por report_options.
+        :return: Tupla (diccionario ID -> activo de los que existen, lista de IDs que no existen).
+        :raises requests.exceptions.RequestException: Si alguna petición falla por un motivo distinto de que el activo no exista.
+        """
+        from concurrent.futures import ThreadPoolExecutor  # Solo se necesita al consultar activos
+
+        include_type_fields = bool(options["type_fields"])
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(asset_ids))) as executor:
+            fetched = executor.map(lambda asset_id: fsmanage.get_asset_data(asset_id, include_type_fields), asset_ids)
+            results = list(zip(asset_ids, fetched))
+        assets = {asset_id: asset for asset_id, asset in results if asset is not None}
+        return assets, [asset_id for asset_id, asset in results if asset is None]
+
+    def enrich(self, asset_ids, options, prefetched=None):
+        """
+        Devuelve las filas del informe de fsmanage para los activos pedidos.
+
+        :param asset_ids: IdSet con los IDs de los activos.
+        :param options: Diccionario de opciones devuelto por report_options.
+        :param prefetched: Diccionario ID -> activo ya descargado (de fetch_assets), o None para pedirlos.
+        :return: Lista de filas, en el orden de los IDs.
+        """
+        rows = []
+        for asset_id, asset_rows in zip(asset_ids, fsmanage.run_assets(asset_ids, options, min(self.workers, len(asset_ids)), prefetched)):
+            if asset_rows is None:
+                raise ServiceError(502, f"Error al consultar la API para el activo {asset_id}")
+            rows.extend(asset_rows)
+        return rows
+
+
+# Funciones auxiliares para leer los parámetros de una consulta
+def _param(query, name):
+    values = query.get(name)
+    if not values or not values[0].strip():
+        raise ServiceError(400, f"Falta el parámetro {name}")
+    return values[0]
+
+def _list_param(query, name, default):
+    if name not in query:
+        return list(default) if default is not None else None
+    return [item for value in query[name] for item in split_tokens(value)]
+
+def _int_param(query, name, default):
+    if name not in query:
+        return default
+    return _int_value(query[name][0], name)
+
+def _int_value(value, name):
+    if not value.isdigit():
+        raise ServiceError(400, f"{name} inválido: {value}")
+    return int(value)
+
+def _id_set(text):
+    try:
+        asset_ids = IdSet(parse_token(token) for token in split_tokens(text))
+    except ValueError:
+        raise ServiceError(400, f"IDs inválidos: {text}") from None
+    if not asset_ids:
+        raise ServiceError(400, "No se indicó ningún ID")
+    if len(asset_ids) > MAX_ASSETS_PER_REQUEST:
+        raise ServiceError(400, f"Como máximo se admiten {MAX_ASSETS_PER_REQUEST} activos por consulta")
+    return asset_ids
+
+def _user_fields(user):
+    return {field: user.get(field) for field in ('id', 'first_name', 'last_name', 'primary_email')}
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    Atiende las peticiones GET y devuelve las respuestas del servicio en JSON.
+    """
+
+    protocol_version = 'HTTP/1.1'  # Conexiones keep-alive entre consultas del mismo cliente
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # TCP_NODELAY solo se aplica a las conexiones TCP, no a las del socket Unix
+        self.disable_nagle_algorithm = self.request.family != socket.AF_UNIX
+        super().setup()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            # Conservar los parámetros vacíos: ?components (o components=) pide todos los componentes
+            status, data = 200, self.server.service.handle(url.path, parse_qs(url.query, keep_blank_values=True))
+        except ServiceError as e:
+            status, data = e.status, {'error': str(e)}
+        except requests.exceptions.RequestException as e:
+            status, data = 502, {'error': f"Error al consultar la API: {e}"}
+        except Exception as e:
+            print(f"{Fore.RED}Error inesperado al atender {self.path}: {e}")
+            status, data = 500, {'error': f"Error inesperado: {e}"}
+        body = json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Con un socket Unix no hay dirección del cliente
+        return self.client_address[0] if isinstance(self.client_address, tuple) and self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Servidor HTTP sobre un socket Unix, para que solo accedan los procesos con permiso sobre el archivo.
+    """
+
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)  # Socket de una ejecución anterior
+        super().server_bind()
+
+
+# Función principal
+def main(host, port, unix_socket, index=None, catalog_ttl=3600, workers=4, cache=False, verbose=True):
+    service = LookupService(index, catalog_ttl, workers)
+
+    # Activar la caché persistente en disco si se especifica --cache
+    if cache:
+        client.enable_cache()
+
+    # Ajustar el pool de conexiones para que cada hilo disponga de una conexión keep-alive
+    if client.pool_size < workers:
+        client.configure(pool=workers)
+
+    print(f"{Fore.CYAN}Cargando los catálogos de referencia...")
+    try:
+        service.warm_up()
+    except requests.exceptions.RequestException:
+        print(f"{Fore.YELLOW}Advertencia: No se pudieron cargar los catálogos; se reintentará en la primera consulta.")
+
+    if unix_socket:
+        server = UnixHTTPServer(unix_socket, ServiceHandler)
+        address = unix_socket
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceHandler)
+        address = f"http://{host}:{server.server_address[1]}"
+    server.service = service
+    server.verbose = verbose
+    print(f"{Fore.GREEN}Servicio escuchando en {address} (Ctrl+C para detener).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"{Fore.YELLOW}Deteniendo el servicio...")
+    finally:
+        server.server_close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        client.close()
+
+if __name__ == "__main__":
+    # Configurar argumentos de línea de comandos
+    parser = argparse.ArgumentParser(
+        description=f"{Fore.CYAN}Servicio local que atiende búsquedas de usuarios y enriquecimiento de activos de Freshservice con cachés en memoria.",
+        epilog=f"{Fore.YELLOW}Ejemplo de uso: python fsserve.py --port 8080 && curl 'http://127.0.0.1:8080/assets/143?include=department,user'"
+    )
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help=f"{Fore.GREEN}Dirección en la que escucha el servicio (por defecto: 127.0.0.1)."
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8080,
+        help=f"{Fore.GREEN}Puerto en el que escucha el servicio (por defecto: 8080)."
+    )
+    parser.add_argument(
+        '--socket',
+        metavar='ARCHIVO',
+        help=f"{Fore.GREEN}Escucha en un socket Unix (por ejemplo: /run/fstools.sock) en lugar de en un puerto TCP."
+    )
+    parser.add_argument(
+        '--index',
+        action='store_true',
+        help=f"{Fore.GREEN}Busca los usuarios en el índice local (~/.cache/fstools), que admite nombres parciales y erratas. Se descarga si no existe."
+    )
+    parser.add_argument(
+        '--catalog-ttl',
+        type=int,
+        default=3600,
+        help=f"{Fore.GREEN}Segundos tras los que se vuelven a descargar los catálogos y se olvidan los usuarios memorizados (por defecto: 3600; 0 para no caducar)."
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=4,
+        help=f"{Fore.GREEN}Activos que se enriquecen en paralelo en cada consulta a /assets (por defecto: 4)."
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help=f"{Fore.GREEN}Guarda también las respuestas de la API en la caché local en disco (~/.cache/fstools)."
+    )
+    parser.add_argument(
+        '-q', '--quiet',
+        action='store_true',
+        help=f"{Fore.GREEN}No muestra una línea por cada consulta atendida."
+    )
+    cli.add_client_arguments(parser)
+    args = parser.parse_args()
+    cli.apply_client_arguments(args)
+
+    if args.socket and not hasattr(socket, 'AF_UNIX'):
+        print(f"{Fore.RED}Error: Los sockets Unix no están disponibles en este sistema.")
+        raise SystemExit(1)
+
+    index = None
+    if args.index:
+        index = fssearch.load_index()
+        if index is None:
+            raise SystemExit(1)
+
+    # Ejecutar la función principal con los argumentos especificados
+    main(args.host, args.port, args.socket, index, args.catalog_ttl, args.workers, args.cache, not args.quiet)
+
+    # Mostrar o guardar las métricas de la ejecución
+    cli.report_metrics(args)
@@ -0,0 +1,189 @@
+import time
+import datetime
+import requests
+import argparse
+from colorama import Fore, init
+from fscore import cli  # Opciones comunes de línea de comandos (--rate-limit y --stats)
+from fscore import client  # Cliente HTTP compartido (clave, subdominio y pool de conexiones)
+from fscore.mirror import CATALOGS, DEFAULT_MIRROR_PATH, Mirror
+
+# Inicializar colorama
+init(autoreset=True)
+
+# Número de registros que se guardan en la réplica de una vez
+BATCH_SIZE = 500
+
+# Días tras los que una sincronización incremental se convierte en una carga completa.
+# Los cambios incrementales (updated_at) no incluyen los registros eliminados en
+# Freshservice: solo una carga completa los detecta y los quita de la réplica.
+FULL_SYNC_EVERY_DAYS = 7
+
+# Función para recorrer un listado y guardarlo en la réplica por lotes
+def sync_entity(entity, path, key, params, store):
+    """
+    Descarga un listado paginado y lo guarda en la réplica por lotes.
+
+    :param entity: Nombre de la entidad ('assets' o 'requesters').
+    :param path: Ruta del endpoint de listado.
+    :param key: Clave de la respuesta que contiene la lista.
+    :param params: Parámetros de consulta (filtro de cambios incluido).
+    :param store: Función de la réplica que guarda un lote (upsert_assets o upsert_requesters).
+    :return: Tupla (registros guardados, conjunto de IDs vistos, updated_at más reciente).
+    """
+    id_key = 'display_id' if entity == 'assets' else 'id'
+    seen_ids = set()
+    high_water = None
+    batch = []
+    for item in client.get_paginated(path, key, params):
+        batch.append(item)
+        seen_ids.add(item[id_key])
+        updated_at = item.get('updated_at')
+        if updated_at and (high_water is None or updated_at > high_water):
+            high_water = updated_at
+        if len(batch) >= BATCH_SIZE:
+            store(batch)
+            batch = []
+    if batch:
+        store(batch)
+    return len(seen_ids), seen_ids, high_water
+
+# Función para construir el filtro de cambios desde la marca de agua
+def changes_since(high_water):
+    """
+    Construye la condición de updated_at que pide los registros modificados desde la marca de agua.
+
+    La API solo compara fechas por días y con '>' estricto, así que se filtra
+    desde el día anterior: se vuelve a pedir el día completo de la marca de
+    agua (el upsert descarta los repetidos) y no se pierde lo modificado ese
+    mismo día después de la última sincronización.
+
+    :param high_water: updated_at más reciente de la réplica (ISO 8601).
+    :return: Condición entre comillas para filter/query (por ejemplo: "updated_at:>'2024-05-01'").
+    """
+    day = datetime.date.fromisoformat(high_water[:10]) - datetime.timedelta(days=1)
+    return f"\"updated_at:>'{day.isoformat()}'\""
+
+# Función para decidir si una entidad necesita una carga completa
+def needs_full_sync(mirror, entity, full_every=FULL_SYNC_EVERY_DAYS):
+    """
+    Indica si toca descargar completa una entidad: la primera vez, o si su
+    última carga completa es más antigua que full_every días (o no consta).
+
+    :param mirror: Instancia de Mirror.
+    :param entity: 'assets' o 'requesters'.
+    :param full_every: Días entre cargas completas, o 0/None para no forzarlas nunca.
+    """
+    if mirror.get_high_water(entity) is None:
+        return True
+    if not full_every:
+        return False
+    last_full = mirror.get_full_sync_time(entity)
+    return last_full is None or time.time() - last_full > full_every * 86400
+
+# Función para sincronizar los activos y los usuarios
+def sync_records(mirror, entity, full):
+    """
+    Sincroniza los activos o los usuarios. La primera vez (o con --full) se
+    descarga todo; después solo lo modificado desde la marca de agua.
+
+    :param mirror: Instancia de Mirror.
+    :param entity: 'assets' o 'requesters'.
+    :param full: Si es True se hace una carga completa y se eliminan los registros que ya no existen.
+    :return: Número de registros descargados.
+    """
+    high_water = None if full else mirror.get_high_water(entity)
+    if entity == 'assets':
+        path, key, store = 'assets', 'assets', mirror.upsert_assets
+        params = {'include': 'type_fields'}
+        if high_water:
+            params['filter'] = changes_since(high_water)
+    else:
+        path, key, store = 'requesters', 'requesters', mirror.upsert_requesters
+        params = {}
+        if high_water:
+            params['query'] = changes_since(high_water)
+
+    count, seen_ids, new_high_water = sync_entity(entity, path, key, params, store)
+    if not high_water:
+        removed = mirror.delete_missing(entity, seen_ids)
+        if removed:
+            print(f"{Fore.YELLOW}  {removed} registros de {entity} ya no existen y se han eliminado de la réplica.")
+    if new_high_water and (not high_water or new_high_water > high_water):
+        mirror.set_high_water(entity, new_high_water, full=not high_water)
+    elif high_water:
+        mirror.set_high_water(entity, high_water)  # Registrar la hora de la sincronización
+    return count
+
+# Función para sincronizar los catálogos de referencia
+def sync_catalogs(mirror):
+    """
+    Descarga completos los catálogos de departamentos, tipos de activos y ubicaciones,
+    que son pequeños y no admiten filtrar por fecha de modificación.
+    """
+    for catalog in CATALOGS:
+        items = {item['id']: item['name'] for item in client.get_paginated(f'{catalog}/', catalog)}
+        mirror.replace_catalog(catalog, items)
+        print(f"  {catalog}: {len(items)}")
+
+# Función principal
+def main(mirror_path, full, full_every=FULL_SYNC_EVERY_DAYS):
+    """
+    Sincroniza la réplica: los catálogos siempre completos y los activos y
+    usuarios de forma incremental, salvo cuando toca una carga completa.
+
+    :param mirror_path: Archivo SQLite de la réplica.
+    :param full: Si es True se descarga todo aunque no toque.
+    :param full_every: Días entre cargas completas automáticas (0 o None para no hacerlas).
+    :return: Código de salida: 0, o 1 si la sincronización no terminó.
+    """
+    mirror = Mirror(mirror_path)
+    print(f"{Fore.CYAN}Sincronización de la réplica {mirror.path}")
+    try:
+        sync_catalogs(mirror)
+        for entity in ('assets', 'requesters'):
+            entity_full = full or needs_full_sync(mirror, entity, full_every)
+            count = sync_records(mirror, entity, entity_full)
+            mode = "carga completa" if entity_full else "cambios"
+            print(f"  {entity}: {count} descargados ({mode}), {mirror.count(entity)} en la réplica")
+    except requests.exceptions.RequestException as e:
+        print(f"{Fore.RED}Error durante la sincronización: {e}")
+        print(f"{Fore.YELLOW}Los datos ya guardados se conservan; la siguiente sincronización continuará desde la última marca de agua.")
+        return 1
+    finally:
+        mirror.close()
+    print(f"{Fore.GREEN}Réplica actualizada.")
+    return 0
+
+if __name__ == "__main__":
+    # Configurar argumentos de línea de comandos
+    parser = argparse.ArgumentParser(
+        description=f"{Fore.CYAN}Mantiene una réplica local (SQLite) de los activos, usuarios y catálogos de Freshservice.",
+        epilog=f"{Fore.YELLOW}Ejemplo de uso: python fssync.py && python fsmanage.py -i 1-5000 -a --mirror ~/.cache/fstools/mirror.sqlite3 -o inventario.xlsx"
+    )
+    parser.add_argument(
+        '--db',
+        default=DEFAULT_MIRROR_PATH,
+        help=f"{Fore.GREEN}Archivo SQLite de la réplica (por defecto: {DEFAULT_MIRROR_PATH})."
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help=f"{Fore.GREEN}Descarga todo de nuevo en lugar de solo los cambios, y elimina de la réplica lo que ya no existe."
+    )
+    parser.add_argument(
+        '--full-every',
+        type=int,
+        default=FULL_SYNC_EVERY_DAYS,
+        metavar='DÍAS',
+        help=f"{Fore.GREEN}Días tras los que se hace automáticamente una carga completa (por defecto: {FULL_SYNC_EVERY_DAYS}; 0 para no hacerla nunca). Las sincronizaciones incrementales no ven los activos ni los usuarios eliminados en Freshservice: hasta la siguiente carga completa siguen en la réplica."
+    )
+    cli.add_client_arguments(parser)
+    args = parser.parse_args()
+    cli.apply_client_arguments(args)
+
+    # Ejecutar la función principal con los argumentos especificados
+    status = main(args.db, args.full, args.full_every)
+
+    # Mostrar o guardar las métricas de la ejecución
+    cli.report_metrics(args)
+    raise SystemExit(status)
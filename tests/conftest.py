@@ -0,0 +1,39 @@
+"""
+Utilidades compartidas por las pruebas: la API simulada de bench/fakeserver.py
+arrancada en un puerto libre, con el cliente compartido apuntando a ella.
+"""
+import pytest
+
+import fsmanage
+from bench.fakeserver import Dataset, FakeFreshservice
+from fscore import cache as response_cache
+from fscore import client
+from fscore import requester_index
+from fscore.ratelimit import RateLimiter
+
+
+@pytest.fixture
+def fake_api(monkeypatch, tmp_path):
+    """
+    Arranca la API simulada (60 activos y 10 usuarios) y configura el cliente
+    para usarla sin esperas entre reintentos. Al terminar se restaura la
+    configuración del cliente y se olvidan los catálogos y usuarios memorizados.
+
+    Para simular errores se puede sustituir fake.handle por una función que
+    devuelva (código de estado, cuerpo, endpoint).
+    """
+    fake = FakeFreshservice(Dataset(assets=60, requesters=10)).start()
+    for name in ('api_key', 'subdomain', 'pool_size', 'timeout', '_cache'):
+        monkeypatch.setattr(client, name, getattr(client, name))
+    monkeypatch.setattr(client, 'base_url', fake.base_url)
+    monkeypatch.setattr(client, 'limiter', RateLimiter(60000, adaptive=False))
+    monkeypatch.setattr(client, 'max_retries', 1)
+    monkeypatch.setattr(client.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(response_cache, 'DEFAULT_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(requester_index, 'DEFAULT_INDEX_PATH', str(tmp_path / 'cache' / 'requesters.json.gz'))
+    fsmanage.reset_reference_data()
+    yield fake
+    fsmanage.reset_reference_data()
+    client.disable_cache()
+    client.close()
+    fake.stop()
@@ -0,0 +1,50 @@
+"""
+Pruebas del motor asíncrono (--engine async) contra la API simulada.
+"""
+import asyncio
+
+import pytest
+import requests
+
+import fsmanage
+from fscore import client
+
+pytest.importorskip('aiohttp')
+
+from fscore.aio import AsyncClient  # noqa: E402  Requiere aiohttp
+
+
+def options():
+    return fsmanage.build_options(['cpu'], False, True, True, True, True, True, True)
+
+
+def test_async_engine_matches_the_thread_engine(fake_api):
+    asset_ids = fsmanage.process_asset_ids('1-20')
+    threaded = list(fsmanage.run_assets(asset_ids, options(), workers=4))
+    fsmanage.reset_reference_data()
+    fake_api.reset_stats()
+    concurrent = list(fsmanage.run_assets_async(asset_ids, options(), concurrency=8))
+    assert concurrent == threaded
+    assert all(rows for rows in concurrent)
+    assert fake_api.stats()['requester'] < 20  # 10 usuarios distintos: no se piden una vez por activo
+
+
+def test_async_engine_fails_assets_whose_lookups_fail(fake_api, monkeypatch):
+    monkeypatch.setattr(client, 'retry_delay', lambda attempt, status, retry_after: 0)  # Reintentar sin esperar
+    handle = fake_api.handle
+    fake_api.handle = lambda path, query: (503, {}, 'requester') if path.startswith('requesters') else handle(path, query)
+    results = list(fsmanage.run_assets_async(fsmanage.process_asset_ids('1-5'), options(), concurrency=4))
+    assert results == [None] * 5
+
+
+def test_async_client_translates_http_errors(fake_api):
+    async def fetch():
+        async with AsyncClient() as aclient:
+            data = await aclient.get_json('assets/3')
+            with pytest.raises(requests.exceptions.HTTPError) as error:
+                await aclient.get_json('assets/999')
+            return data, error.value.response.status_code
+
+    data, status = asyncio.run(fetch())
+    assert data['asset']['display_id'] == 3
+    assert status == 404
@@ -0,0 +1,80 @@
+"""
+Pruebas de la caché persistente de respuestas (fscore.cache) y de su uso desde el cliente.
+"""
+import os
+
+import pytest
+
+from fscore import cache as response_cache
+from fscore import client
+from fscore.cache import ResponseCache, classify, make_key
+
+
+@pytest.fixture
+def now(monkeypatch):
+    """
+    Reloj controlado por la prueba para time.time() en fscore.cache.
+    """
+    clock = [1000000.0]
+    monkeypatch.setattr(response_cache.time, 'time', lambda: clock[0])
+    return clock
+
+
+def test_keys_and_endpoint_types():
+    assert make_key('/assets/1', {'include': 'type_fields'}) == 'assets/1|include=type_fields'
+    assert make_key('assets/1', {'b': 2, 'a': 1}) == 'assets/1|a=1&b=2'
+    assert make_key('assets/1', None, 'https://acme.freshservice.com/api/v2/') == 'https://acme.freshservice.com/api/v2/assets/1'
+    assert classify('assets/1/components/') == 'components'
+    assert classify('requesters/5') == 'requester'
+    assert classify('departments/') == 'departments'
+    assert classify('assets') is None  # Los listados y búsquedas no se guardan
+
+
+def test_entries_expire_with_their_endpoint_ttl(tmp_path, now):
+    cache = ResponseCache(str(tmp_path / 'r.sqlite3'), ttls={'asset': 60, 'requester': 3600})
+    cache.put('assets/1', 'asset', {'asset': {'id': 1}})
+    cache.put('requesters/5', 'requester', {'requester': {'id': 5}})
+    cache.put('assets?page=1', None, {'assets': []})  # Tipo sin tiempo de vida: no se guarda
+    assert cache.get('assets/1', 'asset') == {'asset': {'id': 1}}
+    assert cache.get('assets?page=1', None) is None
+
+    now[0] += 61
+    assert cache.get('assets/1', 'asset') is None
+    assert cache.get('requesters/5', 'requester') == {'requester': {'id': 5}}
+    cache.close()
+
+    # La entrada sigue en disco para otras ejecuciones, salvo con refresh
+    cache = ResponseCache(str(tmp_path / 'r.sqlite3'), ttls={'requester': 3600})
+    assert cache.get('requesters/5', 'requester') == {'requester': {'id': 5}}
+    cache.close()
+    cache = ResponseCache(str(tmp_path / 'r.sqlite3'), ttls={'requester': 3600}, refresh=True)
+    assert cache.get('requesters/5', 'requester') is None
+    cache.close()
+
+
+def test_oldest_entries_are_evicted_first(tmp_path, now):
+    body = {'asset': {'serial': os.urandom(600).hex()}}  # ~1 KB comprimido
+    cache = ResponseCache(str(tmp_path / 'r.sqlite3'), max_bytes=5000, ttls={'asset': 3600})
+    for asset_id in range(1, 11):
+        now[0] += 1
+        cache.put(f'assets/{asset_id}', 'asset', body)
+    kept = [asset_id for asset_id in range(1, 11) if cache.get(f'assets/{asset_id}', 'asset') is not None]
+    assert kept and kept == list(range(11 - len(kept), 11))  # Solo sobreviven las más recientes
+    assert cache._total_bytes <= 5000
+    cache.close()
+
+
+def test_accounts_do_not_share_responses(tmp_path, monkeypatch):
+    """
+    Dos URL base distintas (por ejemplo, dos tenants con la misma caché) no
+    reciben nunca las respuestas guardadas por la otra.
+    """
+    monkeypatch.setattr(client, 'base_url', 'http://tenant-a.test/api/v2/')
+    monkeypatch.setattr(client, '_cache', ResponseCache(str(tmp_path / 'r.sqlite3')))
+    client.cache_store('assets/1', None, {'asset': {'name': 'A'}})
+    assert client.cache_lookup('assets/1') == {'asset': {'name': 'A'}}
+
+    monkeypatch.setattr(client, 'base_url', 'http://tenant-b.test/api/v2/')
+    assert client.cache_lookup('assets/1') is None
+    assert not client.is_cached('assets/1')
+    client.disable_cache()
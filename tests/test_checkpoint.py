@@ -0,0 +1,133 @@
+"""
+Pruebas del diario de progreso (--checkpoint) y de la reanudación de fsmanage.
+"""
+import csv
+
+import pytest
+import requests
+
+import fsmanage
+from fscore import client
+from fscore.checkpoint import Checkpoint, CheckpointMismatchError
+
+SIGNATURE = {"components": None, "type_fields": {"system_os": "os"}}
+
+
+def test_rows_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'ck.jsonl')
+    checkpoint = Checkpoint(path, SIGNATURE)
+    checkpoint.record(1, [{"asset_id": 1, "system_os": "Linux"}])
+    checkpoint.record(2, [])
+    checkpoint.close()
+
+    checkpoint = Checkpoint(path, SIGNATURE)
+    assert checkpoint.completed_ids() == {1, 2}
+    assert checkpoint.rows(1) == [{"asset_id": 1, "system_os": "Linux"}]
+    assert checkpoint.rows(2) == []
+    checkpoint.close()
+
+
+def test_truncated_last_line_is_discarded(tmp_path):
+    path = tmp_path / 'ck.jsonl'
+    checkpoint = Checkpoint(str(path), SIGNATURE)
+    checkpoint.record(1, [{"asset_id": 1}])
+    checkpoint.close()
+    with open(path, 'ab') as file:
+        file.write(b'{"asset_id": 2, "rows": [')  # Interrupción a mitad de una línea
+
+    checkpoint = Checkpoint(str(path), SIGNATURE)
+    assert checkpoint.completed_ids() == {1}
+    checkpoint.record(3, [{"asset_id": 3}])
+    checkpoint.close()
+    assert Checkpoint(str(path), SIGNATURE).completed_ids() == {1, 3}
+
+
+def test_other_options_are_rejected(tmp_path):
+    path = str(tmp_path / 'ck.jsonl')
+    Checkpoint(path, SIGNATURE).close()
+    with pytest.raises(CheckpointMismatchError):
+        Checkpoint(path, {"components": [], "type_fields": {}})
+
+
+def test_failed_assets_are_retried_on_resume(tmp_path, monkeypatch):
+    """
+    Un activo que falla por un error de la API no se da por completado: al
+    relanzar con el mismo checkpoint se vuelve a pedir y acaba en el informe.
+    """
+    api_down = {7}
+    requested = []
+
+    def get_json(path, params=None):
+        asset_id = int(path.split('/')[1])
+        requested.append(asset_id)
+        if asset_id in api_down:
+            raise requests.exceptions.ConnectionError('Connection refused')
+        if asset_id == 9:
+            error = requests.exceptions.HTTPError('404 Not Found')
+            error.response = requests.Response()
+            error.response.status_code = 404
+            raise error
+        return {'asset': {'display_id': asset_id, 'type_fields': {fsmanage.TYPE_FIELDS['system_os']: f'OS {asset_id}'}}}
+
+    monkeypatch.setattr(client, 'get_json', get_json)
+    checkpoint_file = str(tmp_path / 'ck.jsonl')
+    output = str(tmp_path / 'report.csv')
+
+    def run():
+        fsmanage.main('7-9', None, None, output, False, False, False, False, False, False, True, False, checkpoint_file=checkpoint_file)
+
+    run()
+    checkpoint = Checkpoint(checkpoint_file, _options())
+    assert checkpoint.completed_ids() == {8, 9}  # 9 no existe: completado, sin datos
+    checkpoint.close()
+
+    api_down.clear()
+    requested.clear()
+    run()
+    assert requested == [7]
+    with open(output, newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    assert [(row['asset_id'], row['system_os']) for row in rows] == [('7', 'OS 7'), ('8', 'OS 8'), ('9', 'Unknown')]
+
+
+def _options():
+    return fsmanage.build_options(None, False, False, False, False, False, True, False)
+
+
+def test_failed_lookups_fail_the_asset(tmp_path, monkeypatch):
+    """
+    Si falla la consulta del usuario de un activo (503), el activo no se
+    completa con 'Unknown': queda fuera del checkpoint y main devuelve 1.
+    """
+    requesters_down = True
+
+    def get_json(path, params=None):
+        resource, item_id = path.split('/')[:2]
+        if resource == 'requesters':
+            if requesters_down:
+                error = requests.exceptions.HTTPError('503 Service Unavailable')
+                error.response = requests.Response()
+                error.response.status_code = 503
+                raise error
+            return {'requester': {'first_name': 'Ana', 'last_name': 'Gil', 'primary_email': 'ana@example.com'}}
+        return {'asset': {'display_id': int(item_id), 'user_id': 100 + int(item_id)}}
+
+    monkeypatch.setattr(client, 'get_json', get_json)
+    fsmanage.reset_reference_data()
+    checkpoint_file = str(tmp_path / 'ck.jsonl')
+    output = str(tmp_path / 'report.csv')
+
+    def run():
+        return fsmanage.main('1-2', None, None, output, False, False, False, False, False, True, False, False, checkpoint_file=checkpoint_file)
+
+    assert run() == 1
+    assert not (tmp_path / 'report.csv').exists()
+    checkpoint = Checkpoint(checkpoint_file, fsmanage.build_options(None, False, False, False, False, True))
+    assert checkpoint.completed_ids() == set()
+    checkpoint.close()
+
+    requesters_down = False
+    assert run() == 0
+    with open(output, newline='', encoding='utf-8') as file:
+        assert [row['user_first_name'] for row in csv.DictReader(file)] == ['Ana', 'Ana']
+    fsmanage.reset_reference_data()
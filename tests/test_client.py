@@ -0,0 +1,78 @@
+"""
+Pruebas de la política de reintentos del cliente compartido.
+"""
+import pytest
+import requests
+
+from fscore import client
+from fscore.ratelimit import RateLimiter
+
+
+def make_response(status_code, body=b'{}', headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = 'http://api.test/assets/1'
+    return response
+
+
+class FakeSession:
+    """
+    Sesión que devuelve (o lanza) las respuestas indicadas, en orden.
+    """
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def session(monkeypatch):
+    def install(*outcomes):
+        fake = FakeSession(outcomes)
+        monkeypatch.setattr(client, 'get_session', lambda: fake)
+        return fake
+
+    monkeypatch.setattr(client, 'limiter', RateLimiter(60000, adaptive=False))
+    monkeypatch.setattr(client.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(client, 'max_retries', 3)
+    return install
+
+
+def test_retries_5xx_429_and_network_errors(session):
+    fake = session(
+        make_response(503),
+        requests.exceptions.ConnectionError('reset'),
+        make_response(429, headers={'Retry-After': '0'}),
+        make_response(200, b'{"asset": {"id": 1}}'),
+    )
+    assert client.get_json('assets/1') == {'asset': {'id': 1}}
+    assert fake.calls == 4
+
+
+def test_gives_up_after_max_retries(session):
+    fake = session(*[make_response(500)] * 4)
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.get_json('assets/1')
+    assert fake.calls == 4
+
+    fake = session(*[requests.exceptions.ConnectionError('down')] * 4)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get_json('assets/1')
+    assert fake.calls == 4
+
+
+def test_client_errors_are_not_retried(session):
+    fake = session(make_response(404))
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        client.get_json('assets/1')
+    assert error.value.response.status_code == 404
+    assert fake.calls == 1
@@ -0,0 +1,87 @@
+"""
+Pruebas de los escritores de informes (fscore.export).
+"""
+import csv
+import json
+
+import pytest
+
+from fscore import export
+
+ROWS = [
+    {"asset_id": 1, "department_name": "Ventas", "system_os": "Linux"},
+    {"asset_id": 2, "department_name": None, "component_type": "Memory", "size": 16},
+    {"asset_id": 3, "department_name": "Ventas", "system_os": "Windows"},
+]
+
+
+def write(path, rows=ROWS):
+    with export.open_writer(str(path)) as writer:
+        for row in rows:
+            writer.write_row(row)
+    return writer
+
+
+def test_format_from_extension():
+    assert export.get_format('a.XLSX') == 'xlsx'
+    assert export.get_format('a.ndjson') == 'jsonl'
+    assert export.get_format('a.arrow') == 'feather'
+    assert export.get_format('a.txt') is None
+    with pytest.raises(ValueError):
+        export.open_writer('a.txt')
+
+
+def test_jsonl_and_json(tmp_path):
+    writer = write(tmp_path / 'r.jsonl')
+    assert writer.rows_written == 3
+    with open(tmp_path / 'r.jsonl', encoding='utf-8') as file:
+        assert [json.loads(line) for line in file] == ROWS
+    write(tmp_path / 'r.json')
+    with open(tmp_path / 'r.json', encoding='utf-8') as file:
+        assert json.load(file) == ROWS
+
+
+def test_csv_has_every_column_in_order_of_appearance(tmp_path):
+    write(tmp_path / 'r.csv')
+    with open(tmp_path / 'r.csv', newline='', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        rows = list(reader)
+    assert reader.fieldnames == ["asset_id", "department_name", "system_os", "component_type", "size"]
+    assert rows[1] == {"asset_id": "2", "department_name": "", "system_os": "", "component_type": "Memory", "size": "16"}
+
+
+def test_no_file_without_rows(tmp_path):
+    for extension in ('.csv', '.json', '.jsonl'):
+        write(tmp_path / f'empty{extension}', [])
+        assert not (tmp_path / f'empty{extension}').exists()
+
+
+def test_xlsx(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    write(tmp_path / 'r.xlsx')
+    sheet = openpyxl.load_workbook(tmp_path / 'r.xlsx').active
+    values = list(sheet.values)
+    assert values[0] == ("asset_id", "department_name", "system_os", "component_type", "size")
+    assert values[3][:3] == (3, "Ventas", "Windows")
+
+
+def test_parquet_and_feather_keep_column_types(tmp_path):
+    pytest.importorskip('pyarrow')
+    import pyarrow.feather
+    import pyarrow.parquet
+
+    write(tmp_path / 'r.parquet')
+    write(tmp_path / 'r.feather')
+    for table in (pyarrow.parquet.read_table(tmp_path / 'r.parquet'), pyarrow.feather.read_table(tmp_path / 'r.feather')):
+        assert table.num_rows == 3
+        assert str(table.schema.field('asset_id').type) == 'int64'
+        assert table.column('department_name').to_pylist() == ["Ventas", None, "Ventas"]
+        assert table.column('size').to_pylist() == [None, 16, None]
+
+
+def test_every_format_implements_the_writer_hooks():
+    for base in (export._Writer, export._SpooledWriter):
+        with pytest.raises(TypeError):
+            base('r.csv')
+    for extension in export.FORMATS:
+        assert isinstance(export.open_writer('r' + extension), export._Writer)
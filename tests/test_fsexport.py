@@ -0,0 +1,52 @@
+"""
+Pruebas de fsexport.py: reparto de los tramos y exportación de un tramo contra la API simulada.
+"""
+import json
+
+import pytest
+
+import fsexport
+import fsmanage
+from fscore.tenants import Tenant
+
+
+def options():
+    return fsmanage.build_options(None, False, True, True, False, True, True, False)
+
+
+def test_shard_rows_carry_the_tenant(fake_api, tmp_path):
+    tenant = Tenant('espana', api_key='x', base_url=fake_api.base_url)
+    task = fsexport.plan_shards([tenant], '1-10', None, 2)[0]
+    part = tmp_path / 'part.jsonl'
+    result = fsexport.export_shard(task, options(), 2, 'thread', False, str(part))
+    assert (result['assets'], result['rows']) == (5, 5)
+    rows = [json.loads(line) for line in part.read_text(encoding='utf-8').splitlines()]
+    assert [row['asset_id'] for row in rows] == [1, 2, 3, 4, 5]
+    assert {row['tenant'] for row in rows} == {'espana'}
+    assert 'Unknown' not in {row['user_first_name'] for row in rows}
+
+
+def test_throttled_lookups_fail_the_shard(fake_api, tmp_path):
+    """
+    Si la API sigue respondiendo 429 a las consultas de usuarios tras los
+    reintentos, los activos no se completan con 'Unknown': el tramo falla.
+    """
+    handle = fake_api.handle
+    fake_api.handle = lambda path, query: (429, {}, 'requester') if path.startswith('requesters/') else handle(path, query)
+    tenant = Tenant('espana', api_key='x', base_url=fake_api.base_url)
+    task = fsexport.plan_shards([tenant], '1-4', None, 1)[0]
+    with pytest.raises(fsexport.ShardError, match='4 de 4 activos'):
+        fsexport.export_shard(task, options(), 2, 'thread', False, str(tmp_path / 'part.jsonl'))
+
+
+@pytest.mark.parametrize('rate_limit, tenant_limit, processes, expected', [
+    (None, None, None, (None, 4)),  # Sin límite fijo: el de las cabeceras se reparte entre 4
+    (None, 200, None, (50, 4)),
+    (None, 200, 2, (100, 2)),  # Solo 2 tramos a la vez
+    (600, 200, 3, (200, 3)),  # --rate-limit tiene prioridad
+])
+def test_rate_limit_is_split_across_concurrent_shards(rate_limit, tenant_limit, processes, expected):
+    tenant = Tenant('espana', api_key='x', subdomain='acme', rate_limit=tenant_limit)
+    tasks = fsexport.plan_shards([tenant], '1-100', None, 4, processes, rate_limit)
+    assert [task['assets'] for task in tasks] == [25] * 4
+    assert {(task['rate'], task['share']) for task in tasks} == {expected}
@@ -0,0 +1,52 @@
+"""
+Pruebas de fssearch.py contra la API simulada.
+"""
+import csv
+
+import fssearch
+
+
+def write_names(tmp_path, *names):
+    path = tmp_path / 'names.txt'
+    path.write_text('\n'.join(names) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_resolve_name_lists_every_asset(fake_api):
+    rows = fssearch.resolve_name('José Aceituno')  # Usuario 5002: activos 1, 11, 21...
+    assert {row['status'] for row in rows} == {'ok'}
+    assert [row['asset_display_id'] for row in rows] == [1, 11, 21, 31, 41, 51]
+    assert fssearch.resolve_name('Nadie Conocido')[0]['status'] == 'user_not_found'
+
+
+def test_api_errors_are_reported_as_errors(fake_api, tmp_path):
+    """
+    Un 503 al buscar los activos no se confunde con un usuario sin activos:
+    el nombre queda con el estado 'error' y el proceso termina con código 1.
+    """
+    handle = fake_api.handle
+    fake_api.handle = lambda path, query: (503, {}, 'assets') if path == 'assets' else handle(path, query)
+    rows = fssearch.resolve_name('José Aceituno')
+    assert len(rows) == 1
+    assert rows[0]['status'] == 'error'
+    assert '503' in rows[0]['error']
+
+    output = tmp_path / 'report.csv'
+    status = fssearch.main_batch(write_names(tmp_path, 'José Aceituno', 'María Aceituno'), str(output), workers=2)
+    assert status == 1
+    with open(output, newline='', encoding='utf-8') as file:
+        assert [row['status'] for row in csv.DictReader(file)] == ['error', 'error']
+
+
+def test_a_failing_later_page_is_not_a_truncated_ok(fake_api, monkeypatch):
+    monkeypatch.setattr(fssearch, 'page_size', 2)
+    handle = fake_api.handle
+
+    def fail_second_page(path, query):
+        if path == 'assets' and query.get('page') == ['2']:
+            return 503, {}, 'assets'
+        return handle(path, query)
+
+    fake_api.handle = fail_second_page
+    rows = fssearch.resolve_name('José Aceituno')
+    assert [row['status'] for row in rows] == ['error']
@@ -0,0 +1,89 @@
+"""
+Pruebas de las rutas y los códigos de estado de fsserve.py contra la API simulada.
+"""
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+import fsserve
+
+
+@pytest.fixture
+def service(fake_api):
+    """
+    Arranca el servicio en un puerto libre y devuelve una función que hace una
+    consulta y devuelve (código de estado, JSON).
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), fsserve.ServiceHandler)
+    server.service = fsserve.LookupService(workers=2)
+    server.verbose = False
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+
+    def get(path):
+        response = requests.get(base + path, timeout=10)
+        return response.status_code, response.json()
+
+    yield get
+    server.shutdown()
+    server.server_close()
+
+
+def fail(fake_api, prefix, status=503):
+    """
+    Hace que la API simulada responda con un error a las rutas que empiezan por prefix.
+    """
+    handle = fake_api.handle
+    fake_api.handle = lambda path, query: (status, {}, 'error') if path.startswith(prefix) else handle(path, query)
+
+
+def test_health_and_unknown_routes(service):
+    status, data = service('/health')
+    assert status == 200 and data['status'] == 'ok'
+    assert service('/nada')[0] == 404
+    assert service('/assets?ids=abc')[0] == 400
+    assert service('/assets/1?include=color')[0] == 400
+    assert service('/users/search')[0] == 400
+
+
+def test_single_asset(service):
+    status, data = service('/assets/3?include=department,user')
+    assert status == 200
+    assert data['asset_id'] == 3
+    assert data['rows'][0]['department_name'] == 'Departamento 4'
+    assert data['rows'][0]['user_first_name'] == 'Javier'
+    assert service('/assets/999?include=department')[0] == 404
+    assert service('/assets/999?components')[0] == 404
+
+
+def test_asset_list_reports_missing_ids(service):
+    status, data = service('/assets?ids=59-61,63&include=asset_type')
+    assert status == 200
+    assert data['assets'] == 4
+    assert [row['asset_id'] for row in data['rows']] == [59, 60]
+    assert data['not_found'] == [61, 63]
+
+
+def test_users(service):
+    status, data = service('/users/search?name=José Aceituno')
+    assert status == 200
+    assert [user['id'] for user in data['users']] == [5002]
+    status, data = service('/users/5002/assets')
+    assert status == 200
+    assert [asset['display_id'] for asset in data['assets']] == [1, 11, 21, 31, 41, 51]
+
+
+@pytest.mark.parametrize('prefix, path', [
+    ('requesters', '/users/search?name=José Aceituno'),
+    ('assets', '/users/5002/assets'),
+    ('assets/', '/assets/1'),
+    ('assets/', '/assets?ids=1-3'),
+    ('requesters/', '/assets/1?include=user'),
+])
+def test_api_errors_are_502(service, fake_api, prefix, path):
+    fail(fake_api, prefix)
+    status, data = service(path)
+    assert status == 502
+    assert data['error']
@@ -0,0 +1,80 @@
+"""
+Pruebas de la réplica local (fscore.mirror) y de la sincronización de fssync.py contra la API simulada.
+"""
+import fssync
+from fscore.mirror import Mirror
+
+
+def changed_asset(fake_api, display_id, updated_at):
+    """
+    Hace que la API simulada devuelva un activo modificado después de la última sincronización.
+    """
+    asset = fake_api.dataset.asset
+
+    def patched(asset_id, include_type_fields=False):
+        data = asset(asset_id, include_type_fields)
+        if data and asset_id == display_id:
+            data.update(name='RENOMBRADO', updated_at=updated_at)
+        return data
+
+    fake_api.dataset.asset = patched
+
+
+def test_full_then_incremental_sync(fake_api, tmp_path):
+    path = str(tmp_path / 'mirror.sqlite3')
+    assert fssync.main(path, False) == 0
+    mirror = Mirror(path)
+    assert (mirror.count('assets'), mirror.count('requesters')) == (60, 10)
+    assert mirror.get_catalog('departments')[1001] == 'Departamento 1'
+    high_water = mirror.get_high_water('assets')
+    assert mirror.get_full_sync_time('assets') is not None
+    mirror.close()
+
+    changed_asset(fake_api, 5, '2030-01-01T00:00:00Z')
+    fake_api.reset_stats()
+    assert fssync.main(path, False) == 0
+    mirror = Mirror(path)
+    assert mirror.get_asset(5)['name'] == 'RENOMBRADO'
+    assert mirror.get_high_water('assets') == '2030-01-01T00:00:00Z' > high_water
+    mirror.close()
+    # Solo se pide el último día de cambios, no las 60 fichas
+    assert fake_api.stats()['assets'] == 1
+
+
+def test_deleted_records_are_removed_by_the_periodic_full_sync(fake_api, tmp_path, monkeypatch):
+    path = str(tmp_path / 'mirror.sqlite3')
+    assert fssync.main(path, False) == 0
+    fake_api.dataset.asset_count = 50  # Se eliminan los activos 51-60 en Freshservice
+
+    assert fssync.main(path, False) == 0
+    mirror = Mirror(path)
+    assert mirror.count('assets') == 60  # Los cambios incrementales no ven las eliminaciones
+    mirror.close()
+
+    now = fssync.time.time()
+    monkeypatch.setattr(fssync.time, 'time', lambda: now + 8 * 86400)
+    assert fssync.main(path, False) == 0
+    mirror = Mirror(path)
+    assert mirror.count('assets') == 50
+    assert mirror.get_asset(51) is None
+    mirror.close()
+
+    assert fssync.main(path, False, full_every=0) == 0  # Sin cargas completas automáticas
+
+
+def test_older_mirrors_gain_the_full_sync_column(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / 'old.sqlite3')
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE sync_state (entity TEXT PRIMARY KEY, high_water TEXT, synced_at REAL)')
+    db.execute("INSERT INTO sync_state VALUES ('assets', '2024-01-01T00:00:00Z', 0)")
+    db.commit()
+    db.close()
+
+    mirror = Mirror(path)
+    assert mirror.get_full_sync_time('assets') is None
+    assert fssync.needs_full_sync(mirror, 'assets')  # Nunca se reconcilió: toca una carga completa
+    mirror.set_high_water('assets', '2024-02-01T00:00:00Z')
+    assert mirror.get_high_water('assets') == '2024-02-01T00:00:00Z'
+    mirror.close()
@@ -0,0 +1,73 @@
+"""
+Pruebas de la selección de IDs (fscore.ids e interpretación de -i/-e en fsmanage).
+"""
+import pytest
+
+import fsmanage
+from fscore.ids import IdSet, iter_tokens, parse_token, split_tokens
+
+
+def test_ranges_are_merged_and_sorted():
+    ids = IdSet([(10, 12), (1, 3), (4, 5), (11, 20), (30, 29)])
+    assert ids.ranges == [(1, 5), (10, 20)]
+    assert len(ids) == 16
+    assert list(IdSet([(3, 3), (1, 2)])) == [1, 2, 3]
+
+
+def test_membership_and_bounds():
+    ids = IdSet([(1, 5), (10, 20)])
+    assert 1 in ids and 5 in ids and 15 in ids
+    assert 0 not in ids and 7 not in ids and 21 not in ids
+    assert (ids.min(), ids.max()) == (1, 20)
+    with pytest.raises(ValueError):
+        IdSet().min()
+
+
+def test_exclusion():
+    ids = IdSet([(1, 10), (20, 30)]) - IdSet([(0, 2), (5, 5), (9, 21), (30, 40)])
+    assert ids.ranges == [(3, 4), (6, 8), (22, 29)]
+    assert IdSet([(1, 5)]) - IdSet([(1, 5)]) == IdSet()
+
+
+def test_large_range_is_not_expanded():
+    ids = IdSet([(1, 200000)]) - IdSet.from_ids([100, 101, 102])
+    assert ids.ranges == [(1, 99), (103, 200000)]
+    assert len(ids) == 199997
+
+
+def test_split_keeps_order_and_sizes():
+    parts = IdSet([(1, 5), (10, 14)]).split(3)
+    assert [list(part) for part in parts] == [[1, 2, 3, 4], [5, 10, 11], [12, 13, 14]]
+    assert len(IdSet([(1, 2)]).split(5)) == 2
+
+
+def test_tokens():
+    assert split_tokens('143, 150-152\n7') == ['143', '150-152', '7']
+    assert parse_token('150-152') == (150, 152)
+    assert parse_token('7') == (7, 7)
+    for token in ('abc', '1-x', '143 145', '-5', '1-2-3'):
+        with pytest.raises(ValueError):
+            parse_token(token)
+
+
+def test_spaces_do_not_split_ranges(capsys):
+    assert split_tokens(' 143 - 145 , 150\r\n') == ['143 - 145', '150']
+    assert parse_token('143 - 145') == (143, 145)
+    assert fsmanage.process_asset_ids('143 - 145', ' 144 ').ranges == [(143, 143), (145, 145)]
+    assert "inválido" not in capsys.readouterr().out
+
+
+def test_iter_tokens_across_chunks(monkeypatch):
+    import io
+    from fscore import ids as ids_module
+
+    monkeypatch.setattr(ids_module, '_CHUNK_SIZE', 4)
+    assert list(iter_tokens(io.StringIO('12345,6-8\n\n900, 10 - 12 \n'))) == ['12345', '6-8', '900', '10 - 12']
+
+
+def test_process_asset_ids_with_file_and_exclusions(tmp_path, capsys):
+    path = tmp_path / 'ids.txt'
+    path.write_text('1-10\n15,abc\n12\n', encoding='utf-8')
+    ids = fsmanage.process_asset_ids(str(path), '3-4,12')
+    assert ids.ranges == [(1, 2), (5, 10), (15, 15)]
+    assert "ID inválido 'abc'" in capsys.readouterr().out
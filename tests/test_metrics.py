@@ -0,0 +1,47 @@
+"""
+Pruebas del registro de métricas y de la combinación de las de varios procesos.
+"""
+from fscore import metrics
+from fscore.metrics import Histogram, Metrics
+
+
+def shard_metrics(latencies, status=200, hits=0, misses=0):
+    registry = Metrics()
+    for seconds in latencies:
+        registry.record_request('assets/{id}', status, seconds)
+    for _ in range(hits):
+        registry.record_cache(True)
+    for _ in range(misses):
+        registry.record_cache(False)
+    registry.record_retry('429')
+    registry.record_stage('reference_data', 0.5)
+    return registry.summary()
+
+
+def test_histogram_round_trips_through_to_dict():
+    histogram = Histogram()
+    for value in (3, 40, 700, 120000):
+        histogram.add(value)
+    copy = Histogram.from_dict(histogram.to_dict())
+    assert copy.to_dict() == histogram.to_dict()
+
+
+def test_combine_adds_up_the_shards():
+    first = shard_metrics([0.01, 0.02], hits=1, misses=1)
+    second = shard_metrics([0.5], status=429, misses=2)
+    data = metrics.combine([first, second], elapsed_seconds=3.0)
+
+    assert data['requests'] == 3
+    endpoint = data['endpoints']['assets/{id}']
+    assert endpoint['status'] == {'200': 2, '429': 1}
+    assert endpoint['latency']['count'] == 3
+    assert (endpoint['latency']['min_ms'], endpoint['latency']['max_ms']) == (10.0, 500.0)
+    assert data['retries'] == {'429': 2}
+    assert data['cache'] == {'hits': 1, 'misses': 3, 'hit_ratio': 0.25}
+    assert data['stages']['reference_data'] == {'calls': 2, 'seconds': 1.0}
+    assert data['elapsed_seconds'] == 3.0
+
+
+def test_combine_without_shards_is_empty():
+    data = metrics.combine([], elapsed_seconds=0)
+    assert (data['requests'], data['endpoints'], data['cache']['hit_ratio']) == (0, {}, None)
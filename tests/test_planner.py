@@ -0,0 +1,53 @@
+"""
+Pruebas del planificador de peticiones de fsmanage.py y de --dry-run.
+"""
+import fsmanage
+
+from fscore.planner import bulk_pages, choose_fetch_mode, plan_fetch
+
+
+def ids(text):
+    return fsmanage.process_asset_ids(text)
+
+
+def options(components=None, asset_data=False, departments=False, asset_type=False, location=False, user=False, system_os=False):
+    return fsmanage.build_options(components, asset_data, departments, asset_type, location, user, system_os)
+
+
+def test_dense_large_sets_use_the_paginated_listing():
+    assert choose_fetch_mode(ids('1-1000'), options(asset_data=True)) == 'bulk'
+    assert choose_fetch_mode(ids('1-50'), options(asset_data=True)) == 'per-id'  # Menos de una página
+    assert choose_fetch_mode(ids('1-100,20000-20100'), options(asset_data=True)) == 'per-id'  # Dispersos
+    assert choose_fetch_mode(ids('1-1000'), options(components=['cpu'])) == 'per-id'  # Solo componentes
+    assert choose_fetch_mode(ids('1-5'), options(asset_data=True), bulk_filter='asset_type_id:1') == 'bulk'
+    assert choose_fetch_mode(ids('1-1000'), options(asset_data=True), fetch_mode='per-id') == 'per-id'
+    assert bulk_pages(ids('150-250')) == 3
+
+
+def test_plan_counts_each_request():
+    plan = plan_fetch(
+        ids('1-40'), options(components=['cpu'], departments=True, location=True, user=True, system_os=True),
+        cached_catalogs=('locations',), rate_per_minute=60
+    )
+    assert plan.mode == 'per-id'
+    assert plan.catalogs == ['departments']  # El de ubicaciones ya está en la caché
+    assert [count for _, count, _ in plan.steps] == [40, 1, 40, 40]
+    assert plan.total == 121
+    assert plan.is_upper_bound  # Los usuarios se cuentan como máximo uno por activo
+    assert plan.estimated_seconds == 121
+
+
+def test_mirror_plans_only_the_components():
+    plan = plan_fetch(ids('1-40'), options(components=['cpu'], departments=True, user=True), mirror=True)
+    assert plan.mode == 'mirror'
+    assert [count for _, count, _ in plan.steps] == [40]
+    assert not plan.is_upper_bound
+
+
+def test_dry_run_makes_no_requests(fake_api, capsys):
+    status = fsmanage.main('1-30', None, None, None, False, True, True, False, False, True, True, False, dry_run=True)
+    assert status == 0
+    assert fake_api.stats().get('total', 0) == 0
+    output = capsys.readouterr().out
+    assert 'Plan de peticiones para 30 activos' in output
+    assert 'hasta 63 peticiones' in output  # 30 activos, 3 catálogos (-a incluye todos) y hasta 30 usuarios
@@ -0,0 +1,73 @@
+"""
+Pruebas del limitador de peticiones (token bucket).
+"""
+import pytest
+
+from fscore import ratelimit
+from fscore.ratelimit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, 'monotonic', clock)
+    return clock
+
+
+def test_bucket_allows_a_burst_then_spaces_requests(clock):
+    limiter = RateLimiter(60, adaptive=False)  # Un token por segundo
+    assert all(limiter.reserve() == 0 for _ in range(60))
+    assert limiter.reserve() == pytest.approx(1.0)
+    assert limiter.reserve() == pytest.approx(2.0)  # Las reservas concurrentes salen en orden
+
+
+def test_bucket_refills_over_time(clock):
+    limiter = RateLimiter(60, adaptive=False)
+    for _ in range(61):
+        limiter.reserve()
+    clock.now += 2.0  # El saldo pasa de -1 a 1
+    assert limiter.reserve() == 0
+    clock.now += 3600.0
+    assert all(limiter.reserve() == 0 for _ in range(60))  # La capacidad no supera el límite por minuto
+    assert limiter.reserve() > 0
+
+
+def test_headers_adjust_rate_and_remaining_budget(clock):
+    limiter = RateLimiter(100)
+    limiter.update({'X-Ratelimit-Total': '200', 'X-Ratelimit-Remaining': '0'})
+    assert limiter.rate_per_minute == 200
+    assert limiter.reserve() == pytest.approx(60 / 200)
+
+
+def test_shared_limiter_takes_its_part_of_the_account(clock):
+    limiter = RateLimiter(share=3)
+    limiter.update({'X-Ratelimit-Total': '600', 'X-Ratelimit-Remaining': '30'})
+    assert limiter.rate_per_minute == 200
+    assert sum(1 for _ in range(30) if limiter.reserve() == 0) == 10
+
+
+def test_fixed_rate_ignores_total_header(clock):
+    limiter = RateLimiter(50, adaptive=False)
+    limiter.update({'X-Ratelimit-Total': '200'})
+    assert limiter.rate_per_minute == 50
+
+
+def test_retry_after_blocks_every_request(clock):
+    limiter = RateLimiter(6000)
+    assert limiter.update({'Retry-After': '7'}, 429) == 7
+    assert limiter.reserve() == pytest.approx(7.0)
+    clock.now += 7.0
+    assert limiter.reserve() < 1.0
+
+
+def test_backoff_is_bounded():
+    limiter = RateLimiter()
+    assert all(0 <= limiter.backoff_delay(attempt) <= ratelimit.BACKOFF_MAX for attempt in range(20))
@@ -0,0 +1,59 @@
+"""
+Pruebas de la proyección de los activos del listado paginado sobre registros compactos.
+"""
+import fsmanage
+from fscore import fastjson
+from fscore.planner import plan_fetch
+from fscore.records import AssetProjection, AssetRecord
+
+ASSET = {
+    'display_id': 7,
+    'name': 'Portátil 7',
+    'description': 'x' * 1000,
+    'department_id': 1001,
+    'asset_type_id': 2001,
+    'location_id': None,
+    'user_id': 5007,
+    'type_fields': {'os_1': 'Windows 11', 'ip_1': '10.0.0.7', 'serial_1': 'ABC'},
+}
+
+
+def options(**flags):
+    return fsmanage.build_options(
+        None, False, flags.get('departments', False), flags.get('asset_type', False), flags.get('location', False),
+        flags.get('user', False), type_field_specs=flags.get('type_fields')
+    )
+
+
+def test_projection_keeps_only_the_report_fields():
+    project = AssetProjection(options(departments=True, user=True, type_fields=['so=os_1']))
+    record = project(ASSET)
+    assert (record.display_id, record.department_id, record.user_id) == (7, 1001, 5007)
+    assert record.asset_type_id is None  # No se ha pedido -t
+    assert record.type_fields == {'os_1': 'Windows 11'}
+
+
+def test_record_behaves_like_the_api_dictionary():
+    record = AssetRecord(7, location_id=None, type_fields={})
+    assert record.get('display_id') == 7
+    assert record.get('location_id', 'sin ubicación') == 'sin ubicación'
+    assert record.get('description') is None
+    assert repr(record) == 'AssetRecord(display_id=7, type_fields={})'
+
+
+def test_bulk_listing_builds_the_same_rows_as_per_id_requests(fake_api):
+    report_options = options(departments=True, asset_type=True, location=True, user=True, type_fields=['so=os_23001176139'])
+    asset_ids = fsmanage.process_asset_ids('1-30')
+    rows = {}
+    for mode in ('per-id', 'bulk'):
+        fsmanage.reset_reference_data()
+        fsmanage.load_reference_data(True, True, True)
+        plan = plan_fetch(asset_ids, report_options, fetch_mode=mode)
+        rows[mode] = list(fsmanage.run_plan(plan, asset_ids, report_options, workers=4))
+    assert rows['bulk'] == rows['per-id']
+    assert all(rows['bulk'])
+
+
+def test_fastjson_accepts_bytes_and_text():
+    assert fastjson.loads(b'{"asset": {"display_id": 1}}') == {'asset': {'display_id': 1}}
+    assert fastjson.loads('[1, "ñ"]') == [1, 'ñ']
@@ -0,0 +1,75 @@
+"""
+Pruebas del índice local de usuarios: puntuaciones, homónimos, erratas y
+guardado en disco.
+"""
+from fscore.requester_index import RequesterIndex, normalize
+
+
+def user(user_id, first_name, last_name, email=None):
+    return {'id': user_id, 'first_name': first_name, 'last_name': last_name, 'primary_email': email or f'u{user_id}@example.com'}
+
+
+USERS = [
+    user(1, 'Rafael', 'Aceituno Álvarez', 'rafael.aceituno@example.com'),
+    user(2, 'José', 'García'),
+    user(3, 'José', 'García'),  # Homónimo
+    user(4, 'Josefa', 'Garcés'),
+    user(5, 'María José', 'López'),
+    user(6, 'Marta', 'Gil'),
+    user(7, 'Raúl', 'Acedo'),
+]
+
+
+def ids(results):
+    return [(score, found['id']) for score, found in results]
+
+
+def test_normalize_ignores_accents_case_and_spaces():
+    assert normalize('  Ángela   IBÁÑEZ ') == 'angela ibanez'
+
+
+def test_exact_name_returns_every_homonym_first():
+    index = RequesterIndex(USERS)
+    assert ids(index.search('jose garcia')) == [(1.0, 2), (1.0, 3)]
+    results = ids(index.search('jose garc'))
+    assert [user_id for _, user_id in results] == [2, 3, 4]  # 'Josefa Garcés' encaja peor
+    assert 1.0 > results[0][0] > results[2][0] > 0.8
+    assert ids(index.best_matches('JOSÉ GARCÍA')) == [(1.0, 2), (1.0, 3)]
+
+
+def test_prefix_matches_rank_by_completeness():
+    index = RequesterIndex(USERS)
+    assert [user_id for _, user_id in ids(index.search('jos'))] == [2, 3, 5, 4]  # 'jose' antes que 'josefa'
+    assert [user_id for _, user_id in ids(index.search('raf ace'))] == [1]
+    assert [user_id for _, user_id in ids(index.search('ra ac'))] == [7, 1]  # 'raul acedo' es más corto
+    assert [user_id for _, user_id in ids(index.search('jos', limit=2))] == [2, 3]
+
+
+def test_email_prefix_matches():
+    index = RequesterIndex(USERS)
+    assert [user_id for _, user_id in ids(index.search('rafael.ace'))] == [1]
+
+
+def test_typos_fall_back_to_trigrams():
+    index = RequesterIndex(USERS)
+    results = ids(index.search('rafael aceituni'))
+    assert results[0][1] == 1
+    assert results[0][0] <= 0.8
+    assert index.search('zzzz qqqq') == []
+
+
+def test_prefix_matches_skip_the_trigram_index():
+    index = RequesterIndex(USERS)
+    index.search('marta')
+    assert index._grams is None
+    index.search('marta gill')
+    assert index._grams is not None
+
+
+def test_saved_index_keeps_the_normalized_names(tmp_path):
+    path = str(tmp_path / 'requesters.json.gz')
+    RequesterIndex(USERS, built_at=100).save(path)
+    loaded = RequesterIndex.load(path)
+    assert (len(loaded), loaded.built_at) == (len(USERS), 100)
+    assert ids(loaded.search('maria jose lopez')) == [(1.0, 5)]
+    assert RequesterIndex.load(str(tmp_path / 'no-existe.json.gz')) is None
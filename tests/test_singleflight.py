@@ -0,0 +1,100 @@
+"""
+Pruebas de la agrupación de peticiones idénticas en curso (single-flight).
+"""
+import asyncio
+import threading
+
+import pytest
+import requests
+
+from fscore.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_shares_one_call():
+    shared = threading.Semaphore(0)
+    flights = SingleFlight(on_shared=shared.release)
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {'id': 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do('key', fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for _ in range(4):  # Esperar a que los otros cuatro hilos se unan a la llamada en curso
+        assert shared.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == [{'id': 1}] * 5
+    assert len(calls) == 1
+    assert len(flights) == 0
+
+
+def test_single_flight_shares_errors_and_releases_the_key():
+    flights = SingleFlight()
+
+    def fail():
+        raise requests.exceptions.ConnectionError('down')
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        flights.do('key', fail)
+    assert len(flights) == 0
+    assert flights.do('key', lambda: 'ok') == 'ok'
+
+
+def test_async_single_flight_shares_one_call():
+    shared = []
+    flights = AsyncSingleFlight(on_shared=lambda: shared.append(1))
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'id': 1}
+
+    async def run():
+        return await asyncio.gather(*(flights.do('key', fetch) for _ in range(5)))
+
+    assert asyncio.run(run()) == [{'id': 1}] * 5
+    assert len(calls) == 1
+    assert len(shared) == 4
+    assert len(flights) == 0
+
+
+def test_async_single_flight_survives_a_cancelled_waiter():
+    flights = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return 'ok'
+
+    async def run():
+        first = asyncio.ensure_future(flights.do('key', fetch))
+        second = asyncio.ensure_future(flights.do('key', fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == 'ok'
+    assert len(flights) == 0
+
+
+def test_async_single_flight_shares_errors():
+    flights = AsyncSingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise requests.exceptions.ConnectionError('down')
+
+    async def run():
+        return await asyncio.gather(*(flights.do('key', fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(error, requests.exceptions.ConnectionError) for error in errors)
+    assert errors[1] is not errors[0]  # Cada corrutina recibe su propia copia
+    assert len(flights) == 0
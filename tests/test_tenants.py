@@ -0,0 +1,59 @@
+"""
+Pruebas de la configuración de tenants.
+"""
+import json
+
+import pytest
+
+from fscore import client
+from fscore import tenants
+
+
+def write_tenants(tmp_path, entries):
+    path = tmp_path / 'tenants.json'
+    path.write_text(json.dumps({'tenants': entries}), encoding='utf-8')
+    return str(path)
+
+
+def test_tenants_keep_the_file_order_and_read_keys_from_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv('FS_KEY_MX', 'clave-mx')
+    path = write_tenants(tmp_path, {
+        'mexico': {'subdomain': 'acme-mx', 'api_key_env': 'FS_KEY_MX', 'rate_limit': 100},
+        'espana': {'base_url': 'http://localhost:8080/api/v2', 'api_key': 'clave-es', 'shards': 2},
+    })
+    available = tenants.load_tenants(path)
+    assert list(available) == ['mexico', 'espana']
+    assert (available['mexico'].api_key, available['mexico'].rate_limit) == ('clave-mx', 100)
+    assert tenants.get_tenant('espana', path).shards == 2
+
+
+@pytest.mark.parametrize('entry, message', [
+    ({'api_key': 'x'}, "'subdomain' o 'base_url'"),
+    ({'subdomain': 'acme'}, "'api_key' o 'api_key_env'"),
+    ({'subdomain': 'acme', 'api_key_env': 'FS_KEY_NO_DEFINIDA'}, 'FS_KEY_NO_DEFINIDA'),
+    ({'subdomain': 'acme', 'api_key': 'x', 'rate_limit': 0}, "'rate_limit'"),
+    ({'subdomain': 'acme', 'api_key': 'x', 'shards': True}, "'shards'"),
+])
+def test_invalid_tenants_are_rejected(tmp_path, monkeypatch, entry, message):
+    monkeypatch.delenv('FS_KEY_NO_DEFINIDA', raising=False)
+    with pytest.raises(tenants.TenantConfigError, match=message):
+        tenants.load_tenants(write_tenants(tmp_path, {'espana': entry}))
+
+
+def test_unknown_tenant_lists_the_available_ones(tmp_path):
+    path = write_tenants(tmp_path, {'espana': {'subdomain': 'acme', 'api_key': 'x'}})
+    with pytest.raises(tenants.TenantConfigError, match='Tenants disponibles: espana'):
+        tenants.get_tenant('mexico', path)
+
+
+def test_use_tenant_shares_the_adaptive_limit(monkeypatch):
+    for name in ('api_key', 'subdomain', 'base_url', 'limiter'):
+        monkeypatch.setattr(client, name, getattr(client, name))
+    monkeypatch.setattr(tenants.response_cache, 'DEFAULT_CACHE_DIR', tenants.response_cache.DEFAULT_CACHE_DIR)
+    from fscore import requester_index
+    monkeypatch.setattr(requester_index, 'DEFAULT_INDEX_PATH', requester_index.DEFAULT_INDEX_PATH)
+
+    tenants.use_tenant(tenants.Tenant('espana', subdomain='acme', api_key='x'), share=4)
+    assert client.limiter.adaptive and client.limiter.share == 4
+    tenants.use_tenant(tenants.Tenant('espana', subdomain='acme', api_key='x', rate_limit=200), 50)
+    assert client.limiter.rate_per_minute == 50